@@ -1,24 +1,30 @@
 from contextlib import contextmanager
+import dataclasses
 from os import PathLike
 from pathlib import Path
 import logging
 from collections.abc import Container
 from typing import Generator, Iterable, Optional
 
-import docspec_python
 import yaml
 from novella.build import NovellaBuilder
 
-from doctor_genova.api_page import APIPage
-from doctor_genova.nav import ensure_child_nav, sort_nav
+from doctor_genova.api_page import APIPage, get_split_classes, sync_api_pages
+from doctor_genova.nav import NavTree
 from doctor_genova.lib import get_default_search_path
+from doctor_genova.discovery import DEFAULT_EXCLUDE, discover_py_files
 
 # Unused explicit imports that allow indirect linking.
+from doctor_genova.inventory import InventoryResolver
 from doctor_genova.preprocessor import DrGenPreprocessor
 
 
 _LOG = logging.getLogger(__name__)
 
+# The libyaml bindings are a lot faster, when PyYAML was built with them
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 #: Default Mkdocs nav section to add generated pages to.
 #:
 #: ```python
@@ -42,6 +48,10 @@ def generate_api_pages(
     ignore_when_discovered: Container[str] = DEFAULT_IGNORE_WHEN_DISCOVERED,
     nav_api_section: str = DEFAULT_API_SECTION,
     docs_dir: Optional[Path] = None,
+    exclude: Iterable[str] = DEFAULT_EXCLUDE,
+    sync: bool = False,
+    split_min_members: Optional[int] = None,
+    split_min_bytes: Optional[int] = None,
 ) -> None:
     """Generate Markdown stub pages for each module found in the _search path_,
     if such a page does not already exist.
@@ -65,6 +75,35 @@ def generate_api_pages(
 
         <build_dir>/content/doctor_genova/api_page.md
 
+    Files and directories in packages matching an `exclude` glob pattern —
+    build output or vendored code, say — don't get stubs (see
+    `doctor_genova.discovery.discover_py_files`).
+
+    ##### Splitting Large Modules #####
+
+    Modules with at least `split_min_members` members, or with source at least
+    `split_min_bytes` long, are split up: each of their documented top-level
+    classes gets a page of its own, and the module's page becomes the index of
+    a directory of them (with the classes left out). For example, with
+    `doctor_genova.api_page` split, the stubs are
+
+        <build_dir>/content/doctor_genova/api_page/index.md
+        <build_dir>/content/doctor_genova/api_page/APIPage.md
+        ...
+
+    and nested the same way in the nav. Links to the classes go to their own
+    pages. Neither given (the default) means no splitting; see
+    `doctor_genova.api_page.get_split_classes`.
+
+    ##### Syncing #####
+
+    With `sync=True`, stubs from an earlier run whose module is gone are
+    removed, and what was added, changed or removed is reported (see
+    `doctor_genova.api_page.sync_api_pages`). Stubs are only written when the
+    file doesn't already hold them — though when the build directory is
+    reused between builds (like with `--serve`), the previous build will have
+    expanded them in place, so they're written again to be re-rendered.
+
     ##### Mkdocs Nav Config #####
 
     If the file
@@ -88,6 +127,7 @@ def generate_api_pages(
         py_files = iter_py_files(
             search_path=search_path,
             ignore_when_discovered=ignore_when_discovered,
+            exclude=exclude,
         )
 
         pages = [
@@ -100,15 +140,113 @@ def generate_api_pages(
             for module_rel_path in py_files
         ]
 
+        if split_min_members is not None or split_min_bytes is not None:
+            pages = split_large_modules(
+                pages,
+                search_path=(
+                    get_default_search_path()
+                    if search_path is None
+                    else search_path
+                ),
+                min_members=split_min_members,
+                min_bytes=split_min_bytes,
+            )
+
+        if sync:
+            sync_api_pages(
+                pages,
+                builder.directory,
+                builder._context.project_directory,
+            )
+        else:
+            for page in pages:
+                page.generate()
+
         for page in pages:
-            page.generate()
             page.add_to_api_nav(api_nav)
 
 
+def split_large_modules(
+    pages: list[APIPage],
+    *,
+    search_path: Iterable[str],
+    min_members: Optional[int] = None,
+    min_bytes: Optional[int] = None,
+) -> list[APIPage]:
+    """Split the module `pages` over the thresholds (see
+    `doctor_genova.api_page.get_split_classes`), returning them with their
+    class pages following each.
+
+    Modules that already have a page in the docs are left alone, as are
+    classes whose page would be at the same path as another page.
+    """
+    roots = [Path(entry) for entry in search_path]
+    split_pages = []
+
+    for page in pages:
+        if page.docs_path.exists():
+            split_pages.append(page)
+            continue
+
+        source_path = next(
+            (
+                root / page.module_rel_path
+                for root in roots
+                if (root / page.module_rel_path).is_file()
+            ),
+            None,
+        )
+
+        split_classes = (
+            ()
+            if source_path is None
+            else get_split_classes(
+                source_path, min_members=min_members, min_bytes=min_bytes
+            )
+        )
+
+        split_pages.append(
+            dataclasses.replace(page, split_classes=split_classes)
+            if split_classes
+            else page
+        )
+
+    taken = {page.rel_path for page in split_pages}
+    results = []
+
+    for page in split_pages:
+        if page.split_classes:
+            split_classes = tuple(
+                class_page.class_name
+                for class_page in page.class_pages
+                if class_page.rel_path not in taken
+            )
+            if split_classes != page.split_classes:
+                _LOG.warning(
+                    "Not splitting classes %s out of %s, their pages would "
+                    "clash with other pages",
+                    ", ".join(
+                        name
+                        for name in page.split_classes
+                        if name not in split_classes
+                    ),
+                    page.module_name,
+                )
+                page = dataclasses.replace(
+                    page,
+                    split_classes=split_classes,
+                )
+
+        results.append(page)
+        results.extend(page.class_pages)
+
+    return results
+
+
 @contextmanager
 def mkdocs_api_nav(
     build_dir: Path, api_section: str = DEFAULT_API_SECTION
-) -> Generator[Optional[list], None, None]:
+) -> Generator[Optional[NavTree], None, None]:
     """Context manager to edit the API documentation section of the 'nav' in
     a `mkdocs.yml` config file in the `build_dir`, _if one exists_.
 
@@ -122,12 +260,26 @@ def mkdocs_api_nav(
     3.  We ensure that the 'nav' value has an entry called `api_header`,
         creating an empty list if needed.
 
-    4.  That `api_header` entry is yielded as the context.
+    4.  That `api_header` entry is yielded as the context, wrapped in a
+        `doctor_genova.nav.NavTree`.
 
     5.  After control is returned, the `api_header` entry is recursively sorted
         via `sort_nav`.
 
-    6.  The modified Mkdocs config is written back to `<build_dir>/mkdocs.yml`.
+    6.  The modified Mkdocs config is written back to `<build_dir>/mkdocs.yml`
+        — unless the file already has exactly that in it, in which case it's
+        left alone, so watchers (like `mkdocs serve`) don't see a change that
+        isn't there.
+
+        NOTE  That only helps pipelines that keep the config in the build
+              directory between builds. The `dr_gen_mkdocs` template (like
+              Novella's `mkdocs` one) runs `copy-files` — copying the
+              project's `mkdocs.yml`, without the API nav, over it — and
+              `mkdocs-update-config` before this at the start of every build,
+              so there it's always written.
+
+    The config is loaded and dumped with the libyaml bindings, if PyYAML has
+    them.
 
     If the file _does not_ exist:
 
@@ -149,29 +301,37 @@ def mkdocs_api_nav(
         yield None
         return
 
-    mkdocs_config = yaml.safe_load(mkdocs_yml_path.open("r", encoding="utf-8"))
+    source = mkdocs_yml_path.read_text(encoding="utf-8")
+    mkdocs_config = yaml.load(source, Loader=_YAML_LOADER)
 
-    _LOG.debug("Loaded mkdocs config\n\n%s", yaml.safe_dump(mkdocs_config))
+    _LOG.debug("Loaded mkdocs config\n\n%s", source)
 
     if "nav" not in mkdocs_config:
         _LOG.warning("'nav' not found in Mkdocs config, adding")
         mkdocs_config["nav"] = []
 
-    api_nav = ensure_child_nav(mkdocs_config["nav"], api_section)
+    api_nav = NavTree(mkdocs_config["nav"]).section(api_section)
 
     yield api_nav
 
-    sort_nav(api_nav)
+    api_nav.sort()
+
+    updated = yaml.dump(mkdocs_config, Dumper=_YAML_DUMPER)
+
+    if updated == source:
+        _LOG.debug("Mkdocs config unchanged at %s", mkdocs_yml_path)
+        return
 
-    yaml.safe_dump(mkdocs_config, mkdocs_yml_path.open("w", encoding="utf-8"))
+    mkdocs_yml_path.write_text(updated, encoding="utf-8")
 
-    _LOG.debug("Updated mkdocs config\n\n%s", yaml.safe_dump(mkdocs_config))
+    _LOG.debug("Updated mkdocs config\n\n%s", updated)
 
 
 def iter_py_files(
     *,
     search_path: Optional[Iterable[str]] = None,
     ignore_when_discovered: Container[str] = DEFAULT_IGNORE_WHEN_DISCOVERED,
+    exclude: Iterable[str] = DEFAULT_EXCLUDE,
 ) -> Generator[Path, None, None]:
     """
     Yield `Path` to the individual Python source files that make up the packages
@@ -179,23 +339,15 @@ def iter_py_files(
     the default value).
 
     Paths are _relative_ to the `search_path` entry they are found under.
+
+    Discovery is cached between calls, see `doctor_genova.discovery`.
     """
 
     if search_path is None:
         search_path = get_default_search_path()
 
-    for root_path in (Path(p).resolve() for p in search_path):
-        try:
-            discovered_items = list(docspec_python.discover(root_path))
-        except FileNotFoundError:
-            continue
-
-        for item in discovered_items:
-            if item.name not in ignore_when_discovered:
-                if isinstance(item, docspec_python.DiscoveryResult.Module):
-                    yield Path(item.filename).resolve().relative_to(root_path)
-
-                elif isinstance(item, docspec_python.DiscoveryResult.Package):
-                    package_root = Path(item.directory).resolve()
-                    for py_path in package_root.glob("**/*.py"):
-                        yield py_path.relative_to(root_path)
+    yield from discover_py_files(
+        search_path,
+        ignore_when_discovered=ignore_when_discovered,
+        exclude=exclude,
+    )
@@ -0,0 +1,5 @@
+"""Command line entry point, see `doctor_genova.caching.main`."""
+
+from doctor_genova.caching import main
+
+main()
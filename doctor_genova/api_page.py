@@ -1,19 +1,30 @@
 """Contains the `APIPage` class."""
 
-from dataclasses import dataclass
+import ast
+from dataclasses import dataclass, field
 from functools import cached_property
+import hashlib
+import io
+import json
 from pathlib import Path
 import logging
+import os
 import sys
-from typing import IO, Optional
+from typing import IO, Iterable, Literal, Optional, Union
 
 import yaml
 from novella.build import NovellaBuilder
 
-from .nav import dig_nav
+from .nav import NavTree
 
 _LOG = logging.getLogger(__name__)
 
+#: What happened to a stub when syncing it (see `APIPage.sync`).
+SyncAction = Literal["added", "changed", "unchanged", "skipped"]
+
+#: Where `sync_api_pages` records the stubs it wrote, in the build directory.
+STUB_MANIFEST_NAME = ".dr_gen_stubs.json"
+
 
 @dataclass(frozen=True)
 class APIPage:
@@ -26,6 +37,9 @@ class APIPage:
     module_rel_path: Path
     build_dir: Path
     docs_dir: Path
+    #: Top-level classes that get pages of their own (see `ClassPage`), in
+    #: which case this page becomes the index of a directory of them.
+    split_classes: tuple[str, ...] = ()
 
     @cached_property
     def is_init(self) -> bool:
@@ -55,10 +69,19 @@ class APIPage:
 
     @cached_property
     def nav_title(self) -> Optional[str]:
-        if self.is_init:
+        if self.is_init or self.split_classes:
             return None
         return self.name
 
+    @cached_property
+    def pydoc_args(self) -> str:
+        """What goes after `@pydoc` in the stub."""
+        if self.split_classes:
+            return "{} :with {{ exclude_members = {} }}".format(
+                self.module_name, json.dumps(list(self.split_classes))
+            )
+        return self.module_name
+
     @cached_property
     def build_content_dir(self) -> Path:
         return self.build_dir / "content"
@@ -75,7 +98,7 @@ class APIPage:
     def docs_path(self) -> Path:
         as_dir = self.docs_content_dir / self.module_rel_path.parent / self.name
 
-        if as_dir.exists():
+        if as_dir.exists() or (self.split_classes and not self.is_init):
             return as_dir / "index.md"
 
         return (
@@ -88,6 +111,18 @@ class APIPage:
     def rel_path(self) -> Path:
         return self.docs_path.relative_to(self.docs_content_dir)
 
+    @cached_property
+    def class_pages(self) -> tuple["ClassPage", ...]:
+        return tuple(
+            ClassPage(
+                module_rel_path=self.module_rel_path,
+                build_dir=self.build_dir,
+                docs_dir=self.docs_dir,
+                class_name=class_name,
+            )
+            for class_name in self.split_classes
+        )
+
     def print_stub(self, file: IO[str] = sys.stdout) -> None:
         print("---", file=file)
         yaml.safe_dump(self.metadata, file)
@@ -98,14 +133,77 @@ class APIPage:
         print("=" * 78, file=file)
         print("", file=file)
 
-        print(f"@pydoc {self.module_name}", file=file)
+        print(f"@pydoc {self.pydoc_args}", file=file)
         print("", file=file)
 
+        if self.split_classes:
+            print("Classes", file=file)
+            print("-" * 78, file=file)
+            print("", file=file)
+            for page in self.class_pages:
+                print(f"-   `{page.title}`", file=file)
+            print("", file=file)
+
+    @cached_property
+    def stub(self) -> str:
+        """What `print_stub` prints."""
+        buffer = io.StringIO()
+        self.print_stub(buffer)
+        return buffer.getvalue()
+
+    @cached_property
+    def stub_digest(self) -> str:
+        return _hash_stub(self.stub)
+
+    def sync(self, previous_digest: Optional[str] = None) -> SyncAction:
+        """Like `generate`, but tells apart new, changed and unchanged stubs,
+        and doesn't write the file if it already has exactly the stub in it.
+
+        `previous_digest` is the `stub_digest` of the last stub written to
+        the file, if known. That's what decides if the stub is unchanged,
+        rather than what's in the file, since Novella expands the `@pydoc`
+        tags of the stubs in the build directory _in place_. A stub that's
+        been expanded is written again (so it gets re-rendered), but still
+        counts as unchanged.
+        """
+        log = self.logger().getChild("sync")
+
+        if self.docs_path.exists():
+            log.info("Page %s exists at %s", self.title, self.docs_path)
+            return "skipped"
+
+        content = self.stub.encode("utf-8")
+
+        try:
+            current = self.build_path.read_bytes()
+        except FileNotFoundError:
+            current = None
+
+        if current == content:
+            return "unchanged"
+
+        if current is None:
+            action: SyncAction = "added"
+        elif previous_digest == self.stub_digest:
+            action = "unchanged"
+        else:
+            action = "changed"
+
+        self.build_path.parent.mkdir(parents=True, exist_ok=True)
+        self.build_path.write_bytes(content)
+
+        if action == "unchanged":
+            log.debug("Restored %s page at %s", self.title, self.rel_path)
+        else:
+            log.info("Generated %s page at %s", self.title, self.rel_path)
+
+        return action
+
     def generate(self) -> bool:
         log = self.logger().getChild("generate")
 
         if self.docs_path.exists():
-            log.info("Page %s exists at %s", self.module_name, self.docs_path)
+            log.info("Page %s exists at %s", self.title, self.docs_path)
             return False
 
         self.build_path.parent.mkdir(parents=True, exist_ok=True)
@@ -113,17 +211,233 @@ class APIPage:
         with self.build_path.open("w", encoding="utf-8") as file:
             self.print_stub(file)
 
-        log.info("Generated %s page at %s", self.module_name, self.rel_path)
+        log.info("Generated %s page at %s", self.title, self.rel_path)
 
         return True
 
-    def add_to_api_nav(self, api_nav: Optional[list]) -> None:
+    def add_to_api_nav(self, api_nav: Union[None, list, NavTree]) -> None:
         if api_nav is None:
             return
 
-        parent_nav = dig_nav(api_nav, self.rel_path.parent.parts)
+        if not isinstance(api_nav, NavTree):
+            api_nav = NavTree(api_nav)
 
-        if self.nav_title:
-            parent_nav.append({self.nav_title: str(self.rel_path)})
-        else:
-            parent_nav.append(str(self.rel_path))
+        api_nav.dig(self.rel_path.parent.parts).add_page(
+            str(self.rel_path), self.nav_title or None
+        )
+
+
+@dataclass(frozen=True, kw_only=True)
+class ClassPage(APIPage):
+    """Page of a top-level class of a module that's split up (see
+    `APIPage.split_classes`), next to the module's page.
+    """
+
+    class_name: str
+
+    @cached_property
+    def name(self) -> str:
+        return self.class_name
+
+    @cached_property
+    def title(self) -> str:
+        return f"{self.module_name}.{self.class_name}"
+
+    @cached_property
+    def nav_title(self) -> Optional[str]:
+        return self.class_name
+
+    @cached_property
+    def pydoc_args(self) -> str:
+        return self.title
+
+    @cached_property
+    def docs_path(self) -> Path:
+        module_dir = self.docs_content_dir / self.module_rel_path.parent
+        if not self.is_init:
+            module_dir /= self.module_rel_path.stem
+        return module_dir / (self.class_name + ".md")
+
+
+def count_members(module: ast.Module) -> int:
+    """Count the names a module defines — functions, classes and variables —
+    along with those its classes define, recursively.
+
+    ```python
+    >>> count_members(ast.parse(
+    ...     "X = 1\\n"
+    ...     "def f(): pass\\n"
+    ...     "class C:\\n"
+    ...     "    y: int\\n"
+    ...     "    def g(self): pass\\n"
+    ... ))
+    5
+
+    ```
+    """
+    count = 0
+    bodies = [module.body]
+
+    while bodies:
+        for node in bodies.pop():
+            if isinstance(node, ast.ClassDef):
+                bodies.append(node.body)
+                count += 1
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                count += 1
+            elif isinstance(node, ast.Assign):
+                count += len(node.targets)
+            elif isinstance(node, ast.AnnAssign):
+                count += 1
+
+    return count
+
+
+def _is_documented_class(node: ast.ClassDef) -> bool:
+    # Roughly what the default `FilterProcessor` keeps: public classes with a
+    # docstring, or with documented public methods.
+    if node.name.startswith("_"):
+        return False
+    if ast.get_docstring(node):
+        return True
+    return any(
+        isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and not member.name.startswith("_")
+        and ast.get_docstring(member)
+        for member in node.body
+    )
+
+
+def get_split_classes(
+    source_path: Path,
+    *,
+    min_members: Optional[int] = None,
+    min_bytes: Optional[int] = None,
+) -> tuple[str, ...]:
+    """Get the top-level classes in the module at `source_path` that should
+    get pages of their own, which is the documented public ones if the module
+    has at least `min_members` members (see `count_members`) or its source is
+    at least `min_bytes` long. Neither given means no splitting.
+
+    Only the source is looked at (nothing is imported), so which classes are
+    documented is a guess; a class that ends up filtered out of the docs
+    gets an empty page.
+    """
+    if min_members is None and min_bytes is None:
+        return ()
+
+    try:
+        data = source_path.read_bytes()
+        module = ast.parse(data, str(source_path))
+    except (OSError, SyntaxError, ValueError):
+        _LOG.debug("Can't parse %s", source_path, exc_info=True)
+        return ()
+
+    if not (
+        (min_bytes is not None and len(data) >= min_bytes)
+        or (min_members is not None and count_members(module) >= min_members)
+    ):
+        return ()
+
+    class_names: dict[str, None] = {}
+    for node in module.body:
+        if isinstance(node, ast.ClassDef) and _is_documented_class(node):
+            class_names[node.name] = None
+
+    return tuple(class_names)
+
+
+@dataclass
+class StubSyncResult:
+    """What `sync_api_pages` did, by stub path (relative to the build content
+    directory).
+    """
+
+    added: list[Path] = field(default_factory=list)
+    changed: list[Path] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+    unchanged: list[Path] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return "{} added, {} changed, {} removed, {} unchanged".format(
+            len(self.added),
+            len(self.changed),
+            len(self.removed),
+            len(self.unchanged),
+        )
+
+
+def sync_api_pages(
+    pages: Iterable[APIPage],
+    build_dir: Path,
+    docs_dir: Optional[Path] = None,
+) -> StubSyncResult:
+    """Bring the stubs in `build_dir` in line with `pages`: write the ones
+    that are new or changed (see `APIPage.sync`) and remove the ones written
+    by an earlier sync whose module is gone (or now has a page of its own).
+
+    Stubs written are recorded in `STUB_MANIFEST_NAME` in `build_dir`, along
+    with a hash of their content, which is what they're compared to next
+    time. A stale stub is only removed if it's ours: it's still exactly what
+    was written, or — given the `docs_dir` the pages came from — there's no
+    page in the docs that could have been copied over it (so it's our stub,
+    expanded in place). Anything else is left alone.
+    """
+    result = StubSyncResult()
+    manifest_path = build_dir / STUB_MANIFEST_NAME
+    content_dir = build_dir / "content"
+
+    try:
+        previous: dict[str, str] = json.loads(
+            manifest_path.read_text(encoding="utf-8")
+        )
+    except (OSError, ValueError):
+        previous = {}
+
+    written: dict[str, str] = {}
+
+    for page in pages:
+        rel_path = page.rel_path.as_posix()
+        action = page.sync(previous.get(rel_path))
+        if action == "skipped":
+            continue
+        getattr(result, action).append(page.rel_path)
+        written[rel_path] = page.stub_digest
+
+    for rel_path, digest in previous.items():
+        if rel_path in written:
+            continue
+
+        path = content_dir / rel_path
+        try:
+            if _hash_stub(path.read_text(encoding="utf-8")) != digest and (
+                docs_dir is None or (docs_dir / "content" / rel_path).exists()
+            ):
+                continue
+            path.unlink()
+        except (OSError, ValueError):
+            continue
+
+        result.removed.append(Path(rel_path))
+        _LOG.info("Removed stale page stub at %s", rel_path)
+
+        # Clean up directories left empty, up to the content directory
+        parent = path.parent
+        while parent != content_dir and content_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(written, indent=2), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+    _LOG.info("Synced API page stubs: %s", result)
+
+    return result
+
+
+def _hash_stub(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,270 @@
+"""Records what each Markdown file's output depended on, so that files can be
+reused as-is on later builds when none of it has changed.
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Iterable, Literal, Optional, Union
+
+from .caching import get_package_version
+
+_LOG = logging.getLogger(__name__)
+
+#: How a page depends on a module: it either embeds (`@pydoc`) objects from
+#: it, or only links to them.
+DependencyKind = Literal["embed", "link"]
+
+#: Stand-in module name for dependencies that could be affected by a change to
+#: _any_ module, like names that didn't resolve (a new object could make them
+#: resolve).
+ANY_MODULE = "*"
+
+#: Stand-in module name whose _version_ covers what names outside the package
+#: resolve to: the external resolvers and the Python version. It changing is a
+#: change like any other, so pages depending on `ANY_MODULE` — which includes
+#: every page with an external or unresolved link — get their links
+#: re-checked.
+EXTERNAL_MODULE = "<external>"
+
+
+@dataclass
+class PydocDependency:
+    """A `@pydoc` tag: the name and options it was given, and the render
+    cache key it came out to (`None` if the name didn't resolve).
+    """
+
+    fqn: str
+    options: dict[str, Any]
+    render_key: Optional[str]
+
+
+@dataclass
+class ManifestEntry:
+    """What went into — and came out of — preprocessing one Markdown file.
+
+    `links` maps each name that was looked up (from backticks or `@pylink`
+    tags) to the link it resolved to, misses included, since a name that
+    didn't resolve last time might now.
+
+    `embed_modules` and `link_modules` are the names of the modules the output
+    depends on (possibly including `ANY_MODULE`), which is what the
+    `BuildManifest` dependency graph is made of.
+    """
+
+    input_digest: str
+    output: str = ""
+    scope_names: list[str] = field(default_factory=list)
+    pydocs: list[PydocDependency] = field(default_factory=list)
+    links: dict[str, Optional[str]] = field(default_factory=dict)
+    embed_modules: list[str] = field(default_factory=list)
+    link_modules: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ManifestEntry":
+        return cls(
+            input_digest=data["input_digest"],
+            output=data["output"],
+            scope_names=list(data["scope_names"]),
+            pydocs=[PydocDependency(**x) for x in data["pydocs"]],
+            links=dict(data["links"]),
+            embed_modules=list(data["embed_modules"]),
+            link_modules=list(data["link_modules"]),
+        )
+
+    def iter_dependencies(self) -> Iterable[tuple[str, DependencyKind]]:
+        for module_name in self.embed_modules:
+            yield module_name, "embed"
+        for module_name in self.link_modules:
+            if module_name not in self.embed_modules:
+                yield module_name, "link"
+
+
+class BuildManifest:
+    """`ManifestEntry` by Markdown file, kept in memory across reruns and
+    optionally saved to a JSON file between builds.
+
+    Along with the entries, the manifest keeps a _version_ of each module (see
+    `DrGenPreprocessor`) and a reverse dependency graph from module names to
+    the entries that depend on them. Every entry is valid with respect to
+    the `module_versions`: `update_module_versions` drops any entry that is
+    affected by a version change and wasn't refreshed since.
+
+    A saved manifest is only loaded back by the same `doctor-genova` version
+    that wrote it, since the output format could differ between versions.
+    """
+
+    _entries: dict[str, ManifestEntry]
+    _dependents: defaultdict[str, dict[str, DependencyKind]]
+    _module_versions: dict[str, str]
+    _path: Optional[Path]
+    _version: str
+
+    def __init__(self, path: Union[None, str, Path] = None) -> None:
+        self._entries = {}
+        self._dependents = defaultdict(dict)
+        self._module_versions = {}
+        self._path = None if path is None else Path(path)
+        self._version = get_package_version("doctor-genova")
+
+        if self._path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    @property
+    def module_versions(self) -> dict[str, str]:
+        return self._module_versions
+
+    def get(self, key: str) -> Optional[ManifestEntry]:
+        return self._entries.get(key)
+
+    def put(self, key: str, entry: ManifestEntry) -> None:
+        self.discard(key)
+        self._entries[key] = entry
+        for module_name, kind in entry.iter_dependencies():
+            self._dependents[module_name][key] = kind
+
+    def discard(self, key: str) -> None:
+        if (entry := self._entries.pop(key, None)) is None:
+            return
+        for module_name, _kind in entry.iter_dependencies():
+            if (dependents := self._dependents.get(module_name)) is not None:
+                dependents.pop(key, None)
+                if not dependents:
+                    del self._dependents[module_name]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dependents.clear()
+        self._module_versions = {}
+
+    def get_changed_modules(self, module_versions: dict[str, str]) -> set[str]:
+        """Names of the modules that were added, removed or changed between
+        our `module_versions` and `module_versions`, plus `ANY_MODULE` if
+        there are any.
+        """
+        changed = {
+            name
+            for name in self._module_versions.keys() | module_versions.keys()
+            if self._module_versions.get(name) != module_versions.get(name)
+        }
+        if changed:
+            changed.add(ANY_MODULE)
+        return changed
+
+    def get_dependents(
+        self, module_names: Iterable[str]
+    ) -> dict[str, DependencyKind]:
+        """Keys of the entries that depend on any of `module_names`, and how.
+        An entry that embeds one module and links to another comes out as
+        `"embed"`.
+        """
+        dependents: dict[str, DependencyKind] = {}
+        for module_name in module_names:
+            for key, kind in self._dependents.get(module_name, {}).items():
+                if dependents.get(key) != "embed":
+                    dependents[key] = kind
+        return dependents
+
+    def update_module_versions(
+        self, module_versions: dict[str, str], refreshed: Iterable[str]
+    ) -> None:
+        """Move to `module_versions`, discarding the entries affected by the
+        change that are not in `refreshed` (the keys of the entries that were
+        validated or re-created against `module_versions`).
+        """
+        refreshed = set(refreshed)
+        changed = self.get_changed_modules(module_versions)
+
+        for key in self.get_dependents(changed):
+            if key not in refreshed:
+                self.discard(key)
+
+        self._module_versions = dict(module_versions)
+
+    def _load(self) -> None:
+        assert self._path is not None
+
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            _LOG.warning(
+                "Failed to read build manifest at %s, ignoring",
+                self._path,
+                exc_info=True,
+            )
+            return
+
+        if data.get("version") != self._version:
+            _LOG.info(
+                "Build manifest at %s is from version %s (not %s), ignoring",
+                self._path,
+                data.get("version"),
+                self._version,
+            )
+            return
+
+        try:
+            entries = {
+                key: ManifestEntry.from_json(entry)
+                for key, entry in data["entries"].items()
+            }
+            module_versions = dict(data["module_versions"])
+        except (KeyError, TypeError):
+            _LOG.warning(
+                "Malformed build manifest at %s, ignoring",
+                self._path,
+                exc_info=True,
+            )
+            return
+
+        for key, entry in entries.items():
+            self.put(key, entry)
+        self._module_versions = module_versions
+
+    def save(self) -> None:
+        """Write the manifest to its `path` (if it has one), atomically.
+
+        The dependency graph isn't saved; it's rebuilt from the entries on
+        load.
+        """
+        if self._path is None:
+            return
+
+        data = json.dumps(
+            {
+                "version": self._version,
+                "module_versions": self._module_versions,
+                "entries": {
+                    key: asdict(entry) for key, entry in self._entries.items()
+                },
+            },
+            separators=(",", ":"),
+        )
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self._path.parent, prefix=".tmp-manifest-"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,399 @@
+"""Caching support shared by the rest of the package.
+
+##### Command Line #####
+
+The on-disk caches in a `doctor_genova.preprocessor.DrGenPreprocessor`
+`cache_dir` (see `DISK_CACHE_NAMES`) can be pruned (or cleared) from the
+command line:
+
+    python -m doctor_genova prune <cache_dir> --max-bytes 100000000
+    python -m doctor_genova clear <cache_dir>
+
+Like in the build, `--max-bytes` is split evenly between them. Only cache
+entries are removed; the build manifest, standard library index and whatever
+else lives in `cache_dir` are left alone.
+
+"""
+
+from argparse import ArgumentParser
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable, Generic, Iterable, Optional, TypeVar, Union
+
+_LOG = logging.getLogger(__name__)
+
+#: Default size limit for a `DiskCache`, in bytes.
+#:
+#: ```python
+#: 256 * 1024 * 1024
+#: ```
+#:
+DEFAULT_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+#: Subdirectories of a `doctor_genova.preprocessor.DrGenPreprocessor`
+#: `cache_dir` that hold a `DiskCache` each (parsed modules and `@pydoc`
+#: renders). Its `cache_max_bytes` is split evenly between them.
+DISK_CACHE_NAMES = ("modules", "renders")
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+def get_package_version(name: str) -> str:
+    """Get the installed version of distribution `name`, or `"unknown"` if it
+    can't be found (running from a source checkout, for instance).
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_user_cache_dir() -> Path:
+    """Where to cache things that aren't specific to a project, like the
+    standard library index: `$XDG_CACHE_HOME/doctor-genova`, defaulting to
+    `~/.cache/doctor-genova`.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(base).expanduser() / "doctor-genova"
+
+
+def make_cache_key(*parts: object) -> str:
+    """Hash `parts` into a key suitable for a `DiskCache`."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return "{} hits, {} misses ({:.1%} hit rate)".format(
+            self.hits, self.misses, self.hit_rate
+        )
+
+
+class LRUCache(Generic[K, V]):
+    """An in-memory mapping bounded by the total size of its values, evicting
+    the least recently used entries first.
+
+    Sizes are measured with `sizeof` (`len` by default, so characters for
+    `str` values — close enough for a budget).
+
+    ##### Examples #####
+
+    ```python
+    >>> cache = LRUCache(max_bytes=8)
+    >>> cache.put("a", "1234")
+    >>> cache.put("b", "5678")
+    >>> cache.get("a")
+    '1234'
+    >>> cache.put("c", "90")
+    >>> "b" in cache
+    False
+    >>> cache.size
+    6
+    >>> str(cache.stats)
+    '1 hits, 0 misses (100.0% hit rate)'
+
+    ```
+    """
+
+    _entries: "OrderedDict[K, tuple[V, int]]"
+    _max_bytes: int
+    _sizeof: Callable[[V], int]
+    _size: int
+    _stats: CacheStats
+
+    def __init__(
+        self, max_bytes: int, sizeof: Callable[[V], int] = len  # type: ignore
+    ) -> None:
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._size = 0
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._stats
+
+    def get(self, key: K) -> Optional[V]:
+        if (entry := self._entries.get(key)) is None:
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        size = self._sizeof(value)
+
+        if (old := self._entries.pop(key, None)) is not None:
+            self._size -= old[1]
+
+        # Something bigger than the whole cache would just evict everything
+        # else and then itself, so don't bother.
+        if size > self._max_bytes:
+            return
+
+        self._entries[key] = (value, size)
+        self._size += size
+
+        while self._size > self._max_bytes:
+            _key, (_value, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+@dataclass(frozen=True)
+class PruneResult:
+    removed_files: int
+    removed_bytes: int
+    remaining_bytes: int
+
+
+class DiskCache:
+    """A content-addressed directory of `bytes` blobs with size-bounded,
+    least-recently-used eviction.
+
+    Entries are stored at `<directory>/<key[:2]>/<key>`, and only files laid
+    out like that count as entries, so nothing else in the directory is ever
+    pruned. Reading an entry bumps its mtime, which is what eviction goes by,
+    so it works the same on file systems mounted with `noatime`.
+
+    Writes are atomic (write to a temporary file, then rename), so concurrent
+    builds sharing a cache directory never see partial entries.
+    """
+
+    _directory: Path
+    _max_bytes: int
+    _size: Optional[int]
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES,
+    ) -> None:
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._size = None
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def path_for(self, key: str) -> Path:
+        return self._directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # What's replaced (if anything) doesn't count towards the size anymore
+        old_size = self._get_entry_size(path)
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += len(data) - old_size
+
+        if self._size > self._max_bytes:
+            # Prune down a bit further than needed so we're not doing it on
+            # every single write once we hit the limit.
+            self._size = self.prune(self._max_bytes * 9 // 10).remaining_bytes
+
+    def discard(self, key: str) -> None:
+        path = self.path_for(key)
+        size = self._get_entry_size(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if self._size is not None:
+            self._size -= size
+
+    def _get_entry_size(self, path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def iter_entries(self) -> Iterable[tuple[Path, os.stat_result]]:
+        if not self._directory.is_dir():
+            return
+        for subdir in self._directory.iterdir():
+            if len(subdir.name) != 2 or not subdir.is_dir():
+                continue
+            for path in subdir.iterdir():
+                if len(path.name) <= 2 or path.name[:2] != subdir.name:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.is_file():
+                    yield path, stat
+
+    def size(self) -> int:
+        return sum(stat.st_size for _path, stat in self.iter_entries())
+
+    def prune(self, max_bytes: Optional[int] = None) -> PruneResult:
+        """Evict least-recently-used entries until the cache takes up at most
+        `max_bytes` (defaults to the `max_bytes` the cache was created with).
+        """
+        if max_bytes is None:
+            max_bytes = self._max_bytes
+
+        entries = sorted(
+            self.iter_entries(), key=lambda entry: entry[1].st_mtime_ns
+        )
+        total = sum(stat.st_size for _path, stat in entries)
+        removed_files = 0
+        removed_bytes = 0
+
+        for path, stat in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            removed_files += 1
+            removed_bytes += stat.st_size
+
+        if removed_files:
+            _LOG.info(
+                "Pruned %d entries (%d bytes) from cache at %s",
+                removed_files,
+                removed_bytes,
+                self._directory,
+            )
+
+        self._size = total
+
+        return PruneResult(
+            removed_files=removed_files,
+            removed_bytes=removed_bytes,
+            remaining_bytes=total,
+        )
+
+    def clear(self) -> PruneResult:
+        return self.prune(0)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(
+        prog="python -m doctor_genova",
+        description="Manage a Dr. Genova cache directory.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prune_parser = subparsers.add_parser(
+        "prune", help="Evict least-recently-used entries down to a size"
+    )
+    prune_parser.add_argument("directory", type=Path)
+    prune_parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_DISK_CACHE_MAX_BYTES,
+        help="Size to prune down to (default: %(default)s)",
+    )
+
+    clear_parser = subparsers.add_parser("clear", help="Remove all entries")
+    clear_parser.add_argument("directory", type=Path)
+
+    args = parser.parse_args(argv)
+
+    for name in DISK_CACHE_NAMES:
+        cache = DiskCache(args.directory / name)
+
+        if args.command == "prune":
+            result = cache.prune(args.max_bytes // len(DISK_CACHE_NAMES))
+        else:
+            result = cache.clear()
+
+        print(
+            "{}: removed {} file(s), {} byte(s); {} byte(s) remaining".format(
+                name,
+                result.removed_files,
+                result.removed_bytes,
+                result.remaining_bytes,
+            )
+        )
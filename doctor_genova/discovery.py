@@ -0,0 +1,291 @@
+"""Finding the Python source files in a _search path_, which is what API pages
+are generated for.
+
+Modules and packages are found at the top of each search path entry the same
+way `docspec_python.discover` does it. Packages are then walked with
+`os.scandir`, skipping entire directories that match an `exclude` pattern
+(like `__pycache__`, or build output and vendored code you add yourself)
+instead of listing everything under them first.
+
+Walks are cached per search path entry. A cached walk is reused as long as
+none of the directories it looked at has been modified since (adding,
+removing or renaming something changes its directory's modification time),
+so checking it just takes a `stat` per directory.
+"""
+
+from dataclasses import dataclass
+from fnmatch import translate
+import logging
+import os
+from pathlib import Path
+import re
+from collections.abc import Container
+from typing import Iterable, Optional, Union
+
+_LOG = logging.getLogger(__name__)
+
+#: Default patterns of the files to include from packages.
+#:
+#: ```python
+#: ("*.py",)
+#: ```
+#:
+DEFAULT_INCLUDE = ("*.py",)
+
+#: Default patterns of files and directories to leave out of packages.
+#:
+#: ```python
+#: ("__pycache__", ".*")
+#: ```
+#:
+DEFAULT_EXCLUDE = ("__pycache__", ".*")
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    """Compile glob `patterns` into a single regular expression matching any
+    of them, or `None` if there are none.
+
+    ```python
+    >>> compile_patterns(["*.py", "build"]).match("build") is not None
+    True
+
+    >>> compile_patterns([]) is None
+    True
+
+    ```
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(translate(pattern) for pattern in patterns))
+
+
+@dataclass
+class _Walk:
+    """What walking a search path entry found: `(top-level name, relative
+    path)` of each file, and the modification time of each directory looked
+    at, to tell if it's still current.
+    """
+
+    files: list[tuple[str, str]]
+    dir_mtimes: dict[str, int]
+
+    def is_current(self) -> bool:
+        for path, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+
+_walks: dict[tuple[str, str, str], _Walk] = {}
+
+
+def clear_cache() -> None:
+    _walks.clear()
+
+
+def discover_py_files(
+    search_path: Iterable[Union[str, Path]],
+    *,
+    ignore_when_discovered: Container[str] = (),
+    include: Iterable[str] = DEFAULT_INCLUDE,
+    exclude: Iterable[str] = DEFAULT_EXCLUDE,
+) -> list[Path]:
+    """List the Python source files of the modules and packages found in
+    `search_path`, _relative_ to the entry they were found under.
+
+    Top-level modules and packages named in `ignore_when_discovered` are left
+    out. Within packages, files have to match an `include` pattern, and files
+    and directories matching an `exclude` pattern are left out. Patterns are
+    matched against both the name and the path relative to the search path
+    entry (with `/` separators), so `"build"` excludes any directory named
+    that, while `"my_pkg/_vendor"` just the one.
+
+    Files found under more than one (overlapping) entry are only listed for
+    the first.
+    """
+    return [
+        Path(rel_path)
+        for _root, rel_path in _iter_walked_files(
+            search_path, ignore_when_discovered, include, exclude
+        )
+    ]
+
+
+def discover_py_modules(
+    search_path: Iterable[Union[str, Path]],
+    *,
+    ignore_when_discovered: Container[str] = (),
+    exclude: Iterable[str] = DEFAULT_EXCLUDE,
+) -> list[tuple[str, str]]:
+    """List `(module name, filename)` of the Python modules found in
+    `search_path`, the way `docspec_python.iter_package_files` does, but
+    found (and excluded) the same way as by `discover_py_files`.
+
+    A module found under more than one entry — like a namespace package
+    spread over several — is only listed for the first.
+    """
+    seen_names: set[str] = set()
+    results: list[tuple[str, str]] = []
+
+    for root, rel_path in _iter_walked_files(
+        search_path, ignore_when_discovered, DEFAULT_INCLUDE, exclude
+    ):
+        module_name = module_name_from_path(rel_path)
+        if module_name in seen_names:
+            continue
+        seen_names.add(module_name)
+        results.append((module_name, os.path.join(root, rel_path)))
+
+    return results
+
+
+def module_name_from_path(rel_path: str) -> str:
+    """Name of the module in the source file at `rel_path`, relative to its
+    search path entry.
+
+    ```python
+    >>> module_name_from_path(os.path.join("pkg", "sub", "__init__.py"))
+    'pkg.sub'
+
+    ```
+    """
+    parts = rel_path[: -len(".py")].split(os.sep)
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def _iter_walked_files(
+    search_path: Iterable[Union[str, Path]],
+    ignore_when_discovered: Container[str],
+    include: Iterable[str],
+    exclude: Iterable[str],
+) -> Iterable[tuple[str, str]]:
+    """Yield `(search path entry, relative path)` of each file found, walking
+    entries again only if their cached walk is out of date.
+    """
+    include_re = compile_patterns(include)
+    exclude_re = compile_patterns(exclude)
+    cache_key_patterns = (
+        include_re.pattern if include_re else "",
+        exclude_re.pattern if exclude_re else "",
+    )
+
+    seen_roots: set[str] = set()
+    seen_files: set[str] = set()
+
+    for entry in search_path:
+        root = str(Path(entry).resolve())
+        if root in seen_roots:
+            continue
+        seen_roots.add(root)
+
+        key = (root, *cache_key_patterns)
+        walk = _walks.get(key)
+        if walk is None or not walk.is_current():
+            try:
+                walk = _walks[key] = _walk_root(root, include_re, exclude_re)
+            except FileNotFoundError:
+                _walks.pop(key, None)
+                continue
+
+        for top_name, rel_path in walk.files:
+            if top_name in ignore_when_discovered:
+                continue
+            abs_path = os.path.join(root, rel_path)
+            if abs_path in seen_files:
+                continue
+            seen_files.add(abs_path)
+            yield root, rel_path
+
+
+def _matches(pattern: Optional[re.Pattern], name: str, rel_path: str) -> bool:
+    return pattern is not None and (
+        pattern.match(name) is not None or pattern.match(rel_path) is not None
+    )
+
+
+def _walk_root(
+    root: str,
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
+) -> _Walk:
+    _LOG.debug("Walking search path entry %s", root)
+
+    walk = _Walk(files=[], dir_mtimes={root: os.stat(root).st_mtime_ns})
+
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        name = entry.name
+
+        # Same as `docspec_python.discover`
+        if name.endswith(".py") and name.count(".") == 1:
+            walk.files.append((name[:-3], name))
+            continue
+
+        try:
+            if not entry.is_dir():
+                continue
+            # The directory changes if `__init__.py` is added or removed
+            walk.dir_mtimes[entry.path] = entry.stat().st_mtime_ns
+        except OSError:
+            continue
+
+        if os.path.isfile(os.path.join(entry.path, "__init__.py")):
+            _walk_package(walk, entry.path, name, name, include_re, exclude_re)
+
+    return walk
+
+
+def _walk_package(
+    walk: _Walk,
+    package_dir: str,
+    package_name: str,
+    rel_dir: str,
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
+) -> None:
+    # Directories already walked, by device and inode, so symlink loops end
+    visited: set[tuple[int, int]] = set()
+    stack = [(package_dir, rel_dir)]
+
+    while stack:
+        directory, rel_dir = stack.pop()
+
+        try:
+            stat = os.stat(directory)
+            if (stat.st_dev, stat.st_ino) in visited:
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            walk.dir_mtimes[directory] = stat.st_mtime_ns
+
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = rel_dir + "/" + entry.name
+
+            if _matches(exclude_re, entry.name, rel_path):
+                continue
+
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if is_dir:
+                subdirs.append((entry.path, rel_path))
+            elif _matches(include_re, entry.name, rel_path):
+                walk.files.append((package_name, rel_path.replace("/", os.sep)))
+
+        # Reversed, so they come off the stack in order
+        stack.extend(reversed(subdirs))
@@ -2,21 +2,57 @@ from dataclasses import dataclass
 import logging
 from pathlib import Path
 import re
-from typing import Optional
-from doctor_genova.lib import replace_inline_tags_in
+from typing import Iterable, Optional, Protocol, Sequence, runtime_checkable
 
 from pydoc_markdown.util.docspec import ApiSuite
 from pydoc_markdown.interfaces import Processor, Resolver, ResolverV2
-from docspec import ApiObject, Module, visit
-from novella.markdown.tagparser import Tag
+from docspec import ApiObject, HasMembers, Module, visit
+from novella.markdown.tagparser import Tag, parse_inline_tags, replace_tags
 
+from .indexed_api_suite import IndexedApiSuite
 from .stdlib_resolver import StdlibResolver
 
 _LOG = logging.getLogger(__name__)
 
+#: A name looked up from a docstring: the `id` of the object it resolves
+#: relative to (see `DocstringBacktickProcessor._get_scope`) and the name.
+RefKey = tuple[int, str]
+
+
+@runtime_checkable
+class BatchRefResolver(Protocol):
+    """A `Resolver` that can also resolve many references at once, returning
+    what `resolve_ref` would for each, in order. `DocstringBacktickProcessor`
+    uses it when its resolver has it.
+    """
+
+    def resolve_refs(
+        self, refs: Sequence[tuple[ApiObject, str]]
+    ) -> list[None | str]:
+        ...
+
 
 @dataclass
 class DocstringBacktickProcessor(Processor):
+    """Replaces backtick spans and `{@pylink}` tags in docstrings with links.
+
+    Resolution is done in batches rather than match-by-match:
+
+    1.  **Collect** every docstring that has something for us, along with the
+        names in it.
+    2.  **Resolve** each distinct name, per scope, once. Since functions and
+        variables don't have members, names in their docstrings resolve the
+        same as in their parent's, so all the methods of a class share one
+        lookup per name.
+    3.  **Substitute** the results back into the docstrings.
+
+    Backticks are done first, then `{@pylink}` tags (in what the backticks
+    turned into), same as doing them one after the other per docstring.
+
+    Names that don't resolve to an object in the suite go to the `Resolver`
+    passed to `process` in one batch, if it is a `BatchRefResolver`.
+    """
+
     BACKTICK_RE = re.compile(
         r"\B`([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)`"
     )
@@ -26,90 +62,191 @@ class DocstringBacktickProcessor(Processor):
     def process(
         self, modules: list[Module], resolver: Optional[Resolver]
     ) -> None:
-        visit(
-            modules,
-            lambda x: self._preprocess_refs(x, ApiSuite(modules), resolver),
+        # Build the suite (and its indexes) _once_ for the whole run; we only
+        # change docstrings, so it stays valid throughout.
+        self.process_nodes(
+            self._collect_nodes(modules), IndexedApiSuite(modules), resolver
         )
 
-    def _preprocess_refs(
+    def process_nodes(
         self,
-        node: ApiObject,
+        nodes: Iterable[ApiObject],
         suite: ApiSuite,
         resolver: Optional[Resolver],
     ) -> None:
-        if not node.docstring:
-            return
-
-        node.docstring.content = self.BACKTICK_RE.sub(
-            lambda match: self._replace_backtick_match(
-                node, suite, resolver, match
+        """Process the docstrings of `nodes` (which don't need to be all the
+        objects in `suite`; see `doctor_genova.processor_pipeline`).
+        """
+        nodes = [node for node in nodes if self._has_refs(node)]
+        links: dict[RefKey, Optional[str]] = {}
+
+        # Backticks
+        self._resolve_all(
+            suite,
+            resolver,
+            links,
+            (
+                (node, match.group(1))
+                for node in nodes
+                for match in self.BACKTICK_RE.finditer(node.docstring.content)
             ),
-            node.docstring.content,
         )
+        for node in nodes:
+            self._substitute_backticks(node, links)
+
+        # `{@pylink}` tags
+        tagged = [
+            (node, tags)
+            for node in nodes
+            if "{@pylink" in node.docstring.content
+            and (
+                tags := [
+                    tag
+                    for tag in parse_inline_tags(node.docstring.content)
+                    if tag.name == "pylink"
+                ]
+            )
+        ]
+        self._resolve_all(
+            suite,
+            resolver,
+            links,
+            ((node, tag.args.strip()) for node, tags in tagged for tag in tags),
+        )
+        for node, tags in tagged:
+            self._substitute_pylink_tags(node, tags, links)
+
+        _LOG.info(
+            "Resolved %d distinct docstring reference(s) in %d docstring(s)",
+            len(links),
+            len(nodes),
+        )
+
+    def _collect_nodes(self, modules: list[Module]) -> list[ApiObject]:
+        nodes: list[ApiObject] = []
 
-        replace_inline_tags_in(
-            node.docstring,
-            "pylink",
-            lambda tag: self._replace_pylink_tag(node, suite, resolver, tag),
+        visit(modules, nodes.append)
+        return nodes
+
+    def _has_refs(self, node: ApiObject) -> bool:
+        # Most docstrings have nothing for us, so check before doing any work
+        return bool(
+            (docstring := node.docstring)
+            and ("`" in docstring.content or "{@pylink" in docstring.content)
         )
 
-    def _resolve_link(
+    def _get_scope(self, node: ApiObject) -> ApiObject:
+        """Get the object names in `node`'s docstring effectively resolve
+        relative to: `node` itself if it has members, otherwise its parent
+        (looking in the members of something without any finds nothing, so
+        resolution moves right on to the parent).
+        """
+        if isinstance(node, HasMembers) or (parent := node.parent) is None:
+            return node
+        return parent
+
+    def _resolve_all(
         self,
-        node: ApiObject,
         suite: ApiSuite,
         resolver: Optional[Resolver],
-        name: str,
-    ) -> None | str:
-        if api_object := self.resolver_v2.resolve_reference(suite, node, name):
-            link = "{{@link pydoc:{}}}".format(
-                ".".join(x.name for x in api_object.path)
-            )
+        links: dict[RefKey, Optional[str]],
+        refs: Iterable[tuple[ApiObject, str]],
+    ) -> None:
+        """Resolve the `(node, name)` pairs in `refs` that aren't already in
+        `links`, adding them.
+
+        Names are resolved against the suite first, and those that don't
+        resolve there are then handed to `resolver` — all at once, if it can
+        take them that way.
+        """
+        unresolved: list[tuple[RefKey, ApiObject, str]] = []
+
+        for node, name in refs:
+            scope = self._get_scope(node)
+            key = (id(scope), name)
+            if key in links:
+                continue
 
             _LOG.info(
-                "  <fg=green>TAG</fg> <fg=cyan>%s</fg> -> <fg=green>%s</fg>",
+                "processing SRC reference <fg=cyan>%s</fg> in <%s %s>",
                 name,
-                link,
+                scope.__class__.__name__,
+                scope.name,
             )
 
-            return link
+            links[key] = link = self._resolve_link(scope, suite, name)
 
-        if resolver is not None and (link := resolver.resolve_ref(node, name)):
-            return link
+            if link is None:
+                unresolved.append((key, scope, name))
 
-        return None
+        if not unresolved:
+            return
+
+        if resolver is None:
+            resolved: list[None | str] = [None] * len(unresolved)
+        elif isinstance(resolver, BatchRefResolver):
+            resolved = resolver.resolve_refs(
+                [(scope, name) for _key, scope, name in unresolved]
+            )
+        else:
+            resolved = [
+                resolver.resolve_ref(scope, name)
+                for _key, scope, name in unresolved
+            ]
+
+        for (key, _scope, name), link in zip(unresolved, resolved):
+            links[key] = link = link or None
+
+            if link is None:
+                _LOG.info(
+                    "  <fg=red>SRC</fg> <fg=cyan>%s</fg> -> <fg=red>NO MATCH</fg>",
+                    name,
+                )
+
+    def _substitute_backticks(
+        self, node: ApiObject, links: dict[RefKey, Optional[str]]
+    ) -> None:
+        scope_id = id(self._get_scope(node))
+
+        def replace(match: re.Match) -> str:
+            return links[(scope_id, match.group(1))] or match.group(0)
+
+        assert node.docstring is not None
+        node.docstring.content = self.BACKTICK_RE.sub(
+            replace, node.docstring.content
+        )
 
-    def _replace_backtick_match(
+    def _substitute_pylink_tags(
         self,
         node: ApiObject,
-        suite: ApiSuite,
-        resolver: Optional[Resolver],
-        match: re.Match,
-    ):
-        src = match.group(0)
-        name = match.group(1)
+        tags: list[Tag],
+        links: dict[RefKey, Optional[str]],
+    ) -> None:
+        scope_id = id(self._get_scope(node))
 
-        _LOG.info(
-            "processing SRC backtick <fg=cyan>%s</fg> in <%s %s>",
-            name,
-            node.__class__.__name__,
-            node.name,
+        assert node.docstring is not None
+        node.docstring.content = replace_tags(
+            node.docstring.content,
+            tags,
+            lambda tag: links[(scope_id, tag.args.strip())],
         )
 
-        if link := self._resolve_link(node, suite, resolver, name):
-            return link
+    def _resolve_link(
+        self, node: ApiObject, suite: ApiSuite, name: str
+    ) -> None | str:
+        if api_object := self.resolver_v2.resolve_reference(suite, node, name):
+            link = "{{@link pydoc:{}}}".format(
+                suite.get_fqn(api_object)
+                if isinstance(suite, IndexedApiSuite)
+                else ".".join(x.name for x in api_object.path)
+            )
 
-        _LOG.info(
-            "  <fg=red>SRC</fg> <fg=cyan>%s</fg> -> <fg=red>%s</fg>",
-            name,
-            src,
-        )
-        return src
+            _LOG.info(
+                "  <fg=green>TAG</fg> <fg=cyan>%s</fg> -> <fg=green>%s</fg>",
+                name,
+                link,
+            )
 
-    def _replace_pylink_tag(
-        self,
-        node: ApiObject,
-        suite: ApiSuite,
-        resolver: Optional[Resolver],
-        tag: Tag,
-    ):
-        return self._resolve_link(node, suite, resolver, tag.args.strip())
+            return link
+
+        return None
@@ -1,5 +1,13 @@
-from dataclasses import dataclass
-from typing import Protocol, runtime_checkable
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import (
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Protocol,
+    runtime_checkable,
+)
 
 
 @runtime_checkable
@@ -18,3 +26,238 @@ class ExternalResolution(Protocol):
 class ExternalResolver(Protocol):
     def resolve_name(self, name: str) -> None | ExternalResolution:
         ...
+
+
+@runtime_checkable
+class NamespacedResolver(ExternalResolver, Protocol):
+    """An `ExternalResolver` that knows which namespaces (dotted name
+    prefixes, usually top-level package names) it can resolve names in, so an
+    `ExternalResolverRegistry` doesn't ask it about anything else.
+
+    `get_namespaces` may return `None` when it can't tell, in which case the
+    resolver is treated as one without namespaces.
+    """
+
+    def get_namespaces(self) -> Optional[Iterable[str]]:
+        ...
+
+
+@runtime_checkable
+class BatchResolver(ExternalResolver, Protocol):
+    """An `ExternalResolver` that can also resolve many names at once, which
+    callers that know a bunch of names up front use instead of calling
+    `resolve_name` for each.
+
+    The result has an entry for every name given (`None` for the ones that
+    don't resolve), just as `resolve_name` would have returned.
+    """
+
+    def resolve_names(
+        self, names: Iterable[str]
+    ) -> Mapping[str, None | ExternalResolution]:
+        ...
+
+
+@runtime_checkable
+class VersionedResolver(ExternalResolver, Protocol):
+    """An `ExternalResolver` that can tell when what names resolve to may
+    have changed — because its configuration or the data behind it did — by
+    returning a different `get_version`.
+
+    The preprocessor re-checks the external links of pages reused from an
+    earlier build when the version of any resolver changed. Resolvers that
+    don't implement this are only told apart by type.
+    """
+
+    def get_version(self) -> str:
+        ...
+
+
+def get_resolver_version(resolver: ExternalResolver) -> str:
+    """The `VersionedResolver.get_version` of `resolver`, or its type name if
+    it doesn't have one.
+    """
+    name = "{}.{}".format(
+        type(resolver).__module__, type(resolver).__qualname__
+    )
+    if isinstance(resolver, VersionedResolver):
+        return "{}:{}".format(name, resolver.get_version())
+    return name
+
+
+def resolve_names(
+    resolver: ExternalResolver, names: Iterable[str]
+) -> Mapping[str, None | ExternalResolution]:
+    """Resolve `names` with `resolver`, in one batch if it's a
+    `BatchResolver`, otherwise one by one.
+    """
+    if isinstance(resolver, BatchResolver):
+        return resolver.resolve_names(names)
+    return {name: resolver.resolve_name(name) for name in names}
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    resolvers: list[ExternalResolver] = field(default_factory=list)
+
+
+class ExternalResolverRegistry:
+    """Dispatches names to the `ExternalResolver`s that can resolve them.
+
+    Resolvers that declare namespaces (see `NamespacedResolver`) are put in a
+    trie by name part, and a name is only offered to those owning a namespace
+    it's in — the deepest one first — followed by the resolvers that don't
+    declare any, in the order given. Names outside every declared namespace
+    only go to the latter, which is what all names did before there were
+    namespaces.
+
+    Namespaces are collected on first use, since getting them may mean loading
+    something (like an inventory).
+
+    ##### Examples #####
+
+    ```python
+    >>> class Resolver:
+    ...     def __init__(self, namespaces):
+    ...         self.namespaces = namespaces
+    ...     def resolve_name(self, name):
+    ...         return None
+    ...     def get_namespaces(self):
+    ...         return self.namespaces
+    ...     def __repr__(self):
+    ...         return "Resolver({!r})".format(self.namespaces)
+
+    >>> registry = ExternalResolverRegistry(
+    ...     [Resolver(["numpy"]), Resolver(None), Resolver(["numpy.linalg"])]
+    ... )
+
+    >>> list(registry.iter_candidates("numpy.linalg.norm"))
+    [Resolver(['numpy.linalg']), Resolver(['numpy']), Resolver(None)]
+
+    >>> list(registry.iter_candidates("scipy.stats"))
+    [Resolver(None)]
+
+    ```
+    """
+
+    _resolvers: tuple[ExternalResolver, ...]
+
+    def __init__(self, resolvers: Iterable[ExternalResolver]) -> None:
+        self._resolvers = tuple(resolvers)
+
+    def __iter__(self) -> Iterator[ExternalResolver]:
+        return iter(self._resolvers)
+
+    def __len__(self) -> int:
+        return len(self._resolvers)
+
+    def preload(self) -> None:
+        """Collect the namespaces now, loading whatever the resolvers need for
+        them (like the standard library index), instead of on first use — so
+        forked processes inherit it.
+        """
+        _root, _fallbacks = self._dispatch
+
+    @cached_property
+    def _dispatch(self) -> tuple[_TrieNode, tuple[ExternalResolver, ...]]:
+        root = _TrieNode()
+        fallbacks = []
+
+        for resolver in self._resolvers:
+            namespaces = (
+                resolver.get_namespaces()
+                if isinstance(resolver, NamespacedResolver)
+                else None
+            )
+
+            if namespaces is None:
+                fallbacks.append(resolver)
+                continue
+
+            for namespace in namespaces:
+                node = root
+                for part in namespace.split("."):
+                    if (child := node.children.get(part)) is None:
+                        child = node.children[part] = _TrieNode()
+                    node = child
+                if not any(owner is resolver for owner in node.resolvers):
+                    node.resolvers.append(resolver)
+
+        return root, tuple(fallbacks)
+
+    def iter_candidates(self, name: str) -> Iterable[ExternalResolver]:
+        """Yield the resolvers to try for `name`, in order."""
+        root, fallbacks = self._dispatch
+
+        owners: list[list[ExternalResolver]] = []
+        node = root
+        for part in name.split("."):
+            if (node := node.children.get(part)) is None:
+                break
+            if node.resolvers:
+                owners.append(node.resolvers)
+
+        seen: set[int] = set()
+        for resolvers in reversed(owners):
+            for resolver in resolvers:
+                if id(resolver) not in seen:
+                    seen.add(id(resolver))
+                    yield resolver
+
+        yield from fallbacks
+
+    def resolve_name(self, name: str) -> None | ExternalResolution:
+        for resolver in self.iter_candidates(name):
+            if resolution := resolver.resolve_name(name):
+                return resolution
+        return None
+
+    def resolve_names(
+        self, names: Iterable[str]
+    ) -> dict[str, None | ExternalResolution]:
+        return {
+            name: resolved and resolved[1]
+            for name, resolved in self.resolve_names_with_resolvers(
+                names
+            ).items()
+        }
+
+    def resolve_names_with_resolvers(
+        self, names: Iterable[str]
+    ) -> dict[str, Optional[tuple[ExternalResolver, ExternalResolution]]]:
+        """Resolve `names` like `resolve_name` would, one at a time, but
+        giving each resolver all the names it's asked about at once (see
+        `BatchResolver`). Each result comes with the resolver it's from.
+        """
+        results: dict[
+            str, Optional[tuple[ExternalResolver, ExternalResolution]]
+        ] = {}
+        candidates = {}
+        for name in names:
+            if name not in results:
+                results[name] = None
+                if resolvers := list(self.iter_candidates(name)):
+                    candidates[name] = resolvers
+
+        # Round `n` asks each name's `n`th candidate, if still unresolved
+        position = 0
+        while candidates:
+            batches: dict[int, tuple[ExternalResolver, list[str]]] = {}
+            for name, resolvers in candidates.items():
+                resolver = resolvers[position]
+                batches.setdefault(id(resolver), (resolver, []))[1].append(name)
+
+            for resolver, batch in batches.values():
+                for name, resolution in resolve_names(resolver, batch).items():
+                    if resolution:
+                        results[name] = (resolver, resolution)
+
+            position += 1
+            candidates = {
+                name: resolvers
+                for name, resolvers in candidates.items()
+                if results[name] is None and len(resolvers) > position
+            }
+
+        return results
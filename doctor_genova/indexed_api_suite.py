@@ -0,0 +1,177 @@
+"""Contains the `IndexedApiSuite` class."""
+
+from typing import Iterable, Optional
+
+import docspec
+from docspec import ApiObject, HasMembers, Module
+from pydoc_markdown.contrib.renderers.markdown import MarkdownReferenceResolver
+from pydoc_markdown.util.docspec import ApiSuite
+
+
+class IndexedApiSuite(ApiSuite):
+    """An `ApiSuite` that indexes its objects by fully-qualified name up front,
+    so `resolve_fqn` is a `dict` lookup instead of a walk of the entire tree.
+
+    The fully-qualified name of each object (the dotted `path` names) is
+    computed once while indexing and available through `get_fqn`.
+
+    Members are indexed by name too, both per object and across the whole
+    suite, which is what `resolve_reference` uses to find references without
+    walking the tree (see `IndexedReferenceResolver`).
+
+    The index is a snapshot: it is _not_ updated if the modules are changed
+    afterwards, so build the suite after processing is done.
+
+    ##### Examples #####
+
+    ```python
+    >>> from docspec import Class, Location, Module
+
+    >>> location = Location("example.py", 1)
+    >>> cls = Class(location, "Example", None, None, None, None, [])
+    >>> module = Module(location, "example", None, [cls])
+    >>> module.sync_hierarchy()
+
+    >>> suite = IndexedApiSuite([module])
+    >>> suite.resolve_fqn("example.Example") == [cls]
+    True
+
+    >>> suite.get_fqn(cls)
+    'example.Example'
+
+    >>> suite.resolve_reference(module, "Example") is cls
+    True
+
+    ```
+    """
+
+    _index: dict[str, list[ApiObject]]
+    _fqns: dict[int, tuple[ApiObject, str]]
+    _members: dict[int, tuple[ApiObject, dict[str, ApiObject]]]
+    _parents: dict[str, list[ApiObject]]
+
+    def __init__(self, modules: list[Module]) -> None:
+        super().__init__(modules)
+        self._index = {}
+        self._fqns = {}
+        self._members = {}
+        self._parents = {}
+        self._add_all(modules, None)
+
+    def _add_all(
+        self, api_objects: Iterable[ApiObject], parent_fqn: Optional[str]
+    ) -> None:
+        for api_object in api_objects:
+            fqn = (
+                api_object.name
+                if parent_fqn is None
+                else parent_fqn + "." + api_object.name
+            )
+
+            self._fqns[id(api_object)] = (api_object, fqn)
+
+            if (entries := self._index.get(fqn)) is None:
+                self._index[fqn] = [api_object]
+            else:
+                entries.append(api_object)
+
+            if isinstance(api_object, HasMembers):
+                # Like `docspec.get_member`, the _first_ member with a name
+                # wins.
+                members: dict[str, ApiObject] = {}
+                for member in api_object.members:
+                    if member.name not in members:
+                        members[member.name] = member
+                        self._parents.setdefault(member.name, []).append(
+                            api_object
+                        )
+                self._members[id(api_object)] = (api_object, members)
+
+                self._add_all(api_object.members, fqn)
+
+    def __contains__(self, fqn: str) -> bool:
+        return fqn in self._index
+
+    def resolve_fqn(self, fqn: str) -> list[ApiObject]:
+        """Same as `ApiSuite.resolve_fqn` — all objects with fully-qualified
+        name `fqn`, in tree order — but from the index.
+
+        Returns a new `list` each call, so it's safe to modify.
+        """
+        return list(self._index.get(fqn, ()))
+
+    def iter_fqns(self) -> Iterable[tuple[ApiObject, str]]:
+        """Yield every object in the suite along with its fully-qualified
+        name, in tree (pre-)order.
+        """
+        return iter(self._fqns.values())
+
+    def get_fqn(self, api_object: ApiObject) -> str:
+        """Get the fully-qualified name of `api_object`, using the one computed
+        during indexing if the object belongs to this suite.
+        """
+        if (entry := self._fqns.get(id(api_object))) and (
+            entry[0] is api_object
+        ):
+            return entry[1]
+        return ".".join(x.name for x in api_object.path)
+
+    def get_member(
+        self, api_object: ApiObject, name: str
+    ) -> Optional[ApiObject]:
+        """Same as `docspec.get_member`, from the index if `api_object`
+        belongs to this suite.
+        """
+        if (entry := self._members.get(id(api_object))) and (
+            entry[0] is api_object
+        ):
+            return entry[1].get(name)
+        return docspec.get_member(api_object, name)
+
+    def _resolve_in_members(
+        self, api_object: ApiObject, ref_split: list[str]
+    ) -> Optional[ApiObject]:
+        for part_name in ref_split:
+            if (member := self.get_member(api_object, part_name)) is None:
+                return None
+            api_object = member
+        return api_object
+
+    def resolve_reference(
+        self, scope: ApiObject, ref: str, global_: bool = True
+    ) -> Optional[ApiObject]:
+        """Resolve `ref` the same way `MarkdownReferenceResolver` does: in the
+        members of `scope` or any of its parents, then (if `global_`) in the
+        members of any object in the suite, in tree order.
+
+        The global search only tries the objects that have a member named like
+        the first part of `ref`, straight from the index.
+        """
+        ref_split = ref.split(".")
+
+        node: Optional[ApiObject] = scope
+        while node is not None:
+            if resolved := self._resolve_in_members(node, ref_split):
+                return resolved
+            node = node.parent
+
+        if global_:
+            for parent in self._parents.get(ref_split[0], ()):
+                if resolved := self._resolve_in_members(parent, ref_split):
+                    return resolved
+
+        return None
+
+
+class IndexedReferenceResolver(MarkdownReferenceResolver):
+    """A `MarkdownReferenceResolver` that uses the indexes of an
+    `IndexedApiSuite` when it is given one, and falls back to walking the
+    tree for any other `ApiSuite`.
+    """
+
+    def resolve_reference(
+        self, suite: ApiSuite, scope: ApiObject, ref: str
+    ) -> Optional[ApiObject]:
+        if isinstance(suite, IndexedApiSuite):
+            return suite.resolve_reference(scope, ref, self.global_)
+        return super().resolve_reference(suite, scope, ref)
@@ -0,0 +1,378 @@
+"""Sphinx `objects.inv` inventories, and resolving names against them.
+
+Lots of projects publish one of these with their docs (at
+`<docs root>/objects.inv`), listing every documented object and where it
+lives. Download (or vendor) the ones you link to, and hand them to the
+preprocessor:
+
+```python
+DrGenPreprocessor(
+    self,
+    "doctor-genova",
+    external_resolvers=[
+        InventoryResolver(
+            "docs/inventories/numpy.inv",
+            "https://numpy.org/doc/stable/",
+        ),
+    ],
+)
+```
+
+No network access or importing happens at build time; see `InventoryResolver`
+about how the parsed inventory is cached.
+
+Going the other way, `Inventory.from_suite` builds an inventory of our own
+objects, which `doctor_genova.preprocessor.DrGenPreprocessor` can publish with
+the docs (see its `inventory` argument) for other projects to link to.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+import io
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import re
+import tempfile
+from typing import Iterable, Mapping, Optional, Sequence, Union
+import zlib
+
+from docspec import ApiObject, Class, Function, Module, Variable
+
+from .caching import make_cache_key
+from .indexed_api_suite import IndexedApiSuite
+
+_LOG = logging.getLogger(__name__)
+
+#: Bump when what's pickled next to inventories changes.
+PICKLE_FORMAT = 1
+
+# Same as in `sphinx.util.inventory.InventoryFile.load_v2`
+_LINE_RE = re.compile(r"(?x)(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)")
+
+
+@dataclass(frozen=True)
+class InventoryItem:
+    name: str
+    #: Domain and role, like `py:class`
+    type: str
+    priority: int
+    #: Relative to the docs root, with the `$` shorthand expanded
+    uri: str
+    display_name: str
+
+
+@dataclass(frozen=True)
+class Inventory:
+    """A parsed (version 2) Sphinx inventory."""
+
+    project: str
+    version: str
+    items: list[InventoryItem]
+
+    @classmethod
+    def parse(cls, data: bytes) -> "Inventory":
+        stream = io.BytesIO(data)
+
+        header = stream.readline().decode("utf-8").rstrip()
+        if header != "# Sphinx inventory version 2":
+            raise ValueError(f"Unsupported inventory format: {header!r}")
+
+        project = stream.readline().decode("utf-8")[len("# Project: ") :]
+        version = stream.readline().decode("utf-8")[len("# Version: ") :]
+        compression = stream.readline().decode("utf-8")
+        if "zlib" not in compression:
+            raise ValueError(
+                f"Unsupported inventory compression: {compression!r}"
+            )
+
+        items = []
+        for line in zlib.decompress(stream.read()).decode("utf-8").splitlines():
+            if not (match := _LINE_RE.match(line.rstrip())):
+                continue
+            name, type, priority, uri, display_name = match.groups()
+            if uri.endswith("$"):
+                uri = uri[:-1] + name
+            items.append(
+                InventoryItem(
+                    name=name,
+                    type=type,
+                    priority=int(priority),
+                    uri=uri,
+                    display_name=name if display_name == "-" else display_name,
+                )
+            )
+
+        return cls(
+            project=project.rstrip(), version=version.rstrip(), items=items
+        )
+
+    @classmethod
+    def from_suite(
+        cls,
+        suite: IndexedApiSuite,
+        pages: Mapping[str, str],
+        project: str,
+        version: str,
+    ) -> "Inventory":
+        """Make an inventory of the objects in `suite` that ended up on a page.
+        `pages` maps their fully-qualified names to the URI of that page
+        (relative to the docs root); each item links to the object's anchor
+        there.
+        """
+        items = []
+        for api_object, fqn in suite.iter_fqns():
+            if (page := pages.get(fqn)) is None:
+                continue
+            if (type := get_type(api_object)) is None:
+                continue
+            items.append(
+                InventoryItem(
+                    name=fqn,
+                    type=type,
+                    priority=1,
+                    uri="{}#pydoc:{}".format(page, fqn),
+                    display_name=fqn,
+                )
+            )
+        return cls(project=project, version=version, items=items)
+
+    def dump(self) -> bytes:
+        """Inverse of `parse`."""
+        lines = []
+        for item in self.items:
+            uri = item.uri
+            if uri.endswith(item.name):
+                uri = uri[: -len(item.name)] + "$"
+            lines.append(
+                "{} {} {} {} {}\n".format(
+                    item.name,
+                    item.type,
+                    item.priority,
+                    uri,
+                    "-"
+                    if item.display_name == item.name
+                    else item.display_name,
+                )
+            )
+
+        return (
+            "# Sphinx inventory version 2\n"
+            "# Project: {}\n"
+            "# Version: {}\n"
+            "# The remainder of this file is compressed using zlib.\n".format(
+                self.project, self.version
+            ).encode("utf-8")
+            + zlib.compress("".join(lines).encode("utf-8"), 9)
+        )
+
+    def dump_json(self) -> str:
+        """Same information as `dump`, as JSON for anything that would rather
+        not parse the Sphinx format.
+        """
+        return json.dumps(
+            {
+                "project": self.project,
+                "version": self.version,
+                "objects": {
+                    item.name: {
+                        "type": item.type,
+                        "uri": item.uri,
+                        "display_name": item.display_name,
+                    }
+                    for item in self.items
+                },
+            },
+            indent=2,
+        )
+
+
+def get_type(api_object: ApiObject) -> Optional[str]:
+    """Get the Sphinx (Python domain) type of `api_object`, like `py:class`."""
+    in_class = isinstance(api_object.parent, Class)
+    if isinstance(api_object, Module):
+        return "py:module"
+    if isinstance(api_object, Class):
+        return "py:class"
+    if isinstance(api_object, Function):
+        return "py:method" if in_class else "py:function"
+    if isinstance(api_object, Variable):
+        return "py:attribute" if in_class else "py:data"
+    return None
+
+
+@dataclass(frozen=True)
+class InventoryResolution:
+    """An `doctor_genova.external_resolver.ExternalResolution` from an
+    `InventoryResolver`.
+    """
+
+    name: str
+    url: str
+    type: str
+    project: str
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_url(self) -> str:
+        return self.url
+
+    def get_md_link(self) -> str:
+        return "[{}]({})".format(self.name, self.url)
+
+
+class InventoryResolver:
+    """An `doctor_genova.external_resolver.ExternalResolver` backed by a local
+    Sphinx `objects.inv` file, with links made relative to `base_url` (the
+    root of the docs the inventory came from).
+
+    Only objects in `domains` (just the Python one, by default) are
+    resolvable. When a name appears more than once (say, as both a module and
+    a class), the entry with the best (lowest) priority wins, then the first
+    one.
+
+    The inventory is parsed on first use into a `dict` from name to URL, which
+    is pickled next to the file (`<path>.drgen.pickle`), so later builds just
+    unpickle it. The pickle is tied to the inventory's size and mtime, and
+    simply not written if the directory isn't writable. A missing inventory
+    is warned about, and resolves nothing.
+    """
+
+    _path: Path
+    _base_url: str
+    _domains: tuple[str, ...]
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        base_url: str,
+        domains: Sequence[str] = ("py",),
+    ) -> None:
+        self._path = Path(path)
+        self._base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self._domains = tuple(domains)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def pickle_path(self) -> Path:
+        return self._path.with_name(self._path.name + ".drgen.pickle")
+
+    @cached_property
+    def project(self) -> str:
+        return self._index[0]
+
+    @cached_property
+    def _index(self) -> tuple[str, dict[str, tuple[str, str]]]:
+        """`(project, {name: (type, uri)})`, from the pickle if it's current,
+        otherwise parsed from the inventory (and pickled). Empty if there's
+        no inventory to read.
+        """
+        try:
+            stat = self._path.stat()
+        except OSError as exc:
+            _LOG.warning("Can't read inventory %s: %s", self._path, exc)
+            return "", {}
+        stamp = (PICKLE_FORMAT, stat.st_mtime_ns, stat.st_size, self._domains)
+
+        try:
+            with self.pickle_path.open("rb") as fp:
+                cached_stamp, project, entries = pickle.load(fp)
+            if cached_stamp == stamp:
+                return project, entries
+        except FileNotFoundError:
+            pass
+        except Exception:
+            _LOG.debug(
+                "Ignoring unreadable pickle %s", self.pickle_path, exc_info=True
+            )
+
+        inventory = Inventory.parse(self._path.read_bytes())
+        entries = self._build_entries(inventory.items)
+
+        _LOG.info(
+            "Loaded %d object(s) from %s inventory at %s",
+            len(entries),
+            inventory.project,
+            self._path,
+        )
+
+        self._write_pickle((stamp, inventory.project, entries))
+
+        return inventory.project, entries
+
+    def _build_entries(
+        self, items: Iterable[InventoryItem]
+    ) -> dict[str, tuple[str, str]]:
+        entries: dict[str, tuple[str, str]] = {}
+        priorities: dict[str, int] = {}
+
+        for item in items:
+            if item.type.partition(":")[0] not in self._domains:
+                continue
+            if item.name in entries and priorities[item.name] <= item.priority:
+                continue
+            entries[item.name] = (item.type, item.uri)
+            priorities[item.name] = item.priority
+
+        return entries
+
+    def _write_pickle(self, obj: object) -> None:
+        path = self.pickle_path
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        except OSError:
+            _LOG.debug("Can't write pickle %s", path, exc_info=True)
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(obj, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except OSError:
+            _LOG.debug("Can't write pickle %s", path, exc_info=True)
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+    def get_version(self) -> str:
+        """Changes with the inventory file and how it's resolved against (see
+        `doctor_genova.external_resolver.VersionedResolver`).
+        """
+        try:
+            stat = self._path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        return make_cache_key(
+            PICKLE_FORMAT,
+            self._path.resolve(),
+            self._base_url,
+            self._domains,
+            stamp,
+        )
+
+    def get_namespaces(self) -> Iterable[str]:
+        """The first parts of the names in the inventory (see
+        `doctor_genova.external_resolver.NamespacedResolver`).
+        """
+        return {name.partition(".")[0] for name in self._index[1]}
+
+    def resolve_name(self, name: str) -> Optional[InventoryResolution]:
+        project, entries = self._index
+        if (entry := entries.get(name)) is None:
+            return None
+        type, uri = entry
+        return InventoryResolution(
+            name=name, url=self._base_url + uri, type=type, project=project
+        )
@@ -1,14 +1,20 @@
+import copy
 from pathlib import Path
-from typing import Callable, Iterable, Protocol, TypeVar
+import re
+from typing import Callable, Iterable, Optional, Protocol, TypeVar
 
+from docspec import ApiObject, HasMembers, Module
 from novella.markdown.tagparser import (
     ReplacementFunc,
+    Tag,
+    parse_options,
     replace_tags,
     parse_inline_tags,
     parse_block_tags,
 )
 
 T = TypeVar("T")
+TApiObject = TypeVar("TApiObject", bound=ApiObject)
 
 
 def index_where(iterable: Iterable[T], predicate: Callable[[T], bool]) -> int:
@@ -95,9 +101,223 @@ def replace_block_tags_in(
     )
 
 
+# Same as in `novella.markdown.tagparser.parse_inline_tags`
+_INLINE_TAG_BEGIN_RE = re.compile(r"\\?\{@([\w\d_\-]+)\b")
+_INLINE_TAG_WITH_RE = re.compile(r"\s:with\b")
+_NON_WORD_END_RE = re.compile(r"\W\Z")
+
+
+def _parse_inline_tag_args(content: str, pos: int) -> Optional[tuple[str, int]]:
+    """Parse the arguments of an inline tag starting at `pos` (right after the
+    tag name) up to and including the closing brace, exactly like
+    `novella.markdown.tagparser.parse_inline_tags` does.
+
+    Returns the arguments and the offset just past the closing brace, or
+    `None` if the tag is broken.
+    """
+    args: list[str] = []
+    in_with = False
+    braces_to_close = 1
+    length = len(content)
+
+    while pos < length:
+        char = content[pos]
+
+        if not in_with and (match := _INLINE_TAG_WITH_RE.match(content, pos)):
+            in_with = True
+            args.append(match.group(0))
+            pos = match.end()
+            continue
+
+        elif not in_with and content.startswith("\\}", pos):
+            args.append("}")
+            pos += 2
+            continue
+
+        elif match := _INLINE_TAG_BEGIN_RE.match(content, pos):
+            if match.group(0).startswith("\\"):
+                args.append(match.group(0)[1:])
+                pos = match.end()
+                continue
+            return None
+
+        elif char == "}":
+            braces_to_close -= 1
+            if braces_to_close == 0:
+                pos += 1
+                break
+
+        elif in_with and char == "{":
+            braces_to_close += 1
+
+        args.append(char)
+        pos += 1
+
+    if braces_to_close > 0:
+        return None
+
+    return "".join(args), pos
+
+
+def substitute_inline(
+    content: str,
+    out: list[str],
+    tag_name: str,
+    replace_tag: Callable[[Tag], str],
+    pattern: re.Pattern,
+    replace_match: Callable[[re.Match], str],
+) -> None:
+    """Replace inline `tag_name` tags _and_ `pattern` matches in `content` in
+    a single scan, appending the resulting pieces to `out` (so that callers
+    can do a single join at the end).
+
+    Produces the same result as replacing the tags with
+    `replace_inline_tags_in` and then substituting `pattern` over the result,
+    without rebuilding the string in between.
+
+    The one wrinkle is that `pattern` can match _across_ a tag replacement
+    (think a replacement wrapped in backticks). Replacements that might do
+    that — those containing a backtick or not ending in a non-word character —
+    are spliced into the text still to be scanned. That costs a copy of the
+    rest of the content, but only happens for those (rare) replacements.
+    """
+    work = content
+    emitted = 0
+
+    # Tag spans are reported relative to the original `content`, like
+    # `parse_inline_tags` would. `shift` maps positions in `work` back to it
+    # (it only changes when splicing), and (1-based) line numbers are counted
+    # incrementally so that they don't cost a scan from the start every time.
+    shift = 0
+    counted_to = 0
+    line_no = 1
+
+    def get_line_no(offset: int) -> int:
+        nonlocal counted_to, line_no
+        line_no += content.count("\n", counted_to, offset)
+        counted_to = offset
+        return line_no
+
+    tag_match = _INLINE_TAG_BEGIN_RE.search(work)
+    pattern_match = pattern.search(work)
+
+    while tag_match is not None or pattern_match is not None:
+        if pattern_match is not None and (
+            tag_match is None or pattern_match.start() < tag_match.start()
+        ):
+            out.append(work[emitted : pattern_match.start()])
+            out.append(replace_match(pattern_match))
+            emitted = pattern_match.end()
+            pattern_match = pattern.search(work, emitted)
+            continue
+
+        assert tag_match is not None
+        start = tag_match.start()
+
+        # Escaped tags and other tags are left alone. We _don't_ skip over the
+        # rest of another tag, since `pattern` gets applied inside of it too.
+        if (
+            tag_match.group(0).startswith("\\")
+            or tag_match.group(1) != tag_name
+            or (parsed := _parse_inline_tag_args(work, tag_match.end())) is None
+        ):
+            tag_match = _INLINE_TAG_BEGIN_RE.search(work, tag_match.end())
+            continue
+
+        args, end = parsed
+        args, _, options_string = args.partition(":with")
+        tag = Tag(
+            tag_name,
+            args,
+            parse_options(options_string) if options_string else {},
+            (start + shift, end + shift),
+            (get_line_no(start + shift), get_line_no(end + shift)),
+        )
+
+        replacement = replace_tag(tag)
+
+        if "`" in replacement or not _NON_WORD_END_RE.search(replacement):
+            # Splice the replacement in, keeping one already-emitted character
+            # in front so that `pattern` sees the right word boundary.
+            keep_from = emitted - 1 if emitted > 0 else 0
+            head = work[keep_from:start] + replacement
+            shift += end - len(head)
+            work = head + work[end:]
+            emitted -= keep_from
+            # Tags in the replacement are _not_ processed.
+            tag_match = _INLINE_TAG_BEGIN_RE.search(work, len(head))
+            pattern_match = pattern.search(work, emitted)
+            continue
+
+        out.append(work[emitted:start])
+        out.append(replacement)
+        emitted = end
+
+        tag_match = _INLINE_TAG_BEGIN_RE.search(work, end)
+        if pattern_match is not None and pattern_match.start() < end:
+            pattern_match = pattern.search(work, end)
+
+    out.append(work[emitted:])
+
+
 def is_subpath(path: Path, parent: Path) -> bool:
     try:
         path.relative_to(parent)
     except ValueError:
         return False
     return True
+
+
+def clone_api_object(api_object: TApiObject) -> TApiObject:
+    """Make a _structural_ clone of an `docspec.ApiObject` tree.
+
+    Each node is shallow-copied, as is its `docspec.Docstring` and `members`
+    list, since those are what the processors mutate (docstrings are rewritten
+    in place and filtering replaces `members` lists). Everything else —
+    locations, arguments, decorations, etc. — is shared with the original.
+
+    The `parent` references of the clone still point into the _original_ tree;
+    use `clone_modules` to get a fully synchronized tree.
+    """
+    clone = copy.copy(api_object)
+
+    if api_object.docstring is not None:
+        clone.docstring = copy.copy(api_object.docstring)
+
+    if isinstance(api_object, HasMembers):
+        clone.members = [  # type: ignore[attr-defined]
+            clone_api_object(member) for member in api_object.members
+        ]
+
+    return clone
+
+
+def without_members(api_object: TApiObject, names: Iterable[str]) -> TApiObject:
+    """Get a shallow copy of `api_object` without the members called any of
+    `names` (or `api_object` itself, if it has no members).
+
+    The remaining members are shared with `api_object` (and still have it as
+    their `parent`), so this is only good for rendering.
+    """
+    if not isinstance(api_object, HasMembers):
+        return api_object
+
+    names = set(names)
+    clone = copy.copy(api_object)
+    clone.members = [  # type: ignore[attr-defined]
+        member for member in api_object.members if member.name not in names
+    ]
+    return clone
+
+
+def clone_modules(modules: Iterable[Module]) -> list[Module]:
+    """Structurally clone a list of `docspec.Module`, re-syncing the hierarchy
+    of each clone so that `parent` references stay within the cloned tree.
+
+    This is a lot cheaper than parsing the source again, which is what we used
+    to do to get a second, independent tree.
+    """
+    clones = [clone_api_object(module) for module in modules]
+    for clone in clones:
+        clone.sync_hierarchy()
+    return clones
@@ -0,0 +1,318 @@
+"""Per-file caching of parsed `docspec.Module`, so that re-running the
+preprocessor (as happens on every change under `novella --serve`) only
+re-parses the source files that actually changed.
+
+Parsed modules can also be persisted to a `doctor_genova.caching.DiskCache`,
+which lets fresh processes (cold CI builds, new `novella` runs) skip parsing
+files they've seen before.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import io
+import json
+import logging
+import os
+from typing import Iterable, Optional
+import zlib
+
+import docspec
+import docspec_python
+from docspec import Module
+from pydoc_markdown.contrib.loaders.python import PythonLoader
+
+from .caching import DiskCache, get_package_version, make_cache_key
+from .discovery import DEFAULT_EXCLUDE, discover_py_modules
+
+_LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModuleCacheEntry:
+    """A parsed module, along with what we need to tell if the source file it
+    came from has changed.
+    """
+
+    module_name: str
+    filename: str
+    mtime_ns: int
+    size: int
+    digest: str
+    module: Module
+
+
+def hash_source(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_source(data: bytes, encoding: Optional[str] = None) -> str:
+    """Decode source bytes the same way `io.open` would when `docspec_python`
+    reads the file itself (including universal newline translation).
+    """
+    with io.TextIOWrapper(io.BytesIO(data), encoding=encoding) as fp:
+        return fp.read()
+
+
+class ModuleCache:
+    """Cache of parsed `docspec.Module`, keyed by source file path.
+
+    An entry is reused as-is when the file's mtime and size have not changed.
+    When they have, the file is read and hashed, and only re-parsed if the
+    content actually differs (editors and `git checkout` like to touch files
+    without changing them).
+
+    If a `disk_cache` is given, modules that do need to be (re-)parsed are
+    first looked up there, keyed by file content hash, path, parser options
+    and the `docspec-python` and `doctor-genova` versions. Freshly parsed
+    modules are written back as compressed `docspec` JSON.
+
+    The cached `docspec.Module` objects are _shared_ between loads, so they
+    must not be mutated — clone them first (see
+    `doctor_genova.lib.clone_modules`) if you need to process them.
+    """
+
+    _entries: dict[str, ModuleCacheEntry]
+    _parse_count: int
+    _disk_cache: Optional[DiskCache]
+    _disk_hit_count: int
+    _versions: tuple[str, str]
+
+    def __init__(self, disk_cache: Optional[DiskCache] = None) -> None:
+        self._entries = {}
+        self._parse_count = 0
+        self._disk_cache = disk_cache
+        self._disk_hit_count = 0
+        self._versions = (
+            get_package_version("docspec-python"),
+            get_package_version("doctor-genova"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def parse_count(self) -> int:
+        """How many files have been parsed (as opposed to served from the
+        cache) over the lifetime of the cache.
+        """
+        return self._parse_count
+
+    @property
+    def disk_hit_count(self) -> int:
+        """How many modules have been loaded from the `disk_cache` instead of
+        being parsed.
+        """
+        return self._disk_hit_count
+
+    @property
+    def disk_cache(self) -> Optional[DiskCache]:
+        return self._disk_cache
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_digest(self, filename: str) -> Optional[str]:
+        """Content hash of source file `filename` as of the last load, if it
+        was loaded.
+        """
+        if entry := self._entries.get(os.path.abspath(filename)):
+            return entry.digest
+        return None
+
+    def load(
+        self,
+        files: Iterable[tuple[str, str]],
+        options: Optional[docspec_python.ParserOptions] = None,
+        encoding: Optional[str] = None,
+    ) -> list[Module]:
+        """Load `(module_name, filename)` pairs, parsing only those that are
+        new or changed since the last load.
+
+        Entries for files that are not in `files` are dropped, so deleted
+        modules don't hang around.
+        """
+        entries: dict[str, ModuleCacheEntry] = {}
+        modules: list[Module] = []
+        reloaded: list[str] = []
+
+        for module_name, filename in files:
+            key = os.path.abspath(filename)
+            entry = entries.get(key) or self._entries.get(key)
+            stat = os.stat(key)
+
+            if (
+                entry is None
+                or entry.module_name != module_name
+                or entry.mtime_ns != stat.st_mtime_ns
+                or entry.size != stat.st_size
+            ):
+                new_entry = self._load_entry(
+                    entry, key, module_name, stat, options, encoding
+                )
+                if entry is None or new_entry.module is not entry.module:
+                    reloaded.append(module_name)
+                entry = new_entry
+
+            entries[key] = entry
+            modules.append(entry.module)
+
+        self._entries = entries
+
+        _LOG.info(
+            "Loaded %d module(s), %d new or changed: %s",
+            len(entries),
+            len(reloaded),
+            ", ".join(reloaded),
+        )
+
+        return modules
+
+    def _load_entry(
+        self,
+        entry: Optional[ModuleCacheEntry],
+        filename: str,
+        module_name: str,
+        stat: os.stat_result,
+        options: Optional[docspec_python.ParserOptions],
+        encoding: Optional[str],
+    ) -> ModuleCacheEntry:
+        with open(filename, "rb") as fp:
+            data = fp.read()
+
+        digest = hash_source(data)
+
+        if (
+            entry is not None
+            and entry.module_name == module_name
+            and entry.digest == digest
+        ):
+            module = entry.module
+        else:
+            module = self.parse(
+                data, digest, filename, module_name, options, encoding
+            )
+
+        return ModuleCacheEntry(
+            module_name=module_name,
+            filename=filename,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=digest,
+            module=module,
+        )
+
+    def parse(
+        self,
+        data: bytes,
+        digest: str,
+        filename: str,
+        module_name: str,
+        options: Optional[docspec_python.ParserOptions],
+        encoding: Optional[str],
+    ) -> Module:
+        disk_key = None
+
+        if self._disk_cache is not None:
+            disk_key = make_cache_key(
+                *self._versions, module_name, filename, digest, options
+            )
+            if (module := self._load_from_disk(disk_key, filename)) is not None:
+                self._disk_hit_count += 1
+                return module
+
+        self._parse_count += 1
+        module = docspec_python.parse_python_module(
+            io.StringIO(read_source(data, encoding)),
+            filename,
+            module_name,
+            options,
+            encoding,
+        )
+
+        if self._disk_cache is not None and disk_key is not None:
+            self._disk_cache.put(disk_key, dump_module(module))
+
+        return module
+
+    def _load_from_disk(self, key: str, filename: str) -> Optional[Module]:
+        assert self._disk_cache is not None
+
+        if (data := self._disk_cache.get(key)) is None:
+            return None
+
+        try:
+            return load_module(data, filename)
+        except Exception:
+            _LOG.warning(
+                "Failed to load cached module for %s, discarding",
+                filename,
+                exc_info=True,
+            )
+            self._disk_cache.discard(key)
+            return None
+
+
+def dump_module(module: Module) -> bytes:
+    """Serialize a `docspec.Module` as compressed `docspec` JSON."""
+    return zlib.compress(
+        json.dumps(docspec.dump_module(module), separators=(",", ":")).encode(
+            "utf-8"
+        )
+    )
+
+
+def load_module(data: bytes, filename: Optional[str] = None) -> Module:
+    """Inverse of `dump_module`."""
+    return docspec.load_module(
+        json.loads(zlib.decompress(data).decode("utf-8")), filename
+    )
+
+
+@dataclass
+class CachingPythonLoader(PythonLoader):
+    """A `PythonLoader` that loads files through a `ModuleCache`, so repeat
+    loads only parse what changed.
+    """
+
+    module_cache: ModuleCache = field(default_factory=ModuleCache)
+
+    #: Patterns of files and directories to leave out of discovered packages,
+    #: as for `doctor_genova.discovery.discover_py_files` — so the modules
+    #: loaded are the ones that get API pages.
+    exclude: list[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDE))
+
+    def iter_files(self) -> Iterable[tuple[str, str]]:
+        """Yield the `(module_name, filename)` pairs to load.
+
+        Explicitly listed `modules` and `packages` are found the same way as
+        by `PythonLoader.load`. With neither given, modules are discovered in
+        the search path with `doctor_genova.discovery.discover_py_modules`,
+        leaving out the `exclude` patterns.
+        """
+        search_path = self.get_effective_search_path()
+
+        if self.modules is None and self.packages is None:
+            yield from discover_py_modules(
+                search_path,
+                ignore_when_discovered=self.ignore_when_discovered,
+                exclude=self.exclude,
+            )
+            return
+
+        modules = list(self.modules or [])
+        packages = list(self.packages or [])
+
+        for module_name in modules:
+            yield module_name, docspec_python.find_module(
+                module_name, search_path
+            )
+
+        for package_name in packages:
+            yield from docspec_python.iter_package_files(
+                package_name, search_path
+            )
+
+    def load(self) -> Iterable[Module]:
+        return self.module_cache.load(
+            self.iter_files(), options=self.parser, encoding=self.encoding
+        )
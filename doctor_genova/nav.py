@@ -2,7 +2,7 @@
 """
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Optional
 
 
 def get_child_nav(nav: list[Any], name: str):
@@ -50,3 +50,80 @@ def sort_nav(nav):
                 if isinstance(sub_nav, list):
                     sort_nav(sub_nav)
     nav.sort(key=nav_sort_key)
+
+
+class NavTree:
+    """A nav list with its sections indexed by name, so adding a page deep
+    in it doesn't mean scanning every list on the way down (like `dig_nav`
+    does).
+
+    Wraps the list — changes are made to it (and the lists of its sections)
+    in place, so the config it came from is updated too, and can be dumped
+    once everything has been added.
+
+    Adding a page that's already there does nothing, so adding the same pages
+    to a nav they were added to before (say, a config kept from the last
+    build) leaves it as it was.
+
+    ##### Examples #####
+
+    ```python
+    >>> nav = [{"API": [{"pkg": ["pkg/index.md"]}]}]
+    >>> tree = NavTree(nav)
+    >>> tree.dig(["API", "pkg", "sub"]).add_page("pkg/sub/mod.md", "mod")
+    >>> nav
+    [{'API': [{'pkg': ['pkg/index.md', {'sub': [{'mod': 'pkg/sub/mod.md'}]}]}]}]
+
+    ```
+    """
+
+    entries: list[Any]
+    _section_entries: dict[str, list[Any]]
+    _sections: dict[str, "NavTree"]
+    _pages: set[tuple[Optional[str], str]]
+
+    def __init__(self, entries: Optional[list[Any]] = None) -> None:
+        self.entries = [] if entries is None else entries
+        self._section_entries = {}
+        self._sections = {}
+        self._pages = set()
+
+        for entry in self.entries:
+            if isinstance(entry, str):
+                self._pages.add((None, entry))
+            elif isinstance(entry, dict):
+                for name, value in entry.items():
+                    if isinstance(value, list):
+                        self._section_entries.setdefault(name, value)
+                    elif isinstance(value, str) and len(entry) == 1:
+                        self._pages.add((name, value))
+
+    def section(self, name: str) -> "NavTree":
+        """Get the section called `name`, adding it if there isn't one (like
+        `ensure_child_nav`).
+        """
+        if (section := self._sections.get(name)) is not None:
+            return section
+
+        if (entries := self._section_entries.get(name)) is None:
+            entries = self._section_entries[name] = []
+            self.entries.append({name: entries})
+
+        section = self._sections[name] = NavTree(entries)
+        return section
+
+    def dig(self, key_path: Iterable[str]) -> "NavTree":
+        """Like `dig_nav`."""
+        target = self
+        for key in key_path:
+            target = target.section(key)
+        return target
+
+    def add_page(self, path: str, title: Optional[str] = None) -> None:
+        if (title, path) in self._pages:
+            return
+        self._pages.add((title, path))
+        self.entries.append(path if title is None else {title: path})
+
+    def sort(self) -> None:
+        sort_nav(self.entries)
@@ -1,12 +1,19 @@
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 import logging
+import multiprocessing
+import os
 import re
+import sys
+import threading
 from functools import cached_property, partial
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence, Union
 import io
 
 from docspec import ApiObject, Indirection, Module
+import yaml
 
 from novella.markdown.preprocessor import (
     MarkdownFile,
@@ -14,17 +21,18 @@ from novella.markdown.preprocessor import (
     MarkdownPreprocessor,
     MarkdownPreprocessorAction,
 )
-from novella.markdown.tagparser import Tag
+from novella.markdown.tagparser import (
+    Tag,
+    parse_block_tags,
+    parse_inline_tags,
+    replace_tags,
+)
 from novella.build import BuildContext
 
-from pydoc_markdown.contrib.loaders.python import PythonLoader
 from pydoc_markdown.contrib.processors.crossref import CrossrefProcessor
 from pydoc_markdown.contrib.processors.filter import FilterProcessor
 from pydoc_markdown.contrib.processors.smart import SmartProcessor
-from pydoc_markdown.contrib.renderers.markdown import (
-    MarkdownReferenceResolver,
-    MarkdownRenderer,
-)
+from pydoc_markdown.contrib.renderers.markdown import MarkdownRenderer
 from pydoc_markdown.interfaces import (
     Context,
     Loader,
@@ -33,20 +41,102 @@ from pydoc_markdown.interfaces import (
     ResolverV2,
 )
 from pydoc_markdown.novella.preprocessor import autodetect_source_linker
-from pydoc_markdown.util.docspec import ApiSuite
 
+from .inventory import Inventory
+from .build_manifest import (
+    ANY_MODULE,
+    EXTERNAL_MODULE,
+    BuildManifest,
+    DependencyKind,
+    ManifestEntry,
+    PydocDependency,
+)
 from .docstring_backtick_processor import DocstringBacktickProcessor
+from .caching import (
+    DEFAULT_DISK_CACHE_MAX_BYTES,
+    DISK_CACHE_NAMES,
+    CacheStats,
+    DiskCache,
+    get_package_version,
+    make_cache_key,
+)
+from .discovery import DEFAULT_EXCLUDE
+from .indexed_api_suite import IndexedApiSuite, IndexedReferenceResolver
+from .processor_pipeline import ProcessorPipeline
+from .module_cache import CachingPythonLoader, ModuleCache, hash_source
+from .render_cache import (
+    DEFAULT_RENDER_CACHE_MAX_BYTES,
+    RenderCache,
+    fingerprint_api_object,
+)
 from .lib import (
+    clone_modules,
     get_default_search_path,
     is_subpath,
-    replace_block_tags_in,
-    replace_inline_tags_in,
+    substitute_inline,
+    without_members,
 )
 from .stdlib_resolver import StdlibResolver
-from .external_resolver import ExternalResolver
+from .external_resolver import (
+    ExternalResolution,
+    ExternalResolver,
+    ExternalResolverRegistry,
+    get_resolver_version,
+)
 
 _LOG = logging.getLogger(__name__)
 
+# Set in the parent right before the worker pool is forked, so that workers
+# inherit a read-only snapshot of the preprocessor and the files — nothing but
+# file indexes and results needs to be pickled.
+_WORKER_STATE: Optional[tuple["DrGenPreprocessor", MarkdownFiles]] = None
+
+
+class _MkdocsConfigLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """Loads a `mkdocs.yml` well enough to read plain settings from it, with
+    any tags YAML doesn't know itself (`!ENV`, `!!python/name:...`) loaded as
+    `None`.
+    """
+
+
+_MkdocsConfigLoader.add_multi_constructor("", lambda loader, suffix, node: None)
+
+
+@dataclass
+class _PendingFile:
+    """A Markdown file that a worker processed up to the `@pydoc` renders,
+    which still have to go through `MarkdownPreprocessorAction.repeat` in the
+    parent process — along with the rest of the file, after them.
+
+    `pieces` are as returned by `DrGenPreprocessor._replace_block_tags`, with
+    the renders (not yet repeated) at the `rendered` indexes.
+    """
+
+    pieces: list[str]
+    rendered: list[int]
+
+
+def _process_file_in_worker(
+    index: int,
+) -> tuple[ManifestEntry, bool, Optional[_PendingFile], int, int]:
+    assert _WORKER_STATE is not None, "worker state not set"
+    preprocessor, files = _WORKER_STATE
+    stats = preprocessor.link_cache_stats
+    hits, misses = stats.hits, stats.misses
+
+    file = files[index]
+    entry, reused, pending = preprocessor._process_file_up_to_repeats(
+        file, preprocessor._get_manifest_key(file, files.build)
+    )
+
+    return (
+        entry,
+        reused,
+        pending,
+        stats.hits - hits,
+        stats.misses - misses,
+    )
+
 
 class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
     """Replaces simple backtick spans with links when they seem to point to:
@@ -54,39 +144,208 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
     1.  Another object in the documented package.
     2.  An object in the Python standard library.
 
+    ##### Discovery #####
+
+    Modules are discovered in the default search path the same way as by
+    `doctor_genova.generate_api_pages`, leaving out files and directories in
+    packages that match an `exclude` pattern. Pass the same `exclude` to both,
+    so the modules loaded are the ones that have API pages.
+
+    ##### Parallel Processing #####
+
+    Pass `workers` to process Markdown files in a pool of that many worker
+    processes. Workers are forked after the modules are processed, so they
+    share a read-only snapshot of the suites and caches; results are merged
+    back in file order, so output is the same as processing serially.
+
+    Workers only go as far as rendering `@pydoc` tags: running the renders
+    through the preprocessors before this one (`MarkdownPreprocessorAction.
+    repeat`) happens in the parent, as do the links of files that have any,
+    so side effects of those preprocessors (like `@cat` registering watch
+    paths) aren't lost with the worker.
+
+    This requires the `fork` start method (so not on Windows), and falls back
+    to serial processing otherwise. It also falls back when other threads are
+    running — like the file watcher when serving — since forking then isn't
+    safe.
+
+    Similarly, pass `module_workers` to transform module docstrings in a
+    worker pool while processing modules (see
+    `doctor_genova.processor_pipeline.ProcessorPipeline`).
+
+    ##### Caching #####
+
+    Parsed modules are always cached in memory between reruns. Pass a
+    `cache_dir` to also persist them on disk, so that fresh builds can skip
+    parsing files that haven't changed. The caches in it are bounded to
+    `cache_max_bytes` in total (split evenly between them, see
+    `doctor_genova.caching.DISK_CACHE_NAMES`); see `doctor_genova.caching` for
+    pruning them by hand.
+
+    Rendered `@pydoc` Markdown is cached too, keyed by a fingerprint of the
+    object (docstring, signature, members...) and the tag options, so objects
+    included on several pages — or unchanged since the last rerun — are only
+    rendered once. The in-memory side is bounded by `render_cache_max_bytes`;
+    with a `cache_dir` it is persisted there as well.
+
+    Finally, a `doctor_genova.build_manifest.BuildManifest` records what each
+    Markdown file's output depended on: its input, the `@pydoc` renders it
+    embedded, the links its names resolved to and its `@pyscope` tags. When
+    none of that has changed, the previous output is reused as-is. The
+    manifest is kept in memory between reruns, and saved to the `cache_dir`
+    if there is one.
+
+    The manifest also keeps a reverse dependency graph from modules to the
+    files that embed or link to their objects. Each run, modules whose
+    _version_ (source hash, processed content and source link) changed are
+    looked up in it: files embedding them are fully re-checked, files only
+    linking to them just have their links re-resolved, and all other files
+    are reused without checking anything but their input. The external
+    resolvers and the Python version count as a module of their own there
+    (see `doctor_genova.build_manifest.EXTERNAL_MODULE`), so changing them
+    gets every file with an external (or unresolved) link re-checked.
+
+    ##### `@pydoc` Options #####
+
+    `@pydoc` tags take an `exclude_members` option, a list of member names to
+    leave out of the rendered object, as in
+    `@pydoc my_pkg.my_mod :with { exclude_members = ["MyClass"] }`. That's
+    what the stubs of split modules use (see
+    `doctor_genova.api_page.APIPage.split_classes`), since their classes are
+    embedded on pages of their own.
+
+    ##### Inventory #####
+
+    Pass `inventory` — a file name like `"objects.inv"` — to publish a Sphinx
+    inventory of the documented objects at that path in the content
+    directory, so other projects can link to them (with a
+    `doctor_genova.inventory.InventoryResolver`, or Sphinx's intersphinx). A
+    JSON version is written next to it (`objects.json`). Each object links to
+    its anchor on the page it's embedded in with `@pydoc`; objects that aren't
+    embedded anywhere are left out.
+
+    The project name in it defaults to the name of the (first) documented
+    package; set `inventory_project` to override it. Page URIs follow the
+    `use_directory_urls` setting of the `mkdocs.yml` in the build directory
+    (MkDocs' default if there isn't one); pass `use_directory_urls` to
+    override that.
+
+    Dependencies that don't go through this preprocessor — like files pulled
+    in with `@cat` from _inside_ a docstring — are not tracked.
+
     """
 
-    _loader: Loader
+    _loader: CachingPythonLoader
     _processors: list[Processor]
     _renderer: MarkdownRenderer
-    _publication_suite: Optional[ApiSuite] = None
-    _resolution_suite: Optional[ApiSuite] = None
+    _publication_suite: Optional[IndexedApiSuite] = None
+    _resolution_suite: Optional[IndexedApiSuite] = None
     _scope_api_objects: dict[Path, dict[str, ApiObject]]
     _resolver_v2: ResolverV2
-    _external_resolvers: tuple[ExternalResolver, ...]
+    _stdlib_resolver: StdlibResolver
+    _external_resolvers: ExternalResolverRegistry
+    _cache_dir: Optional[Path]
+    _link_cache: dict[tuple[str, tuple[int, ...]], Optional[str]]
+    _external_links: dict[str, Optional[str]]
+    _link_cache_stats: CacheStats
+    _render_cache: RenderCache
+    _fingerprints: dict[int, tuple[ApiObject, str]]
+    _manifest: BuildManifest
+    _module_versions: dict[str, str]
+    _affected: dict[str, DependencyKind]
+    _workers: Optional[int]
+    _inventory: Optional[str]
+    _inventory_project: Optional[str]
+    _inventory_build: Optional[BuildContext] = None
+    _inventory_pages: dict[str, str]
+    _use_directory_urls: Optional[bool]
+
+    #: Start of the links `_resolve_link` makes for our own objects (they're
+    #: resolved to URLs later on, by Novella).
+    _PYDOC_LINK_PREFIX = "{@link pydoc:"
+
+    #: Anchors the renderer puts before each object it renders.
+    _PYDOC_ANCHOR_RE = re.compile(r"^@anchor pydoc:(\S+)[ \t]*$", re.M)
 
     def __init__(
         self,
         action: MarkdownPreprocessorAction,
         name: str,
         external_resolvers: Iterable[ExternalResolver] = (),
+        cache_dir: Union[None, str, Path] = None,
+        cache_max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES,
+        workers: Optional[int] = None,
+        render_cache_max_bytes: int = DEFAULT_RENDER_CACHE_MAX_BYTES,
+        module_workers: Optional[int] = None,
+        inventory: Optional[str] = None,
+        inventory_project: Optional[str] = None,
+        use_directory_urls: Optional[bool] = None,
+        exclude: Iterable[str] = DEFAULT_EXCLUDE,
     ) -> None:
         super().__init__(action, name)
 
+        self._workers = workers
+
+        self._inventory = inventory
+        self._inventory_project = inventory_project
+        self._inventory_pages = {}
+        self._use_directory_urls = use_directory_urls
+
         self._scope_api_objects = defaultdict(dict)
 
-        self._loader = PythonLoader(search_path=get_default_search_path())
+        self._link_cache = {}
+        self._link_cache_stats = CacheStats()
+        self._external_links = {}
+
+        self._cache_dir = None if cache_dir is None else Path(cache_dir)
+
+        self._render_cache = RenderCache(
+            max_bytes=render_cache_max_bytes,
+            disk_cache=self._get_disk_cache("renders", cache_max_bytes),
+        )
+        self._fingerprints = {}
+
+        self._manifest = BuildManifest(
+            None
+            if self._cache_dir is None
+            else self._cache_dir / "manifest.json"
+        )
+        self._module_versions = {}
+        self._affected = {}
+
+        self._loader = CachingPythonLoader(
+            search_path=get_default_search_path(),
+            exclude=list(exclude),
+            module_cache=ModuleCache(
+                disk_cache=self._get_disk_cache("modules", cache_max_bytes)
+            ),
+        )
 
-        self._resolver_v2 = MarkdownReferenceResolver(global_=True)
+        self._resolver_v2 = IndexedReferenceResolver(global_=True)
 
-        self._external_resolvers = (StdlibResolver(), *external_resolvers)
+        self._stdlib_resolver = StdlibResolver(
+            use_index=True,
+            static_members=True,
+            index_dir=(
+                None if self._cache_dir is None else self._cache_dir / "stdlib"
+            ),
+        )
+        self._external_resolvers = ExternalResolverRegistry(
+            (self._stdlib_resolver, *external_resolvers)
+        )
 
         self._processors = [
-            FilterProcessor(),
-            SmartProcessor(),
-            # We return the entire link formatted as a Novella {@link} tag in #resolve_ref().
-            CrossrefProcessor(resolver_v2=self._resolver_v2),
-            DocstringBacktickProcessor(resolver_v2=self._resolver_v2),
+            # Filter, smart, crossref and backtick processing, in one pass
+            ProcessorPipeline(
+                filter=FilterProcessor(),
+                smart=SmartProcessor(),
+                # We return the entire link formatted as a Novella {@link} tag in #resolve_ref().
+                crossref=CrossrefProcessor(resolver_v2=self._resolver_v2),
+                backtick=DocstringBacktickProcessor(
+                    resolver_v2=self._resolver_v2
+                ),
+                workers=module_workers,
+            ),
         ]
 
         self._renderer = MarkdownRenderer(
@@ -96,6 +355,16 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
             descriptive_class_title=False,
         )
 
+    def _get_disk_cache(self, name: str, max_bytes: int) -> Optional[DiskCache]:
+        """Get the `DiskCache` called `name` (one of `DISK_CACHE_NAMES`) in the
+        cache directory, with its share of the `max_bytes` they all get.
+        """
+        if self._cache_dir is None:
+            return None
+        return DiskCache(
+            self._cache_dir / name, max_bytes // len(DISK_CACHE_NAMES)
+        )
+
     @cached_property
     def context(self) -> Context:
         return Context(str(Path.cwd()))
@@ -111,7 +380,7 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
         return self._renderer
 
     @property
-    def resolution_suite(self) -> ApiSuite:
+    def resolution_suite(self) -> IndexedApiSuite:
         if self._resolution_suite is None:
             raise AttributeError(
                 "`resolution_suite` not available; run `process_modules` first"
@@ -119,13 +388,29 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
         return self._resolution_suite
 
     @property
-    def publication_suite(self) -> ApiSuite:
+    def publication_suite(self) -> IndexedApiSuite:
         if self._publication_suite is None:
             raise AttributeError(
                 "`publication_suite` not available; run `process_modules` first"
             )
         return self._publication_suite
 
+    @property
+    def link_cache_stats(self) -> CacheStats:
+        """Hit and miss counts of the link resolution cache, accumulated over
+        the life of the preprocessor (the cache itself is reset each time
+        `process_modules` runs).
+        """
+        return self._link_cache_stats
+
+    @property
+    def render_cache_stats(self) -> CacheStats:
+        """Hit and miss counts of the `@pydoc` render cache, accumulated over
+        the life of the preprocessor (unlike the link cache, the render cache
+        itself is kept between reruns).
+        """
+        return self._render_cache.stats
+
     def process_modules(self, build: BuildContext):
         """Process the package modules (Python files). Execution sets the
         `publication_suite` and `resolution_suite` properties, overwriting
@@ -151,16 +436,35 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
 
             This also needs to be reloaded on rerun because new api objects
             could be introduced.
+
+            Both suites are `IndexedApiSuite`, indexed by fully-qualified name
+            once here, so the many lookups that follow don't each walk the
+            tree.
+
+            The link resolution cache is cleared as well, since it refers to
+            objects in the old suites. The render cache is _not_: it's keyed by
+            object content, so entries for unchanged objects stay good.
+
+        3.  Reloading is cheap-ish: the loader caches parsed modules per source
+            file (see `doctor_genova.module_cache.ModuleCache`), so only files
+            that changed since the last run are parsed again. The cached
+            modules are shared between runs, which is why the publication
+            side always works on a clone.
         """
-        # WARNING   Needs to be _before_ the processing loop!
+        # Load the package _once_. The processors below mutate the tree in
+        # place — rewriting docstrings and filtering `members` lists — so the
+        # publication side gets a structural clone to chew on while the
+        # resolution suite keeps the original, unfiltered (and cached) tree.
         #
-        # WARNING   Not sure why, but this needs to be a separate load from the
-        #           loader; loading once and copying the list doesn't work for
-        #           whatever reason I haven't looked into.
-        self._resolution_suite = ApiSuite(list(self.loader.load()))
+        # NOTE  Copying just the _list_ doesn't work, because the nodes (and
+        #       their `members` lists) would still be shared, and filtering
+        #       would strip the indirections out of the resolution suite too.
+        resolution_modules = list(self.loader.load())
+        self._resolution_suite = IndexedApiSuite(resolution_modules)
+        self._link_cache.clear()
+        self._external_links.clear()
 
-        # Load a list
-        modules = list(self.loader.load())
+        modules = clone_modules(resolution_modules)
 
         # Figure out what directories to watch
 
@@ -192,11 +496,71 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
         for processor in self._processors:
             processor.process(modules, self)
 
-        self._publication_suite = ApiSuite(modules)
+        self._publication_suite = IndexedApiSuite(modules)
+        self._fingerprints.clear()
+        self._module_versions = self._get_module_versions(
+            resolution_modules, modules
+        )
+
+    def _get_module_versions(
+        self,
+        resolution_modules: list[Module],
+        publication_modules: list[Module],
+    ) -> dict[str, str]:
+        """Get a _version_ for each module, which changes whenever anything
+        that pages depend on does: the source (which covers what links
+        resolve to), the processed module (which covers what renders, including
+        cross-references into _other_ modules) and its source link (which has
+        the commit in it).
+
+        There's also a version for `EXTERNAL_MODULE`, covering the external
+        resolvers (see `doctor_genova.external_resolver.VersionedResolver`)
+        and the Python version, so that pages with external links get them
+        re-checked when those change.
+        """
+        module_cache = self._loader.module_cache
+        source_linker = self.renderer.source_linker
+        publication_by_name: dict[str, Module] = {}
+        for module in publication_modules:
+            publication_by_name.setdefault(module.name, module)
+
+        versions = {}
+        for module in resolution_modules:
+            publication_module = publication_by_name.get(module.name)
+            versions[module.name] = make_cache_key(
+                module_cache.get_digest(module.location.filename),
+                publication_module
+                and self._get_fingerprint(publication_module),
+                source_linker and source_linker.get_source_url(module),
+            )
+        versions[EXTERNAL_MODULE] = make_cache_key(
+            sys.version_info[:2],
+            *(
+                get_resolver_version(resolver)
+                for resolver in self._external_resolvers
+            ),
+        )
+        return versions
+
+    def preload(self) -> None:
+        """Load what the external resolvers load lazily, so worker processes
+        forked after this inherit it (see
+        `doctor_genova.processor_pipeline.PreloadingResolver`).
+        """
+        self._external_resolvers.preload()
 
     def resolve_ref(self, scope: ApiObject, ref: str) -> None | str:
         return self._resolve_link(None, ref)
 
+    def resolve_refs(
+        self, refs: Sequence[tuple[ApiObject, str]]
+    ) -> list[None | str]:
+        """Batch version of `resolve_ref` (see
+        `doctor_genova.docstring_backtick_processor.BatchRefResolver`).
+        """
+        self._prefetch_external_links(None, (ref for _scope, ref in refs))
+        return [self.resolve_ref(scope, ref) for scope, ref in refs]
+
     def setup(self) -> None:
         if self.dependencies is None and self.predecessors is None:
             self.precedes("anchor")
@@ -204,39 +568,580 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
     def process_files(self, files: MarkdownFiles) -> None:
         self.process_modules(files.build)
 
+        changed_modules = self._manifest.get_changed_modules(
+            self._module_versions
+        )
+        self._affected = self._manifest.get_dependents(changed_modules)
+
+        _LOG.info(
+            "%d module(s) changed, affecting %d file(s) in the build manifest",
+            len(changed_modules - {ANY_MODULE, EXTERNAL_MODULE}),
+            len(self._affected),
+        )
+        if EXTERNAL_MODULE in changed_modules:
+            _LOG.info("External resolvers changed, re-checking external links")
+
+        if self._can_process_in_parallel(files):
+            reused_count = self._process_files_in_parallel(files)
+        else:
+            reused_count = 0
+            for file in files:
+                key = self._get_manifest_key(file, files.build)
+                entry, reused = self._process_file(file, key)
+                self._manifest.put(key, entry)
+                reused_count += reused
+
+        self._manifest.update_module_versions(
+            self._module_versions,
+            (self._get_manifest_key(file, files.build) for file in files),
+        )
+        self._manifest.save()
+
+        if self._inventory is not None:
+            self._write_inventory(files)
+
+        _LOG.info(
+            "Reused %d of %d file(s) from the build manifest",
+            reused_count,
+            len(files),
+        )
+        _LOG.info("Link resolution cache: %s", self._link_cache_stats)
+        _LOG.info("Render cache: %s", self._render_cache.stats)
+        _LOG.info(
+            "Stdlib resolver cache: %s (module specs: %s)",
+            self._stdlib_resolver.cache_stats,
+            self._stdlib_resolver.spec_cache_stats,
+        )
+
+    def _write_inventory(self, files: MarkdownFiles) -> None:
+        """Write the inventory (and its JSON version), with the objects whose
+        anchors are in `files` added to the ones from earlier calls for the
+        same build. Those happen when `@cat` tags have us process pulled-in
+        content separately.
+        """
+        assert self._inventory is not None
+
+        if files.build is not self._inventory_build:
+            self._inventory_build = files.build
+            self._inventory_pages = {}
+
+        content_dir = files.build.directory / (self.action.path or "")
+        use_directory_urls = self._get_use_directory_urls(files.build)
+
         for file in files:
-            replace_block_tags_in(
-                file,
-                "pydoc",
-                lambda tag: self._replace_pydoc_tag(file, tag),
+            try:
+                page_path = file.output_path.relative_to(content_dir)
+            except ValueError:
+                _LOG.debug(
+                    "Not adding objects on %s to the inventory, since it's "
+                    "not in the content directory",
+                    file.output_path,
+                )
+                continue
+
+            page = self._get_page_uri(page_path, use_directory_urls)
+            for match in self._PYDOC_ANCHOR_RE.finditer(file.content):
+                # Like the anchor preprocessor, the first anchor wins
+                self._inventory_pages.setdefault(match.group(1), page)
+
+        project = self._inventory_project or next(
+            (module.name for module in self.publication_suite), self.name
+        )
+        inventory = Inventory.from_suite(
+            self.publication_suite,
+            self._inventory_pages,
+            project=project,
+            version=get_package_version(project),
+        )
+
+        path = (
+            files.build.directory / (self.action.path or "") / self._inventory
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(inventory.dump())
+        path.with_suffix(".json").write_text(
+            inventory.dump_json(), encoding="utf-8"
+        )
+
+        _LOG.info(
+            "Wrote inventory of %d object(s) to %s",
+            len(inventory.items),
+            path,
+        )
+
+    def _get_use_directory_urls(self, build: BuildContext) -> bool:
+        """Get the `use_directory_urls` setting: the one we were given, or the
+        one in the build's `mkdocs.yml`, defaulting to MkDocs' `True`.
+        """
+        if self._use_directory_urls is not None:
+            return self._use_directory_urls
+
+        path = build.directory / "mkdocs.yml"
+        try:
+            config = yaml.load(
+                path.read_text(encoding="utf-8"), Loader=_MkdocsConfigLoader
+            )
+        except FileNotFoundError:
+            return True
+        except (OSError, yaml.YAMLError):
+            _LOG.warning(
+                "Failed to read use_directory_urls from %s, assuming true",
+                path,
+                exc_info=True,
             )
+            return True
+
+        if isinstance(config, dict) and isinstance(
+            value := config.get("use_directory_urls"), bool
+        ):
+            return value
+        return True
+
+    def _get_page_uri(self, page: Path, use_directory_urls: bool) -> str:
+        """Get the URI of Markdown file `page` (relative to the content
+        directory) in the built site, relative to its root — what MkDocs makes
+        of it, with or without `use_directory_urls`.
+        """
+        if not use_directory_urls:
+            return page.with_suffix(".html").as_posix()
+        if page.name == "index.md":
+            page = page.parent
+        else:
+            page = page.with_suffix("")
+        uri = page.as_posix()
+        return "" if uri == "." else uri + "/"
+
+    def _can_process_in_parallel(self, files: MarkdownFiles) -> bool:
+        if not self._workers or self._workers < 2 or len(files) < 2:
+            return False
 
-            replace_block_tags_in(
-                file, "pyscope", partial(self._replace_pyscope_tag, file)
+        if "fork" not in multiprocessing.get_all_start_methods():
+            _LOG.warning(
+                "Parallel processing needs the 'fork' start method, which is "
+                "not available; processing files serially"
             )
+            return False
+
+        if threading.active_count() > 1:
+            _LOG.info(
+                "Other threads are running, which makes forking unsafe; "
+                "processing files serially"
+            )
+            return False
+
+        return True
+
+    def _process_files_in_parallel(self, files: MarkdownFiles) -> int:
+        global _WORKER_STATE
+
+        assert self._workers is not None
+        workers = min(self._workers, len(files))
+
+        _LOG.info(
+            "Processing %d file(s) in %d worker processes", len(files), workers
+        )
+
+        self.preload()
+
+        _WORKER_STATE = (self, files)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _process_file_in_worker,
+                        range(len(files)),
+                        chunksize=max(1, len(files) // (workers * 4)),
+                    )
+                )
+        finally:
+            _WORKER_STATE = None
+
+        reused_count = 0
+
+        for file, (entry, reused, pending, hits, misses) in zip(files, results):
+            # Replay `@pyscope` tags so our state matches a serial run
+            for name in entry.scope_names:
+                self._add_scope_api_objects(file, name)
+
+            if pending is None:
+                file.content = entry.output
+            else:
+                self._finish_pending_file(file, entry, pending)
+
+            self._manifest.put(self._get_manifest_key(file, files.build), entry)
+            reused_count += reused
+
+            self._link_cache_stats.hits += hits
+            self._link_cache_stats.misses += misses
+
+        return reused_count
+
+    def _finish_pending_file(
+        self, file: MarkdownFile, entry: ManifestEntry, pending: _PendingFile
+    ) -> None:
+        """Finish processing a file that a worker left pending: repeat its
+        `@pydoc` renders, then process its links.
+        """
+        pieces = pending.pieces
+        for index in pending.rendered:
+            pieces[index] = self._repeat_rendered(file, entry, pieces[index])
+
+        self._replace_inline_tags(file, entry, pieces)
+        self._finish_entry(file, entry)
+
+    def _get_manifest_key(self, file: MarkdownFile, build: BuildContext) -> str:
+        # The build directory is usually a fresh temporary one, so only the
+        # output path _within_ it is stable between builds.
+        return "{}:{}:{}".format(
+            file.path.absolute(),
+            file.source_path,
+            os.path.relpath(file.output_path, build.directory),
+        )
+
+    def _process_file(
+        self, file: MarkdownFile, key: str
+    ) -> tuple[ManifestEntry, bool]:
+        """Process `file`, or reuse its output from the build manifest if
+        nothing it depended on has changed. Either way, `file.content` is
+        updated.
+
+        Returns the (new or reused) manifest entry, and whether it was
+        reused.
+        """
+        input_digest = hash_source(file.content.encode("utf-8"))
+
+        if entry := self._get_reusable_entry(file, key, input_digest):
+            return entry, True
+
+        entry = ManifestEntry(input_digest=input_digest)
+        self._process_file_content(file, entry)
+        self._finish_entry(file, entry)
+        return entry, False
+
+    def _process_file_up_to_repeats(
+        self, file: MarkdownFile, key: str
+    ) -> tuple[ManifestEntry, bool, Optional[_PendingFile]]:
+        """Like `_process_file`, but for a worker: when `file` has `@pydoc`
+        renders to repeat, stop there and return the rest as pending, for
+        `_finish_pending_file` to do in the parent.
+        """
+        input_digest = hash_source(file.content.encode("utf-8"))
+
+        if entry := self._get_reusable_entry(file, key, input_digest):
+            return entry, True, None
+
+        entry = ManifestEntry(input_digest=input_digest)
+        rendered: list[int] = []
+        pieces = self._replace_block_tags(file, entry, rendered)
+
+        if rendered:
+            return entry, False, _PendingFile(pieces, rendered)
 
-            replace_inline_tags_in(
-                file,
+        self._replace_inline_tags(file, entry, pieces)
+        self._finish_entry(file, entry)
+        return entry, False, None
+
+    def _get_reusable_entry(
+        self, file: MarkdownFile, key: str, input_digest: str
+    ) -> Optional[ManifestEntry]:
+        """Get the manifest entry of `file` if its output can be reused, in
+        which case `file.content` is set to it.
+        """
+        entry = self._manifest.get(key)
+
+        if (
+            entry is not None
+            and entry.input_digest == input_digest
+            and self._is_up_to_date(file, entry, self._affected.get(key))
+        ):
+            _LOG.info("reusing unchanged output of <fg=cyan>%s</fg>", file.path)
+            file.content = entry.output
+            return entry
+
+        return None
+
+    def _finish_entry(self, file: MarkdownFile, entry: ManifestEntry) -> None:
+        entry.output = file.content
+        entry.link_modules = self._get_link_modules(entry)
+
+    def _is_up_to_date(
+        self,
+        file: MarkdownFile,
+        entry: ManifestEntry,
+        kind: Optional[DependencyKind],
+    ) -> bool:
+        """Check whether what `entry` recorded about `file` still comes out the
+        same, given how the file is affected by changed modules (`kind` is
+        `None` when it isn't).
+
+        The `@pyscope` tags are registered first either way (as processing
+        would), since they affect how names resolve.
+        """
+        for name in entry.scope_names:
+            self._add_scope_api_objects(file, name)
+
+        if kind is None:
+            return True
+
+        if kind == "link":
+            _LOG.info(
+                "re-checking links of <fg=cyan>%s</fg> (link dependent)",
+                file.path,
+            )
+            return self._are_links_up_to_date(file, entry)
+
+        for pydoc in entry.pydocs:
+            api_object = self._resolve_pydoc_object(pydoc.fqn)
+            render_key = (
+                None
+                if api_object is None
+                else self._get_render_key(api_object, pydoc.options)
+            )
+            if render_key != pydoc.render_key:
+                return False
+
+        return self._are_links_up_to_date(file, entry)
+
+    def _are_links_up_to_date(
+        self, file: MarkdownFile, entry: ManifestEntry
+    ) -> bool:
+        # Names that resolved to our objects last time are left to resolve
+        # lazily, in case they no longer do
+        self._prefetch_external_links(
+            file,
+            (
+                name
+                for name, link in entry.links.items()
+                if link is None or not link.startswith(self._PYDOC_LINK_PREFIX)
+            ),
+        )
+        return all(
+            self._resolve_link(file, name) == link
+            for name, link in entry.links.items()
+        )
+
+    def _iter_module_names(self, name: str) -> Iterable[str]:
+        """Yield the module names that are a prefix of dotted `name`."""
+        parts = name.split(".")
+        for index in range(1, len(parts) + 1):
+            prefix = ".".join(parts[:index])
+            if prefix in self._module_versions:
+                yield prefix
+
+    def _get_link_modules(self, entry: ManifestEntry) -> list[str]:
+        """Figure out what modules the links of `entry` depend on: the ones
+        that the names and resolved objects are in, and those of any
+        `@pyscope` tags.
+
+        Names that didn't resolve to one of our objects (whether they resolved
+        externally or not at all) and names resolved relative to a scope
+        depend on `ANY_MODULE`, since a new object anywhere could change them.
+        """
+        module_names = set()
+
+        for name in entry.scope_names:
+            module_names.update(self._iter_module_names(name))
+
+        for name, link in entry.links.items():
+            if link is None or not link.startswith(self._PYDOC_LINK_PREFIX):
+                module_names.add(ANY_MODULE)
+                continue
+
+            name_modules = set(self._iter_module_names(name))
+            if not name_modules:
+                module_names.add(ANY_MODULE)
+
+            module_names.update(name_modules)
+            module_names.update(
+                self._iter_module_names(link[len(self._PYDOC_LINK_PREFIX) : -1])
+            )
+
+        return sorted(module_names)
+
+    def _process_file_content(
+        self, file: MarkdownFile, entry: ManifestEntry
+    ) -> None:
+        """Process the tags and backticks in a single `file`, updating its
+        `content` and recording what it depended on in `entry`.
+
+        Rather than a separate rewrite of the whole file for each kind of tag,
+        this does one pass over the block tags (`@pydoc` and `@pyscope`),
+        producing a list of pieces, then a single scan of those pieces for
+        `@pylink` tags and backtick spans, and a single join at the end.
+
+        The result is the same as doing the passes one after the other. In
+        particular, all `@pyscope` tags are registered before anything is
+        resolved, so they apply to the whole file.
+        """
+        self._replace_inline_tags(
+            file, entry, self._replace_block_tags(file, entry)
+        )
+
+    def _replace_inline_tags(
+        self, file: MarkdownFile, entry: ManifestEntry, pieces: list[str]
+    ) -> None:
+        """Replace the `@pylink` tags and backtick spans in `pieces`, and set
+        `file.content` to the joined result.
+        """
+        out: list[str] = []
+
+        self._prefetch_external_links(file, self._iter_names(pieces))
+
+        for piece in pieces:
+            substitute_inline(
+                piece,
+                out,
                 "pylink",
-                partial(self._replace_pylink_tag, file),
+                partial(self._replace_pylink_tag, file, entry),
+                DocstringBacktickProcessor.BACKTICK_RE,
+                partial(self._replace_backticks_handler, file, entry),
             )
 
-            self._replace_backticks(file)
+        file.content = "".join(out)
 
-    def _replace_backticks(self, file: MarkdownFile) -> None:
-        file.content = DocstringBacktickProcessor.BACKTICK_RE.sub(
-            partial(self._replace_backticks_handler, file),
-            file.content,
+    def _iter_names(self, pieces: Iterable[str]) -> Iterable[str]:
+        """Yield the names in the `@pylink` tags and backtick spans of
+        `pieces`.
+        """
+        for piece in pieces:
+            if "{@pylink" in piece:
+                for tag in parse_inline_tags(piece):
+                    if tag.name == "pylink":
+                        yield tag.args.strip()
+            if "`" in piece:
+                for match in DocstringBacktickProcessor.BACKTICK_RE.finditer(
+                    piece
+                ):
+                    yield match.group(1)
+
+    def _prefetch_external_links(
+        self, file: None | MarkdownFile, names: Iterable[str]
+    ) -> None:
+        """Resolve those of `names` that need resolving externally — the ones
+        that don't resolve to our objects, relative to the `@pyscope` objects
+        of `file` included — in one batch (see
+        `doctor_genova.external_resolver.BatchResolver`), for
+        `_resolve_link_uncached` to pick up.
+
+        Names that are already in the link cache are skipped too, so the
+        external resolvers are only asked about names they'd get asked about
+        anyway.
+        """
+        scope_key = self._get_scope_key(file)
+        names = [
+            name
+            for name in dict.fromkeys(names)
+            if name not in self._external_links
+            and (name, scope_key) not in self._link_cache
+            and not self._find_api_objects(file, name)
+        ]
+        if not names:
+            return
+
+        for (
+            name,
+            resolved,
+        ) in self._external_resolvers.resolve_names_with_resolvers(
+            names
+        ).items():
+            self._external_links[name] = self._get_external_link(name, resolved)
+
+    def _resolve_external_link(self, name: str) -> None | str:
+        try:
+            return self._external_links[name]
+        except KeyError:
+            pass
+
+        resolved = None
+        for external_resolver in self._external_resolvers.iter_candidates(name):
+            if resolution := external_resolver.resolve_name(name):
+                resolved = (external_resolver, resolution)
+                break
+
+        link = self._external_links[name] = self._get_external_link(
+            name, resolved
         )
+        return link
 
-    def _resolve_api_object(
+    def _get_external_link(
+        self,
+        name: str,
+        resolved: Optional[tuple[ExternalResolver, ExternalResolution]],
+    ) -> None | str:
+        if resolved is None:
+            return None
+
+        external_resolver, resolution = resolved
+        md_link = resolution.get_md_link()
+
+        _LOG.info(
+            "  <fg=magenta>%s</fg> <fg=cyan>%s</fg> -> <fg=magenta>%s</fg>",
+            external_resolver.__class__.__name__,
+            name,
+            md_link,
+        )
+
+        return md_link
+
+    def _replace_block_tags(
+        self,
+        file: MarkdownFile,
+        entry: ManifestEntry,
+        rendered: Optional[list[int]] = None,
+    ) -> list[str]:
+        """Replace the `@pydoc` and `@pyscope` tags of `file`, returning the
+        pieces of the result.
+
+        If a `rendered` list is given, `@pydoc` renders are left as they are
+        (not repeated, see `_repeat_rendered`) and their indexes in the pieces
+        are added to it.
+        """
+        content = file.content
+        pieces: list[str] = []
+        emitted = 0
+
+        for tag in parse_block_tags(content):
+            if tag.name == "pydoc":
+                replacement = self._replace_pydoc_tag(file, entry, tag)
+
+                if replacement is not None:
+                    if rendered is None:
+                        replacement = self._repeat_rendered(
+                            file, entry, replacement
+                        )
+                    else:
+                        rendered.append(len(pieces) + 1)
+
+            elif tag.name == "pyscope":
+                replacement = self._replace_pyscope_tag(file, entry, tag)
+
+            else:
+                continue
+
+            if replacement is None:
+                continue
+
+            start, end = tag.offset_span
+            pieces.append(content[emitted:start])
+            pieces.append(replacement)
+            emitted = end
+
+        pieces.append(content[emitted:])
+
+        return pieces
+
+    def _find_api_objects(
         self, file: None | MarkdownFile, name: str
-    ) -> None | ApiObject:
+    ) -> list[ApiObject]:
+        """Find the objects `name` could refer to: by fully-qualified name,
+        or failing that relative to the `@pyscope` objects of `file`.
+        """
         api_objects = self.resolution_suite.resolve_fqn(name)
 
-        count = len(api_objects)
-
-        if count == 0 and file is not None:
+        if not api_objects and file is not None:
             for node in self._scope_api_objects[file.path.absolute()].values():
                 _LOG.info("resolving %s against reference %s", name, node.name)
 
@@ -247,7 +1152,14 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
                 ) and api_object.parent is node:
                     api_objects.append(api_object)
 
-            count = len(api_objects)
+        return api_objects
+
+    def _resolve_api_object(
+        self, file: None | MarkdownFile, name: str
+    ) -> None | ApiObject:
+        api_objects = self._find_api_objects(file, name)
+
+        count = len(api_objects)
 
         if count == 0:
             return None
@@ -261,7 +1173,42 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
 
         return api_objects[0]
 
+    def _get_scope_key(self, file: None | MarkdownFile) -> tuple[int, ...]:
+        if file is None:
+            return ()
+        if scope := self._scope_api_objects.get(file.path.absolute()):
+            return tuple(id(api_object) for api_object in scope.values())
+        return ()
+
     def _resolve_link(self, file: None | MarkdownFile, name: str) -> None | str:
+        """Resolve `name` to a link (or `None`), memoized by `name` and the
+        `@pyscope` objects in effect for `file`.
+
+        Misses are cached too, since most backtick spans don't resolve to
+        anything, and they're just as likely to repeat.
+        """
+        key = (name, self._get_scope_key(file))
+
+        try:
+            link = self._link_cache[key]
+        except KeyError:
+            self._link_cache_stats.misses += 1
+            link = self._link_cache[key] = self._resolve_link_uncached(
+                file, name
+            )
+        else:
+            self._link_cache_stats.hits += 1
+            _LOG.info(
+                "  <fg=blue>CACHED</fg> <fg=cyan>%s</fg> -> <fg=blue>%s</fg>",
+                name,
+                link,
+            )
+
+        return link
+
+    def _resolve_link_uncached(
+        self, file: None | MarkdownFile, name: str
+    ) -> None | str:
         if api_object := self._resolve_api_object(file, name):
             if isinstance(api_object, Indirection):
                 _LOG.info(
@@ -272,8 +1219,13 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
                 return self._resolve_link(file, api_object.target)
 
             else:
-                link = "{{@link pydoc:{}}}".format(
-                    ".".join(x.name for x in api_object.path)
+                # NOTE  Resolved objects usually come from the resolution suite,
+                #       but `@pyscope` references can also resolve to ones in
+                #       the publication suite, for which `get_fqn` falls back
+                #       to computing the name.
+                link = "{}{}}}".format(
+                    self._PYDOC_LINK_PREFIX,
+                    self.resolution_suite.get_fqn(api_object),
                 )
 
                 _LOG.info(
@@ -284,38 +1236,68 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
 
                 return link
 
-        for external_resolver in self._external_resolvers:
-            if resolution := external_resolver.resolve_name(name):
-                md_link = resolution.get_md_link()
-
-                _LOG.info(
-                    "  <fg=magenta>%s</fg> <fg=cyan>%s</fg> -> <fg=magenta>%s</fg>",
-                    external_resolver.__class__.__name__,
-                    name,
-                    md_link,
-                )
-
-                return md_link
+        if md_link := self._resolve_external_link(name):
+            return md_link
 
         _LOG.info("  <fg=red>NO MATCH</fg>")
         return None
 
     def _replace_backticks_handler(
-        self, file: MarkdownFile, match: re.Match
+        self, file: MarkdownFile, entry: ManifestEntry, match: re.Match
     ) -> str:
         src = match.group(0)
         fqn = match.group(1)
 
         _LOG.info("processing MD backtick <fg=cyan>%s</fg>", src)
 
-        if link := self._resolve_link(file, fqn):
+        link = entry.links[fqn] = self._resolve_link(file, fqn)
+
+        if link:
             return link
         else:
             return src
 
-    def _replace_pydoc_tag(self, file: MarkdownFile, tag: Tag) -> str | None:
+    def _replace_pydoc_tag(
+        self, file: MarkdownFile, entry: ManifestEntry, tag: Tag
+    ) -> str | None:
         fqn = tag.args.strip()
+        api_object = self._resolve_pydoc_object(fqn)
+
+        if api_object is None:
+            entry.pydocs.append(PydocDependency(fqn, tag.options, None))
+            entry.embed_modules.append(ANY_MODULE)
+            return None
+
+        render_key = self._get_render_key(api_object, tag.options)
+        entry.pydocs.append(PydocDependency(fqn, tag.options, render_key))
+        entry.embed_modules.append(api_object.path[0].name)
 
+        return self._render(api_object, tag.options, render_key)
+
+    def _repeat_rendered(
+        self, file: MarkdownFile, entry: ManifestEntry, rendered: str
+    ) -> str:
+        """Run `rendered` `@pydoc` Markdown through the preprocessors before
+        this one, then handle any `@pyscope` tags it has.
+        """
+        replacement = self.action.repeat(file.path, file.output_path, rendered)
+
+        # Rendered docs could (in theory) have `@pyscope` tags of their own,
+        # which need to be handled like the file's.
+        if "@pyscope" in replacement:
+            replacement = replace_tags(
+                replacement,
+                (
+                    t
+                    for t in parse_block_tags(replacement)
+                    if t.name == "pyscope"
+                ),
+                partial(self._replace_pyscope_tag, file, entry),
+            )
+
+        return replacement
+
+    def _resolve_pydoc_object(self, fqn: str) -> Optional[ApiObject]:
         objects = self.publication_suite.resolve_fqn(fqn)
         if len(objects) > 1:
             _LOG.warning(
@@ -327,25 +1309,83 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
             )
             return None
 
-        fp = io.StringIO()
-        self.renderer.render_object(fp, objects[0], tag.options)
-        return self.action.repeat(file.path, file.output_path, fp.getvalue())
+        return objects[0]
+
+    def _get_fingerprint(self, api_object: ApiObject) -> str:
+        # Objects in the publication suite don't change until the next
+        # `process_modules`, which clears this, so memoizing by identity is
+        # safe (the object is kept in the entry so the id can't be reused).
+        if (entry := self._fingerprints.get(id(api_object))) and (
+            entry[0] is api_object
+        ):
+            return entry[1]
+        fingerprint = fingerprint_api_object(api_object)
+        self._fingerprints[id(api_object)] = (api_object, fingerprint)
+        return fingerprint
+
+    def _get_render_key(self, api_object: ApiObject, options: dict) -> str:
+        """Get the render cache key for `api_object` with `options`.
+
+        The source link of the object is part of the key because it has the
+        current commit in it; the links of any members only differ from it by
+        line number, which the fingerprint already covers.
+        """
+        source_linker = self.renderer.source_linker
+        return self._render_cache.make_key(
+            self._get_fingerprint(api_object),
+            repr(sorted(options.items())),
+            source_linker and source_linker.get_source_url(api_object),
+        )
 
-    def _replace_pylink_tag(self, file: MarkdownFile, tag: Tag) -> str | None:
+    def _render(self, api_object: ApiObject, options: dict, key: str) -> str:
+        """Render `api_object` to Markdown, going through the render cache
+        (`key` comes from `_get_render_key`).
+        """
+        if (markdown := self._render_cache.get(key)) is not None:
+            _LOG.info(
+                "  <fg=blue>CACHED</fg> render of <fg=cyan>%s</fg>",
+                api_object.name,
+            )
+            return markdown
+
+        if exclude_members := options.get("exclude_members"):
+            api_object = without_members(api_object, exclude_members)
+
+        fp = io.StringIO()
+        self.renderer.render_object(fp, api_object, options)
+        markdown = fp.getvalue()
+        self._render_cache.put(key, markdown)
+        return markdown
+
+    def _replace_pylink_tag(
+        self, file: MarkdownFile, entry: ManifestEntry, tag: Tag
+    ) -> str | None:
         name = tag.args.strip()
 
         _LOG.info("processing @pylink tag <fg=cyan>%s</fg>", name)
 
         if link := self._resolve_link(file, name):
+            entry.links[name] = link
             return link
 
+        entry.links[name] = None
+
         return f"`{name}`"
 
-    def _replace_pyscope_tag(self, file: MarkdownFile, tag: Tag) -> str:
+    def _replace_pyscope_tag(
+        self, file: MarkdownFile, entry: ManifestEntry, tag: Tag
+    ) -> str:
         name = tag.args.strip()
 
         _LOG.info("processing @pyscope tag <fg=cyan>%s</fg>", name)
 
+        entry.scope_names.append(name)
+        self._add_scope_api_objects(file, name)
+
+        # Replace the tag with nothing
+        return ""
+
+    def _add_scope_api_objects(self, file: MarkdownFile, name: str) -> None:
         api_objects = self.publication_suite.resolve_fqn(name)
 
         if len(api_objects) == 0:
@@ -366,6 +1406,3 @@ class DrGenPreprocessor(MarkdownPreprocessor, Resolver):
             self._scope_api_objects[file.path.absolute()][
                 api_object.name
             ] = api_object
-
-        # Replace the tag with nothing
-        return ""
@@ -0,0 +1,254 @@
+"""Contains the `ProcessorPipeline` class."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
+import multiprocessing
+import threading
+from typing import Optional, Protocol, runtime_checkable
+
+from docspec import ApiObject, HasMembers, Module, filter_visit
+from pydoc_markdown.contrib.processors.crossref import CrossrefProcessor
+from pydoc_markdown.contrib.processors.filter import FilterProcessor
+from pydoc_markdown.contrib.processors.smart import SmartProcessor
+from pydoc_markdown.interfaces import Processor, Resolver
+
+from .docstring_backtick_processor import DocstringBacktickProcessor
+from .indexed_api_suite import IndexedApiSuite
+
+_LOG = logging.getLogger(__name__)
+
+#: Cross-references that didn't resolve, by object.
+_Unresolved = dict[str, list[str]]
+
+# Set in the parent right before the worker pool is forked (see
+# `ProcessorPipeline._process_in_parallel`).
+_WORKER_STATE: Optional[
+    tuple[
+        "ProcessorPipeline",
+        list[list[ApiObject]],
+        IndexedApiSuite,
+        Optional[Resolver],
+    ]
+] = None
+
+
+@runtime_checkable
+class PreloadingResolver(Protocol):
+    """A `Resolver` that loads some of what it needs lazily (like an index of
+    external names). `ProcessorPipeline` has it `preload` that before forking
+    workers, so they inherit it rather than each loading its own copy.
+    """
+
+    def preload(self) -> None:
+        ...
+
+
+def _process_shard_in_worker(
+    index: int,
+) -> tuple[list[Optional[str]], _Unresolved]:
+    assert _WORKER_STATE is not None, "worker state not set"
+    pipeline, shards, suite, resolver = _WORKER_STATE
+
+    shard = shards[index]
+    unresolved: _Unresolved = {}
+    pipeline._process_nodes(shard, suite, resolver, unresolved)
+
+    return (
+        [node.docstring and node.docstring.content for node in shard],
+        unresolved,
+    )
+
+
+@dataclass
+class ProcessorPipeline(Processor):
+    """Does the work of a `FilterProcessor`, `SmartProcessor`,
+    `CrossrefProcessor` and `DocstringBacktickProcessor` run one after the
+    other — with the same output — but with a single walk of the tree instead
+    of four.
+
+    How it goes:
+
+    1.  The tree is walked once, in post-order like `FilterProcessor` does,
+        filtering as we go and collecting the objects that are kept. When an
+        object is removed, the descendants collected before it are dropped
+        again, so docstrings of filtered-out objects are never touched.
+
+    2.  Resolving references needs the _whole_ filtered tree, so only then is
+        the (indexed) suite built, and each kept object gets the smart and
+        cross-reference treatment in turn.
+
+    3.  Backticks are resolved in a batch over the kept objects (see
+        `DocstringBacktickProcessor.process_nodes`).
+
+    Doing each object start-to-finish rather than each processor
+    start-to-finish gives the same result because the per-object work only
+    depends on that object's docstring and the structure of the tree, which
+    none of it changes.
+
+    NOTE    This calls into the per-object methods of the `pydoc-markdown`
+            processors, which are not public API; that's fine as long as the
+            version is pinned exactly (see `pyproject.toml`).
+
+    ##### Parallel Processing #####
+
+    Once the suite is built, the work is independent per object, so with
+    `workers` set the kept objects are split up by module and processed in
+    that many forked worker processes. They share the suite (and resolver)
+    read-only, and the transformed docstrings are merged back in order, so
+    the result is identical to the serial run.
+
+    Like `DrGenPreprocessor`'s file processing, this needs the `fork` start
+    method and falls back to serial processing without it, or when other
+    threads are running (like the file watcher when serving). A resolver that
+    is a `PreloadingResolver` is preloaded before forking.
+    """
+
+    filter: FilterProcessor
+    smart: SmartProcessor
+    crossref: CrossrefProcessor
+    backtick: DocstringBacktickProcessor
+    workers: Optional[int] = None
+
+    def process(
+        self, modules: list[Module], resolver: Optional[Resolver]
+    ) -> None:
+        nodes = self._filter(modules)
+
+        suite = IndexedApiSuite(modules)
+        unresolved: _Unresolved = {}
+
+        shards = self._shard(nodes)
+
+        if self._can_process_in_parallel(shards):
+            self._process_in_parallel(shards, suite, resolver, unresolved)
+        else:
+            self._process_nodes(nodes, suite, resolver, unresolved)
+
+        if unresolved:
+            _LOG.warning(
+                "%s cross-reference(s) could not be resolved:\n%s",
+                sum(map(len, unresolved.values())),
+                "\n".join(
+                    "  {}: {}".format(uid, ", ".join(refs))
+                    for uid, refs in unresolved.items()
+                ),
+            )
+
+    def _process_nodes(
+        self,
+        nodes: list[ApiObject],
+        suite: IndexedApiSuite,
+        resolver: Optional[Resolver],
+        unresolved: _Unresolved,
+    ) -> None:
+        for node in nodes:
+            if node.docstring is None:
+                continue
+            self.smart._process(node)
+            self.crossref._preprocess_refs(node, resolver, suite, unresolved)
+
+        self.backtick.process_nodes(nodes, suite, resolver)
+
+    def _shard(self, nodes: list[ApiObject]) -> list[list[ApiObject]]:
+        """Split post-ordered `nodes` up by module; each module comes right
+        after its descendants.
+        """
+        shards: list[list[ApiObject]] = []
+        start = 0
+        for index, node in enumerate(nodes):
+            if isinstance(node, Module):
+                shards.append(nodes[start : index + 1])
+                start = index + 1
+        if start < len(nodes):
+            shards.append(nodes[start:])
+        return shards
+
+    def _can_process_in_parallel(self, shards: list[list[ApiObject]]) -> bool:
+        if not self.workers or self.workers < 2 or len(shards) < 2:
+            return False
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            _LOG.warning(
+                "Parallel processing needs the 'fork' start method, which is "
+                "not available; processing modules serially"
+            )
+            return False
+
+        if threading.active_count() > 1:
+            _LOG.warning(
+                "Other threads are running, which makes forking unsafe; "
+                "processing modules serially"
+            )
+            return False
+
+        return True
+
+    def _process_in_parallel(
+        self,
+        shards: list[list[ApiObject]],
+        suite: IndexedApiSuite,
+        resolver: Optional[Resolver],
+        unresolved: _Unresolved,
+    ) -> None:
+        global _WORKER_STATE
+
+        assert self.workers is not None
+        workers = min(self.workers, len(shards))
+
+        _LOG.info(
+            "Processing %d module(s) in %d worker processes",
+            len(shards),
+            workers,
+        )
+
+        if isinstance(resolver, PreloadingResolver):
+            resolver.preload()
+
+        _WORKER_STATE = (self, shards, suite, resolver)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                results = list(
+                    executor.map(_process_shard_in_worker, range(len(shards)))
+                )
+        finally:
+            _WORKER_STATE = None
+
+        for shard, (contents, shard_unresolved) in zip(shards, results):
+            for node, content in zip(shard, contents):
+                if node.docstring is not None and content is not None:
+                    node.docstring.content = content
+            for uid, refs in shard_unresolved.items():
+                unresolved.setdefault(uid, []).extend(refs)
+
+    def _filter(self, modules: list[Module]) -> list[ApiObject]:
+        """Filter `modules` (in place) and return the objects that are left,
+        in post-order.
+        """
+        nodes: list[ApiObject] = []
+
+        # Number of kept descendants, by object `id`. In post-order those are
+        # always the most recently collected nodes.
+        descendant_counts: dict[int, int] = {}
+
+        def predicate(node: ApiObject) -> bool:
+            count = 0
+            if isinstance(node, HasMembers):
+                for member in node.members:
+                    count += 1 + descendant_counts.pop(id(member), 0)
+
+            if self.filter._match(node):
+                nodes.append(node)
+                descendant_counts[id(node)] = count
+                return True
+
+            if count:
+                del nodes[-count:]
+            return False
+
+        filter_visit(modules, predicate, order="post")
+
+        return nodes
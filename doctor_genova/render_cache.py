@@ -0,0 +1,140 @@
+"""Caching of rendered `@pydoc` Markdown, so objects that are included on
+several pages — or that haven't changed since the last `novella --serve`
+rerun — aren't rendered over and over again.
+"""
+
+import dataclasses
+import enum
+import hashlib
+import logging
+from typing import Any, Optional
+
+from docspec import ApiObject
+
+from .caching import (
+    CacheStats,
+    DiskCache,
+    LRUCache,
+    get_package_version,
+    make_cache_key,
+)
+
+_LOG = logging.getLogger(__name__)
+
+#: Default size limit of the in-memory render cache, in characters.
+#:
+#: ```python
+#: 64 * 1024 * 1024
+#: ```
+#:
+DEFAULT_RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _update_fingerprint(digest: "hashlib._Hash", value: Any) -> None:
+    if isinstance(value, ApiObject) or dataclasses.is_dataclass(value):
+        digest.update(type(value).__name__.encode("utf-8"))
+        digest.update(b"(")
+        # `dataclasses.fields` doesn't include the `_parent` weakref, which is
+        # good — that's how we avoid walking back up the tree.
+        for field in dataclasses.fields(value):
+            digest.update(field.name.encode("utf-8"))
+            digest.update(b"=")
+            _update_fingerprint(digest, getattr(value, field.name))
+        digest.update(b")")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_fingerprint(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, enum.Enum):
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b";")
+    else:
+        digest.update(repr(value).encode("utf-8"))
+        digest.update(b";")
+
+
+def fingerprint_api_object(api_object: ApiObject) -> str:
+    """Hash everything about `api_object` that goes into rendering it: its
+    location, docstring, signature (arguments, return type, decorations,
+    bases...) and all of its members, recursively.
+
+    The rendered header also depends on where the object sits in the tree, so
+    the names and types along its `path` are hashed too.
+    """
+    digest = hashlib.sha256()
+    for node in api_object.path:
+        digest.update(type(node).__name__.encode("utf-8"))
+        digest.update(b":")
+        digest.update(node.name.encode("utf-8"))
+        digest.update(b".")
+    _update_fingerprint(digest, api_object)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Rendered Markdown, keyed by a fingerprint of the API object plus the
+    `@pydoc` tag options (and whatever else the caller puts in the key, like
+    the source link of the object, which depends on the current commit).
+
+    Entries are held in an in-memory `LRUCache`, which is bounded by size and
+    outlives reruns, and optionally persisted to a `DiskCache` (keyed by the
+    `pydoc-markdown` and `doctor-genova` versions as well).
+    """
+
+    _memory: LRUCache[str, str]
+    _disk_cache: Optional[DiskCache]
+    _versions: tuple[str, str]
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_RENDER_CACHE_MAX_BYTES,
+        disk_cache: Optional[DiskCache] = None,
+    ) -> None:
+        self._memory = LRUCache(max_bytes)
+        self._disk_cache = disk_cache
+        self._versions = (
+            get_package_version("pydoc-markdown"),
+            get_package_version("doctor-genova"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hits and misses of the in-memory cache. Disk hits count as misses
+        here, since they still cost a read.
+        """
+        return self._memory.stats
+
+    def make_key(self, fingerprint: str, *parts: object) -> str:
+        return make_cache_key(*self._versions, fingerprint, *parts)
+
+    def get(self, key: str) -> Optional[str]:
+        if (markdown := self._memory.get(key)) is not None:
+            return markdown
+
+        if self._disk_cache is None:
+            return None
+
+        if (data := self._disk_cache.get(key)) is None:
+            return None
+
+        try:
+            markdown = data.decode("utf-8")
+        except UnicodeDecodeError:
+            _LOG.warning("Discarding undecodable render cache entry %s", key)
+            self._disk_cache.discard(key)
+            return None
+
+        self._memory.put(key, markdown)
+        return markdown
+
+    def put(self, key: str, markdown: str) -> None:
+        self._memory.put(key, markdown)
+        if self._disk_cache is not None:
+            self._disk_cache.put(key, markdown.encode("utf-8"))
+
+    def clear(self) -> None:
+        self._memory.clear()
@@ -0,0 +1,336 @@
+"""A static index of the public names in the Python standard library and
+their docs URLs, so `doctor_genova.stdlib_resolver.StdlibResolver` can resolve
+names with a `dict` lookup instead of finding and importing modules.
+
+The index is generated once per Python minor version (in a subprocess, so all
+the importing it takes doesn't happen in the build process) and stored as
+compressed JSON in a cache directory, by default `~/.cache/doctor-genova`.
+"""
+
+from dataclasses import dataclass
+from importlib.util import find_spec
+from inspect import isclass, isfunction, ismethoddescriptor, ismodule
+import json
+import logging
+import os
+from pathlib import Path
+import pkgutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Iterable, Optional, Union
+import zlib
+
+from .caching import get_package_version
+
+_LOG = logging.getLogger(__name__)
+
+#: Bump when the file format (or what goes in it) changes.
+INDEX_FORMAT = 1
+
+#: How long generating the index (in a subprocess) may take, in seconds,
+#: before giving up on it. It usually takes a few.
+GENERATE_TIMEOUT = 120
+
+#: Standard library modules that are not indexed, because importing them has
+#: side effects (`antigravity` opens a browser, `this` prints) or they are not
+#: something anyone links to.
+SKIP_MODULES = frozenset(
+    (
+        "__main__",
+        "antigravity",
+        "idlelib",
+        "lib2to3",
+        "pydoc_data",
+        "test",
+        "this",
+        "tkinter",
+        "turtle",
+        "turtledemo",
+    )
+)
+
+
+@dataclass(frozen=True)
+class IndexResolution:
+    """An `doctor_genova.external_resolver.ExternalResolution` from a
+    `StdlibIndex`. Unlike `StdlibResolver.Resolution`, there's no module or
+    target object, since nothing was imported.
+    """
+
+    name: str
+    url: str
+    kind: str
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_url(self) -> str:
+        return self.url
+
+    def get_md_link(self) -> str:
+        return "[{}]({})".format(self.name, self.url)
+
+
+def get_index_filename() -> str:
+    return "stdlib-index-{}-{}.{}.json.z".format(
+        sys.implementation.name, *sys.version_info[:2]
+    )
+
+
+def get_kind(obj: Any) -> str:
+    if ismodule(obj):
+        return "module"
+    if isclass(obj):
+        if issubclass(obj, BaseException):
+            return "exception"
+        return "class"
+    if isfunction(obj) or ismethoddescriptor(obj) or callable(obj):
+        return "function"
+    return "data"
+
+
+def iter_stdlib_module_names() -> Iterable[str]:
+    """Yield the names of the public standard library modules and their
+    public submodules, without importing anything.
+    """
+    for name in sorted(sys.stdlib_module_names):
+        if name.startswith("_") or name in SKIP_MODULES:
+            continue
+
+        yield name
+
+        try:
+            spec = find_spec(name)
+        except (ImportError, ValueError):
+            continue
+
+        if spec is not None and spec.submodule_search_locations:
+            yield from _iter_submodule_names(
+                name, list(spec.submodule_search_locations)
+            )
+
+
+def _iter_submodule_names(prefix: str, paths: list[str]) -> Iterable[str]:
+    for info in pkgutil.iter_modules(paths):
+        if info.name.startswith("_"):
+            continue
+        name = prefix + "." + info.name
+        yield name
+        if info.ispkg:
+            yield from _iter_submodule_names(
+                name, [os.path.join(path, info.name) for path in paths]
+            )
+
+
+class StdlibIndex:
+    """Maps public standard library names — modules, their members, and the
+    members of classes in them — to a `(kind, url)` pair.
+
+    Anything not in the index might still be resolvable by importing (private
+    or inherited members, deeper paths), but only if it's under a standard
+    library module, which `may_resolve` tells you.
+    """
+
+    _url_base: str
+    _entries: dict[str, tuple[str, str]]
+    _modules: frozenset[str]
+
+    def __init__(
+        self,
+        url_base: str,
+        entries: dict[str, tuple[str, str]],
+        modules: Iterable[str],
+    ) -> None:
+        self._url_base = url_base
+        self._entries = entries
+        self._modules = frozenset(modules)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def resolve(self, name: str) -> Optional[IndexResolution]:
+        if (entry := self._entries.get(name)) is None:
+            return None
+        kind, url = entry
+        return IndexResolution(name=name, url=self._url_base + url, kind=kind)
+
+    @property
+    def modules(self) -> frozenset[str]:
+        """The standard library modules and builtins; nothing resolves unless
+        its first part is one of these.
+        """
+        return self._modules
+
+    def may_resolve(self, name: str) -> bool:
+        """Could `name` resolve in the standard library at all? That is, is
+        the first part of it a builtin or a standard library module?
+        """
+        return name.partition(".")[0] in self._modules
+
+    @classmethod
+    def generate(cls) -> "StdlibIndex":
+        """Build the index by importing the standard library, running each
+        candidate name through the import-based `StdlibResolver` so results are
+        exactly what it would give.
+
+        This imports _a lot_; see `load_or_generate`, which does it in a
+        subprocess.
+        """
+        from .stdlib_resolver import StdlibResolver
+
+        resolver = StdlibResolver()
+        entries: dict[str, tuple[str, str]] = {}
+        url_base = resolver.build_url("")
+
+        def add(name: str) -> Optional[Any]:
+            try:
+                resolution = resolver.resolve_name(name)
+            except Exception:
+                _LOG.debug("Failed to resolve %s", name, exc_info=True)
+                return None
+            if not isinstance(resolution, StdlibResolver.Resolution):
+                return None
+            try:
+                target = resolution.target
+            except AttributeError:
+                return None
+            url = resolution.get_url()
+            if url.startswith(url_base):
+                entries[name] = (get_kind(target), url[len(url_base) :])
+            return target
+
+        builtins_module = sys.modules["builtins"]
+        for name in dir(builtins_module):
+            add(name)
+
+        modules = set(sys.stdlib_module_names) | set(sys.builtin_module_names)
+
+        for module_name in iter_stdlib_module_names():
+            if (module := add(module_name)) is None or not ismodule(module):
+                continue
+
+            for member_name in dir(module):
+                if member_name.startswith("_"):
+                    continue
+                member = add(module_name + "." + member_name)
+                if isclass(member) and member.__module__ == module.__name__:
+                    for attr_name in vars(member):
+                        if not attr_name.startswith("_"):
+                            add(
+                                "{}.{}.{}".format(
+                                    module_name, member_name, attr_name
+                                )
+                            )
+
+        modules.update(name for name in entries if "." not in name)  # builtins
+
+        return cls(url_base, entries, modules)
+
+    def dump(self) -> bytes:
+        return zlib.compress(
+            json.dumps(
+                {
+                    "format": INDEX_FORMAT,
+                    "doctor_genova": get_package_version("doctor-genova"),
+                    "python": list(sys.version_info[:2]),
+                    "url_base": self._url_base,
+                    "modules": sorted(self._modules),
+                    "entries": self._entries,
+                },
+                separators=(",", ":"),
+            ).encode("utf-8")
+        )
+
+    @classmethod
+    def load(cls, data: bytes) -> "StdlibIndex":
+        """Inverse of `dump`. Raises `ValueError` if `data` is not an index
+        for this format, package and Python version.
+        """
+        obj = json.loads(zlib.decompress(data).decode("utf-8"))
+
+        if (
+            obj.get("format") != INDEX_FORMAT
+            or obj.get("doctor_genova") != get_package_version("doctor-genova")
+            or obj.get("python") != list(sys.version_info[:2])
+        ):
+            raise ValueError("stdlib index is stale")
+
+        return cls(
+            obj["url_base"],
+            {name: tuple(entry) for name, entry in obj["entries"].items()},
+            obj["modules"],
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write to `path` atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(self.dump())
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load_or_generate(
+        cls, directory: Union[str, Path], timeout: float = GENERATE_TIMEOUT
+    ) -> Optional["StdlibIndex"]:
+        """Load the index for the running Python from `directory`, generating
+        it first (in a subprocess, killed after `timeout` seconds) if it's
+        missing or stale.
+
+        Returns `None` if that fails, in which case callers should fall back
+        to importing.
+        """
+        path = Path(directory) / get_index_filename()
+
+        try:
+            return cls.load(path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, zlib.error):
+            _LOG.info("Regenerating stale stdlib index at %s", path)
+
+        _LOG.info("Generating stdlib index at %s", path)
+
+        try:
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys\n"
+                    "from doctor_genova.stdlib_index import StdlibIndex\n"
+                    "StdlibIndex.generate().save(sys.argv[1])\n",
+                    str(path),
+                ],
+                check=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+            )
+            return cls.load(path.read_bytes())
+        except (
+            OSError,
+            ValueError,
+            zlib.error,
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+        ):
+            _LOG.warning(
+                "Failed to generate stdlib index at %s; falling back to "
+                "importing modules",
+                path,
+                exc_info=True,
+            )
+            return None
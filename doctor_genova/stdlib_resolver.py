@@ -1,3 +1,4 @@
+import ast
 from dataclasses import dataclass
 from functools import cached_property
 from inspect import getmembers, isclass
@@ -9,10 +10,111 @@ from pathlib import Path
 from types import ModuleType
 from typing import Any, Iterable, Optional, Sequence, Union
 
+from .caching import (
+    CacheStats,
+    LRUCache,
+    get_user_cache_dir,
+    make_cache_key,
+)
 from .external_resolver import ExternalResolution
+from .stdlib_index import StdlibIndex, get_index_filename
 
 _LOG = logging.getLogger(__name__)
 
+#: Default for how many `StdlibResolver.resolve_name` results are cached.
+DEFAULT_CACHE_MAX_ENTRIES = 4096
+
+#: Names bound in a module's source, by scope: `()` for the module itself and
+#: the path of class names for each class (nested ones too) defined in it.
+SourceNames = dict[tuple[str, ...], set[str]]
+
+
+def get_source_names(source: str, filename: str = "<unknown>") -> SourceNames:
+    """Collect the names bound at module level and in class bodies of Python
+    `source`, without running any of it.
+
+    Names bound in any branch of an `if` or `try` count, so platform-specific
+    names are included whichever platform this is.
+
+    ```python
+    >>> names = get_source_names(
+    ...     "import os.path\\n"
+    ...     "from typing import Any as A\\n"
+    ...     "X, *Y = 1, 2\\n"
+    ...     "class C:\\n"
+    ...     "    z: int = 0\\n"
+    ...     "    class D:\\n"
+    ...     "        def f(self): w = 1\\n"
+    ... )
+    >>> sorted(names[()])
+    ['A', 'C', 'X', 'Y', 'os']
+    >>> sorted(names[("C",)]), names[("C", "D")]
+    (['D', 'z'], {'f'})
+
+    ```
+    """
+    names: SourceNames = {}
+    _add_body_names(ast.parse(source, filename).body, (), names)
+    return names
+
+
+def _add_body_names(
+    body: list[ast.stmt], scope: tuple[str, ...], names: SourceNames
+) -> None:
+    scope_names = names.setdefault(scope, set())
+
+    for stmt in body:
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            scope_names.add(stmt.name)
+        elif isinstance(stmt, ast.ClassDef):
+            scope_names.add(stmt.name)
+            _add_body_names(stmt.body, scope + (stmt.name,), names)
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                scope_names.add(alias.asname or alias.name.partition(".")[0])
+        elif isinstance(stmt, ast.ImportFrom):
+            for alias in stmt.names:
+                if alias.name != "*":
+                    scope_names.add(alias.asname or alias.name)
+        elif isinstance(stmt, ast.Delete):
+            for target in stmt.targets:
+                for name in _iter_target_names(target):
+                    scope_names.discard(name)
+        elif isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            for target in (
+                stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            ):
+                scope_names.update(_iter_target_names(target))
+        elif isinstance(stmt, (ast.For, ast.AsyncFor)):
+            scope_names.update(_iter_target_names(stmt.target))
+            _add_body_names(stmt.body + stmt.orelse, scope, names)
+        elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+            for item in stmt.items:
+                if item.optional_vars is not None:
+                    scope_names.update(_iter_target_names(item.optional_vars))
+            _add_body_names(stmt.body, scope, names)
+        elif isinstance(stmt, (ast.If, ast.While)):
+            _add_body_names(stmt.body + stmt.orelse, scope, names)
+        elif isinstance(stmt, ast.Try):
+            _add_body_names(
+                stmt.body
+                + [s for handler in stmt.handlers for s in handler.body]
+                + stmt.orelse
+                + stmt.finalbody,
+                scope,
+                names,
+            )
+
+
+def _iter_target_names(target: ast.expr) -> Iterable[str]:
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _iter_target_names(element)
+    elif isinstance(target, ast.Starred):
+        yield from _iter_target_names(target.value)
+
 
 class StdlibResolver:
     """
@@ -115,6 +217,50 @@ class StdlibResolver:
         url='https://docs.python.org/.../library/inspect.html#inspect.Parameter.default')
 
     ```
+
+    ##### Static Index #####
+
+    Resolving through imports means finding (and maybe executing) modules for
+    every name, which is slow and has side effects. Pass `use_index=True` to
+    resolve from a `doctor_genova.stdlib_index.StdlibIndex` instead, which is
+    generated once per Python version into `index_dir` (the user cache
+    directory by default) and loaded on first use.
+
+    Names found in the index come back as
+    `doctor_genova.stdlib_index.IndexResolution`. Names that aren't in the
+    index, but _are_ under a standard library module (private or inherited
+    members, for instance), still go through the import-based resolution, so
+    results are the same either way — and names that can't be in the standard
+    library are rejected right away.
+
+    ##### Caching #####
+
+    Most names thrown at a resolver (everything in backticks, really) are not
+    from the standard library, and the same ones come up over and over. So:
+
+    1.  Results of `resolve_name` — misses (`None`) included — are kept in an
+        LRU cache of up to `cache_max_entries` names.
+
+    2.  Whether each module name is a standard library module is cached too,
+        and a name whose first part isn't one is rejected without looking at
+        the rest. A miss on `foo.bar.baz` never has to look for `foo.bar` or
+        `foo.bar.baz` modules (which would mean importing `foo`).
+
+    Hit and miss counts are in `cache_stats` and `spec_cache_stats`.
+
+    ##### Static Member Checks #####
+
+    Checking that a module has a member means importing it, which is slow,
+    grows the build process and can pull in platform-specific modules. With
+    `static_members=True`, modules are found without importing anything and
+    members are first looked for in the names bound in the module's source
+    (see `get_source_names`, parsed once per file). Only when that doesn't
+    find the member — it's inherited, set dynamically or the module is an
+    extension or built-in one without source — does resolution fall back to
+    importing.
+
+    Resolutions found that way don't have a `module` yet; it's imported if
+    and when their `target` is asked for.
     """
 
     BUILTIN_CONSTANTS = (None, True, False, NotImplemented, Ellipsis, __debug__)
@@ -124,13 +270,14 @@ class StdlibResolver:
         name: str
         url: str
         module_spec: ModuleSpec
-        module: ModuleType
+        module: Optional[ModuleType]
         member_path: list[str]
 
         @cached_property
         def target(self) -> Any:
             return StdlibResolver.get_module_member(
-                self.module, self.member_path
+                self.module or StdlibResolver.get_module(self.module_spec),
+                self.member_path,
             )
 
         def get_name(self) -> str:
@@ -205,8 +352,37 @@ class StdlibResolver:
     _builtin_spec: ModuleSpec
     _builtin_module: ModuleType
     _builtin_members: dict[str, Any]
+    _use_index: bool
+    _index_dir: Path
+    _cache: LRUCache[str, tuple[Optional[ExternalResolution]]]
+    _stdlib_specs: dict[str, Optional[ModuleSpec]]
+    _spec_cache_stats: CacheStats
+    _static_members: bool
+    _static_specs: dict[str, Optional[ModuleSpec]]
+    _source_names: dict[str, Optional[SourceNames]]
+
+    def __init__(
+        self,
+        use_index: bool = False,
+        index_dir: Union[None, str, Path] = None,
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        static_members: bool = False,
+    ):
+        self._use_index = use_index
+        self._index_dir = (
+            get_user_cache_dir() if index_dir is None else Path(index_dir)
+        )
+
+        # Results are wrapped in a tuple so cached misses (`None`) can be told
+        # apart from cache misses, and each counts as 1 towards the limit.
+        self._cache = LRUCache(max_bytes=cache_max_entries, sizeof=lambda _: 1)
+        self._stdlib_specs = {}
+        self._spec_cache_stats = CacheStats()
+
+        self._static_members = static_members
+        self._static_specs = {}
+        self._source_names = {}
 
-    def __init__(self):
         self._stdlib_path = Path(logging.__file__).parents[1]
 
         self._builtin_spec = self.need_spec(str.__module__)
@@ -217,6 +393,66 @@ class StdlibResolver:
             sys.version_info[0], sys.version_info[1]
         )
 
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Hit and miss counts of the `resolve_name` result cache."""
+        return self._cache.stats
+
+    @property
+    def spec_cache_stats(self) -> CacheStats:
+        """Hit and miss counts of the cache of which module names are standard
+        library modules.
+        """
+        return self._spec_cache_stats
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._stdlib_specs.clear()
+        self._static_specs.clear()
+        self._source_names.clear()
+
+    @cached_property
+    def index(self) -> Optional[StdlibIndex]:
+        """The static index, if `use_index` was given and it could be loaded
+        (or generated).
+        """
+        if not self._use_index:
+            return None
+        return StdlibIndex.load_or_generate(self._index_dir)
+
+    def get_version(self) -> str:
+        """Changes with the Python version (the docs URLs have it), the
+        options and, when using it, the index file (see
+        `doctor_genova.external_resolver.VersionedResolver`). Doesn't load or
+        generate the index.
+        """
+        index_stamp = None
+        if self._use_index:
+            try:
+                stat = (self._index_dir / get_index_filename()).stat()
+                index_stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return make_cache_key(
+            sys.implementation.name,
+            sys.version_info[:3],
+            self._url_base,
+            self._use_index,
+            self._static_members,
+            index_stamp,
+        )
+
+    def get_namespaces(self) -> Optional[Iterable[str]]:
+        """The namespaces names can resolve in (see
+        `doctor_genova.external_resolver.NamespacedResolver`): the standard
+        library modules and builtins, if the index is in use. Without it,
+        whether something is in the standard library is only found out by
+        looking, so there's no telling.
+        """
+        if (index := self.index) is None:
+            return None
+        return index.modules
+
     def build_url(
         self, path: str, anchor: Union[None, str, list[str]] = None
     ) -> str:
@@ -252,11 +488,135 @@ class StdlibResolver:
         return True
 
     def get_stdlib_spec(self, name: str) -> Optional[ModuleSpec]:
-        if spec := self.get_spec(name):
-            if self.is_stdlib_spec(spec):
+        """Get the spec of module `name` if it's in the standard library. Both
+        answers are cached.
+        """
+        try:
+            spec = self._stdlib_specs[name]
+        except KeyError:
+            self._spec_cache_stats.misses += 1
+        else:
+            self._spec_cache_stats.hits += 1
+            return spec
+
+        spec = self.get_spec(name)
+        if spec is not None and not self.is_stdlib_spec(spec):
+            spec = None
+        self._stdlib_specs[name] = spec
+        return spec
+
+    def get_stdlib_spec_statically(self, name: str) -> Optional[ModuleSpec]:
+        """Like `get_stdlib_spec`, but without importing parent packages:
+        submodules are looked for in the search locations of their parent's
+        spec.
+        """
+        try:
+            return self._static_specs[name]
+        except KeyError:
+            pass
+
+        parent_name, _, child_name = name.rpartition(".")
+        if not parent_name:
+            spec = self.get_stdlib_spec(name)
+        elif (
+            parent_spec := self.get_stdlib_spec_statically(parent_name)
+        ) is None or parent_spec.submodule_search_locations is None:
+            spec = None
+        else:
+            spec = self._find_submodule_spec(
+                name, list(parent_spec.submodule_search_locations)
+            )
+            if spec is not None and not self.is_stdlib_spec(spec):
+                spec = None
+
+        self._static_specs[name] = spec
+        return spec
+
+    @staticmethod
+    def _find_submodule_spec(
+        name: str, search_locations: list[str]
+    ) -> Optional[ModuleSpec]:
+        # What `importlib.util.find_spec` does once the parent is imported
+        if (module := sys.modules.get(name)) is not None:
+            return module.__spec__
+        for finder in sys.meta_path:
+            if (find_spec := getattr(finder, "find_spec", None)) is None:
+                continue
+            if (spec := find_spec(name, search_locations)) is not None:
                 return spec
         return None
 
+    def get_source_names(self, spec: ModuleSpec) -> Optional[SourceNames]:
+        """Get the names bound in the source of the module of `spec`, if it
+        has Python source. Parsed once per file.
+        """
+        if (origin := spec.origin) is None or not origin.endswith(".py"):
+            return None
+
+        try:
+            return self._source_names[origin]
+        except KeyError:
+            pass
+
+        try:
+            names = get_source_names(
+                Path(origin).read_text(encoding="utf-8"), origin
+            )
+        except (OSError, SyntaxError, ValueError):
+            _LOG.debug("Failed to parse %s", origin, exc_info=True)
+            names = None
+
+        self._source_names[origin] = names
+        return names
+
+    def source_has_member(
+        self, spec: ModuleSpec, member_path: Sequence[str]
+    ) -> bool:
+        """Check if `member_path` is bound in the source of the module of
+        `spec`, following classes defined there. `False` means _not found_,
+        not that it doesn't exist.
+        """
+        if (names := self.get_source_names(spec)) is None:
+            return False
+
+        for index, name in enumerate(member_path):
+            scope_names = names.get(tuple(member_path[:index]))
+            if scope_names is None or name not in scope_names:
+                return False
+
+        return True
+
+    def _resolve_statically(
+        self, name: str, name_parts: list[str]
+    ) -> Optional["StdlibResolver.Resolution"]:
+        # The longest prefix that's a module, like the import-based loop
+        # finds first.
+        module_spec = None
+        for rindex in range(1, len(name_parts) + 1):
+            spec = self.get_stdlib_spec_statically(
+                ".".join(name_parts[:rindex])
+            )
+            if spec is None:
+                break
+            module_spec, module_rindex = spec, rindex
+
+        if module_spec is None:
+            return None
+
+        module_name = ".".join(name_parts[:module_rindex])
+        member_path = name_parts[module_rindex:]
+
+        if self.source_has_member(module_spec, member_path):
+            return self.Resolution(
+                name=name,
+                module_spec=module_spec,
+                module=None,
+                member_path=member_path,
+                url=self.get_stdlib_url(module_name, member_path),
+            )
+
+        return None
+
     def is_builtin_name(self, name: str) -> bool:
         if "." in name:
             return False
@@ -289,17 +649,106 @@ class StdlibResolver:
 
         Examples in the class doc.
         """
+        if (cached := self._cache.get(name)) is not None:
+            return cached[0]
+
+        resolution = self._resolve_name_uncached(name)
+        self._cache.put(name, (resolution,))
+        return resolution
+
+    def resolve_names(
+        self, names: Iterable[str]
+    ) -> dict[str, None | ExternalResolution]:
+        """Resolve a batch of `names` at once (see
+        `doctor_genova.external_resolver.BatchResolver`).
+
+        Whatever the cache, index or builtins don't answer is grouped by
+        top-level module, so each module is only looked up once for the batch,
+        and a group whose module isn't in the standard library is rejected as
+        a whole.
+        """
+        results: dict[str, None | ExternalResolution] = {}
+        groups: dict[str, list[tuple[str, list[str]]]] = {}
+
+        for name in names:
+            if name in results:
+                continue
+
+            if (cached := self._cache.get(name)) is not None:
+                results[name] = cached[0]
+                continue
+
+            if (early := self._resolve_without_modules(name)) is not None:
+                results[name] = early[0]
+                self._cache.put(name, early)
+                continue
+
+            name_parts = name.split(".")
+            groups.setdefault(name_parts[0], []).append((name, name_parts))
+            # Placeholder, so duplicates are skipped (and order is kept)
+            results[name] = None
+
+        for module_name, group in groups.items():
+            in_stdlib = self.get_stdlib_spec(module_name) is not None
+            for name, name_parts in group:
+                resolution = (
+                    self._resolve_in_modules(name, name_parts)
+                    if in_stdlib
+                    else None
+                )
+                results[name] = resolution
+                self._cache.put(name, (resolution,))
+
+        return results
+
+    def _resolve_name_uncached(self, name: str) -> None | ExternalResolution:
+        if (early := self._resolve_without_modules(name)) is not None:
+            return early[0]
+
+        name_parts = name.split(".")
+
+        # Nothing under a module that isn't in the standard library (or doesn't
+        # exist) is, so don't go looking for (and importing) submodules.
+        if self.get_stdlib_spec(name_parts[0]) is None:
+            return None
+
+        return self._resolve_in_modules(name, name_parts)
+
+    def _resolve_without_modules(
+        self, name: str
+    ) -> Optional[tuple[None | ExternalResolution]]:
+        """Resolve `name` if that doesn't take looking at modules: from the
+        index, or as a builtin. The result comes wrapped in a tuple, since
+        `None` is a perfectly good answer; `None` itself means it takes
+        modules.
+        """
+        if (index := self.index) is not None:
+            if resolution := index.resolve(name):
+                return (resolution,)
+            if not index.may_resolve(name):
+                return (None,)
 
         if "." not in name and self.is_builtin_name(name):
-            return self.Resolution(
-                name=name,
-                module_spec=self._builtin_spec,
-                module=self._builtin_module,
-                member_path=[name],
-                url=self.get_builtin_url(name),
+            return (
+                self.Resolution(
+                    name=name,
+                    module_spec=self._builtin_spec,
+                    module=self._builtin_module,
+                    member_path=[name],
+                    url=self.get_builtin_url(name),
+                ),
             )
 
-        name_parts = name.split(".")
+        return None
+
+    def _resolve_in_modules(
+        self, name: str, name_parts: list[str]
+    ) -> None | ExternalResolution:
+        if self._static_members and (
+            resolution := self._resolve_statically(name, name_parts)
+        ):
+            return resolution
+
         for rindex in range(len(name_parts), 0, -1):
             module_name = ".".join(name_parts[0:rindex])
             member_path = name_parts[rindex:]
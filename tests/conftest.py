@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+import shutil
+from types import SimpleNamespace
+from typing import Any, Callable, Optional, Sequence
+
+from novella.markdown.preprocessor import MarkdownPreprocessorAction
+import pytest
+
+from doctor_genova.preprocessor import DrGenPreprocessor
+from doctor_genova.stdlib_index import StdlibIndex, get_index_filename
+
+
+@dataclass
+class FakeBuild:
+    """Just enough of a `novella.build.BuildContext` for the Markdown
+    preprocessing action.
+    """
+
+    directory: Path
+    watched: list[Path] = field(default_factory=list)
+
+    def watch(self, path: Path) -> None:
+        self.watched.append(path)
+
+    def notify(self, action: Any, event: str, callback: Callable) -> None:
+        pass
+
+
+@dataclass
+class Project:
+    """A docs project in a temporary directory: Python sources in `src`,
+    Markdown pages in `docs/content`, built into `build/content` the way the
+    Mkdocs template does it (copied over fresh, then preprocessed in place).
+    """
+
+    directory: Path
+
+    def write_module(self, rel_path: str, source: str) -> None:
+        path = self.directory / "src" / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+
+    def remove_module(self, rel_path: str) -> None:
+        (self.directory / "src" / rel_path).unlink()
+
+    def write_page(self, rel_path: str, content: str) -> None:
+        path = self.directory / "docs" / "content" / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+    def build(
+        self,
+        processed: Optional[list[str]] = None,
+        watched: Optional[list[Path]] = None,
+        depends_on: Sequence[str] = (),
+        **options: Any,
+    ) -> dict[str, str]:
+        """Run the preprocessing action with a new `DrGenPreprocessor` (like
+        a fresh `novella` run) caching to `cache`, and return the output
+        pages by path. Names of the pages that were actually (re-)processed
+        are added to `processed`, and paths the build was told to watch to
+        `watched`.
+
+        Ours runs right before the `anchor` preprocessor, and after those
+        named in `depends_on` (like `"cat"`, so we're repeated from it).
+        """
+        build_dir = self.directory / "build"
+        shutil.rmtree(build_dir, ignore_errors=True)
+        shutil.copytree(self.directory / "docs", build_dir)
+
+        project_directory = self.directory / "docs"
+        action = MarkdownPreprocessorAction(
+            SimpleNamespace(
+                project_directory=project_directory,
+                novella=SimpleNamespace(project_directory=project_directory),
+            ),
+            "preprocess-markdown",
+        )
+        action.path = "content"
+
+        preprocessor = DrGenPreprocessor(
+            action,
+            "doctor-genova",
+            cache_dir=self.directory / "cache",
+            **options,
+        )
+
+        if processed is not None:
+            process_file_content = preprocessor._process_file_content
+
+            def spy(file, entry):
+                processed.append(file.path.name)
+                process_file_content(file, entry)
+
+            preprocessor._process_file_content = spy
+
+        action.use(preprocessor)
+        if depends_on:
+            preprocessor.depends_on(*depends_on)
+            preprocessor.precedes("anchor")
+        action.execute(FakeBuild(build_dir, [] if watched is None else watched))
+
+        content_dir = build_dir / "content"
+        return {
+            path.relative_to(content_dir).as_posix(): path.read_text(
+                encoding="utf-8"
+            )
+            for path in content_dir.rglob("*.md")
+        }
+
+
+@pytest.fixture(scope="session")
+def stdlib_index_dir(tmp_path_factory) -> Path:
+    directory = tmp_path_factory.mktemp("stdlib")
+    assert StdlibIndex.load_or_generate(directory) is not None
+    return directory
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch, stdlib_index_dir: Path) -> Project:
+    # Modules are searched for relative to the current directory
+    monkeypatch.chdir(tmp_path)
+
+    # Generating the stdlib index takes a while, so it's only done once
+    (tmp_path / "cache" / "stdlib").mkdir(parents=True)
+    shutil.copy(
+        stdlib_index_dir / get_index_filename(),
+        tmp_path / "cache" / "stdlib" / get_index_filename(),
+    )
+
+    return Project(tmp_path)
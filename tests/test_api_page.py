@@ -0,0 +1,217 @@
+from dataclasses import replace
+from pathlib import Path
+
+from doctor_genova import split_large_modules
+from doctor_genova.api_page import (
+    APIPage,
+    ClassPage,
+    get_split_classes,
+    sync_api_pages,
+)
+
+from .conftest import Project
+
+#: A module with 8 members (see `count_members`): two documented classes to
+#: split out, and an undocumented and a private one to leave in.
+BIG_MODULE = """\
+\"\"\"A big module.\"\"\"
+
+X = 1
+
+
+def f():
+    \"\"\"Does f.\"\"\"
+
+
+class Big:
+    \"\"\"A big class.\"\"\"
+
+    def run(self):
+        \"\"\"Runs the big class.\"\"\"
+
+
+class Other:
+    def go(self):
+        \"\"\"Goes.\"\"\"
+
+
+class Undocumented:
+    pass
+
+
+class _Private:
+    \"\"\"Private.\"\"\"
+"""
+
+
+def make_pages(tmp_path: Path, *module_rel_paths: str) -> list[APIPage]:
+    return [
+        APIPage(
+            module_rel_path=Path(module_rel_path),
+            build_dir=tmp_path / "build",
+            docs_dir=tmp_path / "docs",
+        )
+        for module_rel_path in module_rel_paths
+    ]
+
+
+def expand_in_place(page: APIPage) -> None:
+    """Do what Novella's Markdown preprocessing does to a stub in the build
+    directory: replace the `@pydoc` tag with the rendered docs, in place.
+    """
+    page.build_path.write_text(
+        page.stub.replace("@pydoc", "Rendered docs of"), encoding="utf-8"
+    )
+
+
+def test_sync_api_pages_after_in_place_rewrite(tmp_path: Path):
+    build_dir = tmp_path / "build"
+    pages = make_pages(tmp_path, "pkg/__init__.py", "pkg/a.py", "pkg/b.py")
+
+    result = sync_api_pages(pages, build_dir, tmp_path / "docs")
+    assert (len(result.added), len(result.changed)) == (3, 0)
+
+    for page in pages:
+        expand_in_place(page)
+
+    result = sync_api_pages(pages, build_dir, tmp_path / "docs")
+    assert (len(result.added), len(result.changed)) == (0, 0)
+    assert len(result.unchanged) == 3
+    # Expanded stubs are put back, so their `@pydoc` tags get rendered again
+    for page in pages:
+        assert page.build_path.read_text(encoding="utf-8") == page.stub
+
+    for page in pages:
+        expand_in_place(page)
+
+    result = sync_api_pages(pages[:2], build_dir, tmp_path / "docs")
+    assert result.removed == [Path("pkg/b.md")]
+    assert not pages[2].build_path.exists()
+
+
+def test_sync_api_pages_leaves_pages_from_docs(tmp_path: Path):
+    build_dir = tmp_path / "build"
+    docs_dir = tmp_path / "docs"
+    pages = make_pages(tmp_path, "pkg/__init__.py", "pkg/a.py")
+
+    sync_api_pages(pages, build_dir, docs_dir)
+
+    # The module is gone, but the docs have a page at the same path, which
+    # was copied over the stub
+    (docs_dir / "content" / "pkg").mkdir(parents=True)
+    (docs_dir / "content" / "pkg" / "a.md").write_text("Mine")
+    pages[1].build_path.write_text("Mine")
+
+    result = sync_api_pages(pages[:1], build_dir, docs_dir)
+    assert result.removed == []
+    assert pages[1].build_path.read_text() == "Mine"
+
+
+def test_sync_api_pages_changed_stub(tmp_path: Path):
+    build_dir = tmp_path / "build"
+    (page,) = make_pages(tmp_path, "pkg/a.py")
+
+    sync_api_pages([page], build_dir)
+    expand_in_place(page)
+
+    # Same page, with a different stub (cached properties live in the
+    # instance `__dict__`, even on a frozen dataclass)
+    (changed,) = make_pages(tmp_path, "pkg/a.py")
+    changed.__dict__["stub"] = page.stub + "\nMore\n"
+
+    result = sync_api_pages([changed], build_dir)
+    assert result.changed == [Path("pkg/a.md")]
+    assert changed.build_path.read_text(encoding="utf-8") == changed.stub
+
+
+def test_get_split_classes_thresholds(tmp_path: Path):
+    path = tmp_path / "big.py"
+    path.write_text(BIG_MODULE, encoding="utf-8")
+    size = len(BIG_MODULE.encode("utf-8"))
+
+    assert get_split_classes(path) == ()
+    assert get_split_classes(path, min_members=8) == ("Big", "Other")
+    assert get_split_classes(path, min_members=9) == ()
+    assert get_split_classes(path, min_bytes=size) == ("Big", "Other")
+    assert get_split_classes(path, min_bytes=size + 1) == ()
+    # Either one over is enough
+    assert get_split_classes(path, min_members=9, min_bytes=size) == (
+        "Big",
+        "Other",
+    )
+
+
+def split_project_pages(project: Project, **thresholds) -> list[APIPage]:
+    """Split the pages of `pkg`, with stubs going to `docs/content` (to be
+    copied over and preprocessed by `Project.build`).
+    """
+    pages = [
+        APIPage(
+            module_rel_path=Path(module_rel_path),
+            build_dir=project.directory / "docs",
+            docs_dir=project.directory / "pages",
+        )
+        for module_rel_path in ("pkg/__init__.py", "pkg/big.py")
+    ]
+    return split_large_modules(
+        pages, search_path=[str(project.directory / "src")], **thresholds
+    )
+
+
+def test_split_large_modules(project: Project):
+    project.write_module("pkg/__init__.py", '"""The package."""\n')
+    project.write_module("pkg/big.py", BIG_MODULE)
+
+    assert [
+        page.rel_path.as_posix()
+        for page in split_project_pages(project, min_members=9)
+    ] == ["pkg/index.md", "pkg/big.md"]
+
+    pages = split_project_pages(project, min_members=8)
+
+    assert [page.rel_path.as_posix() for page in pages] == [
+        "pkg/index.md",
+        "pkg/big/index.md",
+        "pkg/big/Big.md",
+        "pkg/big/Other.md",
+    ]
+    assert [type(page) for page in pages[2:]] == [ClassPage, ClassPage]
+
+    for page in pages:
+        page.generate()
+    output = project.build()
+
+    # The module page leaves the classes to their own pages, and lists them
+    module_page = output["pkg/big/index.md"]
+    assert "Does f." in module_page
+    assert "A big class." not in module_page
+    assert "Runs the big class." not in module_page
+    assert "Goes." not in module_page
+    assert "-   [Big](/pkg/big/Big#pydoc:pkg.big.Big)" in module_page
+
+    class_page = output["pkg/big/Big.md"]
+    assert "A big class." in class_page
+    assert "Runs the big class." in class_page
+    assert "Does f." not in class_page
+    assert "Goes." in output["pkg/big/Other.md"]
+
+
+def test_sync_split_pages_is_stable(project: Project):
+    project.write_module("pkg/__init__.py", '"""The package."""\n')
+    project.write_module("pkg/big.py", BIG_MODULE)
+    build_dir = project.directory / "build"
+
+    pages = split_project_pages(project, min_members=8)
+    pages = [replace(page, build_dir=build_dir) for page in pages]
+    sync_api_pages(pages, build_dir)
+
+    for page in pages:
+        expand_in_place(page)
+
+    # A fresh run comes up with the same pages, which are all unchanged
+    rerun = split_project_pages(project, min_members=8)
+    rerun = [replace(page, build_dir=build_dir) for page in rerun]
+    result = sync_api_pages(rerun, build_dir)
+
+    assert (result.added, result.changed, result.removed) == ([], [], [])
+    assert len(result.unchanged) == 4
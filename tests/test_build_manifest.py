@@ -0,0 +1,106 @@
+from pathlib import Path
+from typing import Iterable
+
+from doctor_genova.build_manifest import (
+    ANY_MODULE,
+    BuildManifest,
+    ManifestEntry,
+    PydocDependency,
+)
+
+
+def make_entry(
+    embed: Iterable[str] = (), link: Iterable[str] = (), output: str = ""
+) -> ManifestEntry:
+    return ManifestEntry(
+        input_digest="digest",
+        output=output,
+        embed_modules=list(embed),
+        link_modules=list(link),
+    )
+
+
+def test_get_changed_modules():
+    manifest = BuildManifest()
+    manifest.update_module_versions({"a": "1", "b": "1"}, ())
+
+    assert manifest.get_changed_modules({"a": "1", "b": "1"}) == set()
+    assert manifest.get_changed_modules({"a": "2", "b": "1"}) == {
+        "a",
+        ANY_MODULE,
+    }
+    # Added and removed modules count as changed
+    assert manifest.get_changed_modules({"a": "1", "c": "1"}) == {
+        "b",
+        "c",
+        ANY_MODULE,
+    }
+
+
+def test_get_dependents_prefers_embed():
+    manifest = BuildManifest()
+    manifest.put("embeds", make_entry(embed=["a"]))
+    manifest.put("links", make_entry(link=["a"]))
+    manifest.put("both", make_entry(embed=["b"], link=["a"]))
+    manifest.put("any", make_entry(link=[ANY_MODULE]))
+
+    assert manifest.get_dependents(["a"]) == {
+        "embeds": "embed",
+        "links": "link",
+        "both": "link",
+    }
+    assert manifest.get_dependents(["a", "b", ANY_MODULE]) == {
+        "embeds": "embed",
+        "links": "link",
+        "both": "embed",
+        "any": "link",
+    }
+
+
+def test_update_module_versions_discards_stale_entries():
+    manifest = BuildManifest()
+    manifest.put("a", make_entry(embed=["a"]))
+    manifest.put("b", make_entry(embed=["b"]))
+    manifest.put("any", make_entry(link=[ANY_MODULE]))
+    manifest.update_module_versions({"a": "1", "b": "1"}, ["a", "b", "any"])
+
+    # "a" changed; only the refreshed entry survives, along with those that
+    # don't depend on it
+    manifest.update_module_versions({"a": "2", "b": "1"}, ["a"])
+
+    assert manifest.get("a") is not None
+    assert manifest.get("b") is not None
+    assert manifest.get("any") is None
+    assert manifest.module_versions == {"a": "2", "b": "1"}
+
+
+def test_discard_cleans_up_dependents():
+    manifest = BuildManifest()
+    manifest.put("page", make_entry(embed=["a"], link=["b"]))
+    manifest.put("page", make_entry(link=["c"]))
+
+    assert manifest.get_dependents(["a", "b"]) == {}
+    assert manifest.get_dependents(["c"]) == {"page": "link"}
+
+    manifest.discard("page")
+
+    assert manifest.get_dependents(["c"]) == {}
+    assert len(manifest) == 0
+
+
+def test_save_and_load(tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    manifest = BuildManifest(path)
+    entry = make_entry(embed=["a"], link=[ANY_MODULE], output="Out")
+    entry.pydocs.append(PydocDependency("a.f", {"x": 1}, "key"))
+    entry.links["os"] = "[os](https://docs.python.org/)"
+    entry.links["nope"] = None
+    manifest.put("page", entry)
+    manifest.update_module_versions({"a": "1"}, ["page"])
+    manifest.save()
+
+    loaded = BuildManifest(path)
+
+    assert loaded.get("page") == entry
+    assert loaded.module_versions == {"a": "1"}
+    assert loaded.get_dependents(["a"]) == {"page": "embed"}
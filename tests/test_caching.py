@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from doctor_genova.caching import (
+    DISK_CACHE_NAMES,
+    DiskCache,
+    main,
+    make_cache_key,
+)
+
+
+def write_cache_dir(cache_dir: Path) -> list[Path]:
+    """Fill `cache_dir` like a build would, returning the paths of what isn't
+    a cache entry.
+    """
+    for name in DISK_CACHE_NAMES:
+        cache = DiskCache(cache_dir / name)
+        for index in range(4):
+            cache.put(make_cache_key(name, index), b"x" * 100)
+
+    others = [
+        cache_dir / "manifest.json",
+        cache_dir / "stdlib" / "index.json",
+        cache_dir / "modules" / "README",
+        cache_dir / "renders" / "ab" / "notes.txt",
+    ]
+    for path in others:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("Keep me")
+
+    return others
+
+
+def test_disk_cache_only_counts_entries(tmp_path: Path):
+    others = write_cache_dir(tmp_path)
+
+    assert DiskCache(tmp_path).size() == 0
+    assert DiskCache(tmp_path / "renders").size() == 400
+
+    DiskCache(tmp_path / "renders").clear()
+
+    assert DiskCache(tmp_path / "renders").size() == 0
+    assert all(path.exists() for path in others)
+
+
+def test_clear_command(tmp_path: Path):
+    others = write_cache_dir(tmp_path)
+
+    main(["clear", str(tmp_path)])
+
+    for name in DISK_CACHE_NAMES:
+        assert DiskCache(tmp_path / name).size() == 0
+    assert all(path.exists() for path in others)
+
+
+def test_prune_command_splits_max_bytes(tmp_path: Path):
+    others = write_cache_dir(tmp_path)
+
+    main(["prune", str(tmp_path), "--max-bytes", "400"])
+
+    for name in DISK_CACHE_NAMES:
+        assert DiskCache(tmp_path / name).size() == 200
+    assert all(path.exists() for path in others)
+
+
+def test_overwriting_an_entry_counts_it_once(tmp_path: Path):
+    cache = DiskCache(tmp_path, max_bytes=250)
+    cache.put("aa1", b"x" * 100)
+    cache.put("bb1", b"y" * 100)
+
+    for _ in range(5):
+        cache.put("aa1", b"z" * 100)
+
+    # Had overwrites been counted again, the cache would have been pruned
+    assert cache.get("aa1") == b"z" * 100
+    assert cache.get("bb1") == b"y" * 100
+    assert cache._size == cache.size() == 200
+
+    cache.put("aa1", b"z" * 50)
+    cache.discard("bb1")
+    assert cache._size == cache.size() == 50
@@ -0,0 +1,143 @@
+import os
+from pathlib import Path
+
+from pydoc_markdown.interfaces import Context
+import pytest
+
+from doctor_genova import discovery
+from doctor_genova.discovery import discover_py_files, discover_py_modules
+from doctor_genova.module_cache import CachingPythonLoader
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    discovery.clear_cache()
+    yield
+    discovery.clear_cache()
+
+
+def write_files(directory: Path, *rel_paths: str) -> None:
+    for rel_path in rel_paths:
+        path = directory / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding="utf-8")
+
+
+def as_strs(paths) -> list[str]:
+    return [str(path).replace(os.sep, "/") for path in paths]
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    write_files(
+        tmp_path,
+        "mod.py",
+        "setup.py",
+        "pkg/__init__.py",
+        "pkg/a.py",
+        "pkg/notes.txt",
+        "pkg/__pycache__/a.py",
+        "pkg/.hidden/b.py",
+        "pkg/_vendor/__init__.py",
+        "pkg/_vendor/c.py",
+        "pkg/sub/__init__.py",
+        "pkg/sub/d.py",
+        "not_a_package/e.py",
+    )
+    return tmp_path
+
+
+def test_excluded_directories_are_pruned(tree: Path):
+    files = discover_py_files(
+        [tree],
+        ignore_when_discovered=["setup"],
+        exclude=[*discovery.DEFAULT_EXCLUDE, "pkg/_vendor"],
+    )
+
+    assert as_strs(files) == [
+        "mod.py",
+        "pkg/__init__.py",
+        "pkg/a.py",
+        "pkg/sub/__init__.py",
+        "pkg/sub/d.py",
+    ]
+
+    # Excluded directories aren't even looked at
+    (walk,) = discovery._walks.values()
+    assert set(walk.dir_mtimes) == {
+        str(tree.resolve() / rel_dir) for rel_dir in ("", "pkg", "pkg/sub")
+    } | {str(tree.resolve() / "not_a_package")}
+
+
+def test_walks_are_redone_when_a_directory_changes(tree: Path, monkeypatch):
+    walks = []
+    walk_root = discovery._walk_root
+
+    def spy(*args):
+        walks.append(args[0])
+        return walk_root(*args)
+
+    monkeypatch.setattr(discovery, "_walk_root", spy)
+
+    first = discover_py_files([tree])
+    assert discover_py_files([tree]) == first
+    assert len(walks) == 1
+
+    write_files(tree, "pkg/sub/f.py")
+    # Make sure the mtime changes, however coarse the filesystem's is
+    sub_dir = tree / "pkg" / "sub"
+    mtime_ns = sub_dir.stat().st_mtime_ns + 1_000_000_000
+    os.utime(sub_dir, ns=(mtime_ns, mtime_ns))
+
+    assert set(as_strs(discover_py_files([tree]))) == set(as_strs(first)) | {
+        "pkg/sub/f.py"
+    }
+    assert len(walks) == 2
+
+
+def test_overlapping_search_path_entries(tree: Path):
+    entries = [tree, tree / ".", tree / "pkg"]
+
+    assert discover_py_files(entries) == discover_py_files([tree])
+
+    # `pkg/sub` is found under both `tree` and `tree/pkg`, but only listed once
+    modules = discover_py_modules(entries)
+    filenames = [filename for _name, filename in modules]
+    assert len(filenames) == len(set(filenames))
+    assert ("pkg.sub.d", str(tree.resolve() / "pkg/sub/d.py")) in modules
+    assert not any(name.startswith("sub") for name, _ in modules)
+
+
+def make_loader(tree: Path, **options) -> CachingPythonLoader:
+    loader = CachingPythonLoader(search_path=[str(tree)], **options)
+    loader.init(Context(directory=str(tree)))
+    return loader
+
+
+def test_loader_discovers_modules_like_api_pages(tree: Path):
+    loader = make_loader(tree)
+
+    assert sorted(loader.iter_files()) == [
+        ("mod", str(tree.resolve() / "mod.py")),
+        ("pkg", str(tree.resolve() / "pkg/__init__.py")),
+        ("pkg._vendor", str(tree.resolve() / "pkg/_vendor/__init__.py")),
+        ("pkg._vendor.c", str(tree.resolve() / "pkg/_vendor/c.py")),
+        ("pkg.a", str(tree.resolve() / "pkg/a.py")),
+        ("pkg.sub", str(tree.resolve() / "pkg/sub/__init__.py")),
+        ("pkg.sub.d", str(tree.resolve() / "pkg/sub/d.py")),
+    ]
+
+    loader = make_loader(tree, exclude=["_vendor"], packages=["pkg"])
+    # Explicitly listed packages are loaded whole, as by `PythonLoader`
+    assert ("pkg._vendor.c", str(tree / "pkg/_vendor/c.py")) in list(
+        loader.iter_files()
+    )
+
+    loader = make_loader(tree, exclude=[*discovery.DEFAULT_EXCLUDE, "_vendor"])
+    assert [name for name, _ in loader.iter_files()] == [
+        "mod",
+        "pkg",
+        "pkg.a",
+        "pkg.sub",
+        "pkg.sub.d",
+    ]
@@ -0,0 +1,173 @@
+import logging
+from pathlib import Path
+import re
+from typing import Optional, Sequence
+
+from docspec import ApiObject, Module, visit
+import docspec_python
+from novella.markdown.tagparser import parse_inline_tags, replace_tags
+from pydoc_markdown.interfaces import Resolver
+from pydoc_markdown.util.docspec import ApiSuite
+import pytest
+
+from doctor_genova.docstring_backtick_processor import (
+    DocstringBacktickProcessor,
+)
+from doctor_genova.indexed_api_suite import IndexedReferenceResolver
+
+SOURCE = '''"""See `A`, `A.run`, `os.sep`, `json.dumps` and `nowhere`."""
+
+
+class A:
+    """Runs with `run`, not `walk`; see {@pylink os.sep} and {@pylink gone}."""
+
+    def run(self):
+        """Returns `A`, or `os.sep`, or `B.stop`, never `walk`."""
+
+    def stop(self):
+        """Unlike `B.stop`, see {@pylink A.run}."""
+
+
+class B:
+    """Also `nowhere` and `json.dumps`, plus `os.sep`."""
+
+    def stop(self):
+        """Stops `A`."""
+'''
+
+
+def load_modules(directory: Path) -> list[Module]:
+    (directory / "mod.py").write_text(SOURCE, encoding="utf-8")
+    return list(
+        docspec_python.load_python_modules(
+            modules=["mod"], search_path=[directory]
+        )
+    )
+
+
+class RefResolver(Resolver):
+    """Resolves `os.` names, counting what it's asked."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def resolve_ref(self, scope: ApiObject, ref: str) -> Optional[str]:
+        self.calls.append(ref)
+        if ref.startswith("os."):
+            return "[{}](https://docs.python.org/)".format(ref)
+        # Empty links count as not resolving
+        return "" if ref.startswith("json.") else None
+
+
+class BatchResolver(RefResolver):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    def resolve_refs(
+        self, refs: Sequence[tuple[ApiObject, str]]
+    ) -> list[None | str]:
+        self.batches.append([ref for _scope, ref in refs])
+        return [self.resolve_ref(scope, ref) for scope, ref in refs]
+
+
+def process_per_reference(
+    modules: list[Module], resolver: Optional[Resolver]
+) -> set[str]:
+    """What the processor did before batching: resolve every match in every
+    docstring, in place, one at a time. Returns the names left unresolved.
+    """
+    resolver_v2 = IndexedReferenceResolver(global_=True)
+    suite = ApiSuite(modules)
+    unresolved: set[str] = set()
+
+    def resolve(node: ApiObject, name: str) -> Optional[str]:
+        if api_object := resolver_v2.resolve_reference(suite, node, name):
+            return "{{@link pydoc:{}}}".format(
+                ".".join(x.name for x in api_object.path)
+            )
+        if resolver is not None and (link := resolver.resolve_ref(node, name)):
+            return link
+        unresolved.add(name)
+        return None
+
+    def process(node: ApiObject) -> None:
+        if not node.docstring:
+            return
+        node.docstring.content = DocstringBacktickProcessor.BACKTICK_RE.sub(
+            lambda match: resolve(node, match.group(1)) or match.group(0),
+            node.docstring.content,
+        )
+        node.docstring.content = replace_tags(
+            node.docstring.content,
+            [
+                tag
+                for tag in parse_inline_tags(node.docstring.content)
+                if tag.name == "pylink"
+            ],
+            lambda tag: resolve(node, tag.args.strip()),
+        )
+
+    visit(modules, process)
+    return unresolved
+
+
+def get_docstrings(modules: list[Module]) -> list[Optional[str]]:
+    docstrings: list[Optional[str]] = []
+    visit(
+        modules,
+        lambda node: docstrings.append(
+            node.docstring and node.docstring.content
+        ),
+    )
+    return docstrings
+
+
+def get_reported_unresolved(caplog) -> set[str]:
+    return {
+        record.args[0]
+        for record in caplog.records
+        if re.search("NO MATCH", record.msg)
+    }
+
+
+@pytest.mark.parametrize("resolver_type", [None, RefResolver, BatchResolver])
+def test_same_as_per_reference_resolution(
+    tmp_path: Path, caplog, resolver_type
+):
+    modules = load_modules(tmp_path)
+    expected_modules = load_modules(tmp_path)
+    resolver = resolver_type and resolver_type()
+
+    with caplog.at_level(logging.INFO):
+        DocstringBacktickProcessor(
+            resolver_v2=IndexedReferenceResolver(global_=True)
+        ).process(modules, resolver)
+
+    expected_unresolved = process_per_reference(
+        expected_modules, resolver_type and resolver_type()
+    )
+
+    assert get_docstrings(modules) == get_docstrings(expected_modules)
+    assert get_reported_unresolved(caplog) == expected_unresolved
+    assert expected_unresolved >= {"nowhere", "gone", "walk", "json.dumps"}
+
+
+def test_batch_resolver_gets_distinct_unresolved_names(tmp_path: Path):
+    resolver = BatchResolver()
+
+    DocstringBacktickProcessor(
+        resolver_v2=IndexedReferenceResolver(global_=True)
+    ).process(load_modules(tmp_path), resolver)
+
+    # A batch for the backticks and one for the `{@pylink}` tags, with each
+    # name once per scope (the methods of `A` share theirs), and none of the
+    # names that resolve to our objects
+    backticks, pylinks = resolver.batches
+    assert sorted(backticks) == sorted(
+        ["os.sep", "json.dumps", "nowhere"]  # mod
+        + ["walk", "os.sep"]  # A and its methods
+        + ["nowhere", "json.dumps", "os.sep"]  # B and its method
+    )
+    assert sorted(pylinks) == ["gone"]
+    assert resolver.calls == backticks + pylinks
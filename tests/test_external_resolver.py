@@ -0,0 +1,176 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from doctor_genova.external_resolver import ExternalResolverRegistry
+
+
+@dataclass(frozen=True)
+class Resolution:
+    name: str
+    resolver: str
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_url(self) -> str:
+        return "https://example.com/{}/{}".format(self.resolver, self.name)
+
+    def get_md_link(self) -> str:
+        return "[{}]({})".format(self.name, self.get_url())
+
+
+@dataclass(eq=False)
+class Resolver:
+    """Resolves the names in `names`, recording what it's asked."""
+
+    label: str
+    names: set[str]
+    namespaces: Optional[list[str]] = None
+    calls: list[str] = field(default_factory=list)
+
+    def resolve_name(self, name: str) -> Optional[Resolution]:
+        self.calls.append(name)
+        return Resolution(name, self.label) if name in self.names else None
+
+    def get_namespaces(self) -> Optional[list[str]]:
+        return self.namespaces
+
+
+@dataclass(eq=False)
+class BatchResolver(Resolver):
+    batches: list[list[str]] = field(default_factory=list)
+
+    def resolve_names(
+        self, names: Iterable[str]
+    ) -> dict[str, Optional[Resolution]]:
+        names = list(names)
+        self.batches.append(names)
+        return {
+            name: Resolution(name, self.label) if name in self.names else None
+            for name in names
+        }
+
+
+def test_batch_resolution_same_as_one_by_one():
+    def make_resolvers() -> list[Resolver]:
+        return [
+            BatchResolver("np", {"numpy.array", "numpy.linalg"}, ["numpy"]),
+            Resolver("linalg", {"numpy.linalg.norm"}, ["numpy.linalg"]),
+            BatchResolver("any", {"numpy.zeros", "re.match", "numpy.array"}),
+            Resolver("last", {"json.dumps"}),
+        ]
+
+    names = [
+        "numpy.array",
+        "numpy.linalg.norm",
+        "numpy.linalg.inv",
+        "numpy.zeros",
+        "re.match",
+        "json.dumps",
+        "numpy.array",
+        "nowhere",
+    ]
+
+    one_by_one = ExternalResolverRegistry(make_resolvers())
+    expected = {name: one_by_one.resolve_name(name) for name in names}
+
+    resolvers = make_resolvers()
+    results = ExternalResolverRegistry(resolvers).resolve_names_with_resolvers(
+        names
+    )
+
+    assert {
+        name: resolved and resolved[1] for name, resolved in results.items()
+    } == expected
+    # Unresolved names are there, as `None`, like `resolve_name` returns
+    assert expected["numpy.linalg.inv"] is None and expected["nowhere"] is None
+    for name, resolved in results.items():
+        assert resolved is None or resolved[0].label == resolved[1].resolver
+
+    # Each batch resolver is asked once per round, about names still
+    # unresolved that it's a candidate for, and never twice about one
+    np, linalg, any_, last = resolvers
+    assert np.batches == [["numpy.array", "numpy.zeros"], ["numpy.linalg.inv"]]
+    assert linalg.calls == ["numpy.linalg.norm", "numpy.linalg.inv"]
+    assert any_.batches == [
+        ["re.match", "json.dumps", "nowhere"],
+        ["numpy.zeros"],
+        ["numpy.linalg.inv"],
+    ]
+    assert last.calls == ["json.dumps", "nowhere", "numpy.linalg.inv"]
+
+
+def get_candidates(registry: ExternalResolverRegistry, name: str) -> list[str]:
+    return [resolver.label for resolver in registry.iter_candidates(name)]
+
+
+def test_deepest_namespace_first():
+    registry = ExternalResolverRegistry(
+        [
+            Resolver("np", set(), ["numpy"]),
+            Resolver("any", set()),
+            Resolver("linalg", set(), ["numpy.linalg"]),
+            Resolver("sp", set(), ["scipy", "numpy.linalg.lapack"]),
+        ]
+    )
+
+    assert get_candidates(registry, "numpy.linalg.lapack.dgesv") == [
+        "sp",
+        "linalg",
+        "np",
+        "any",
+    ]
+    assert get_candidates(registry, "numpy.linalg.norm") == [
+        "linalg",
+        "np",
+        "any",
+    ]
+    assert get_candidates(registry, "numpy") == ["np", "any"]
+    assert get_candidates(registry, "scipy.stats") == ["sp", "any"]
+    # Namespaces are whole name parts, not string prefixes
+    assert get_candidates(registry, "numpyx.array") == ["any"]
+    assert get_candidates(registry, "linalg.norm") == ["any"]
+
+
+def test_same_namespace_in_registration_order():
+    registry = ExternalResolverRegistry(
+        [
+            Resolver("first", set(), ["numpy"]),
+            Resolver("fallback", set(), None),
+            Resolver("second", set(), ["numpy", "numpy.linalg"]),
+            Resolver("third", set(), ["numpy"]),
+        ]
+    )
+
+    assert get_candidates(registry, "numpy.array") == [
+        "first",
+        "second",
+        "third",
+        "fallback",
+    ]
+    # A resolver owning several of a name's namespaces is tried just once,
+    # for the deepest
+    assert get_candidates(registry, "numpy.linalg.norm") == [
+        "second",
+        "first",
+        "third",
+        "fallback",
+    ]
+
+
+def test_resolves_with_first_candidate_that_can():
+    resolvers = [
+        Resolver("np", {"numpy.linalg.norm"}, ["numpy"]),
+        Resolver("linalg", {"numpy.linalg.norm"}, ["numpy.linalg"]),
+        Resolver("any", {"numpy.linalg.norm", "numpy.array"}),
+    ]
+    registry = ExternalResolverRegistry(resolvers)
+
+    assert registry.resolve_name("numpy.linalg.norm").resolver == "linalg"
+    assert registry.resolve_name("numpy.array").resolver == "any"
+    assert registry.resolve_names(["numpy.linalg.norm", "numpy.array"]) == {
+        "numpy.linalg.norm": Resolution("numpy.linalg.norm", "linalg"),
+        "numpy.array": Resolution("numpy.array", "any"),
+    }
+    # Resolvers aren't asked about names outside their namespaces
+    assert "numpy.array" not in resolvers[1].calls
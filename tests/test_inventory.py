@@ -0,0 +1,92 @@
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from doctor_genova.inventory import Inventory, InventoryItem, InventoryResolver
+
+
+def write_inventory(path: Path, *names: str) -> None:
+    path.write_bytes(
+        Inventory(
+            project="extlib",
+            version="1.0",
+            items=[
+                InventoryItem(
+                    name=name,
+                    type="py:function",
+                    priority=1,
+                    uri="api.html#" + name,
+                    display_name=name,
+                )
+                for name in names
+            ],
+        ).dump()
+    )
+
+
+def set_mtime(path: Path, mtime_ns: int) -> None:
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def parses(monkeypatch) -> list[bytes]:
+    """The inventories parsed (rather than loaded from their pickle)."""
+    parsed: list[bytes] = []
+    parse = Inventory.parse
+
+    def spy(data: bytes) -> Inventory:
+        parsed.append(data)
+        return parse(data)
+
+    monkeypatch.setattr(Inventory, "parse", spy)
+    return parsed
+
+
+def resolve(path: Path, name: str):
+    resolution = InventoryResolver(path, "https://ext/").resolve_name(name)
+    return resolution and resolution.get_url()
+
+
+def test_pickle_is_reused_until_the_inventory_changes(
+    tmp_path: Path, parses: list[bytes]
+):
+    path = tmp_path / "objects.inv"
+    write_inventory(path, "extlib.thing")
+    mtime_ns = path.stat().st_mtime_ns
+
+    assert resolve(path, "extlib.thing") == "https://ext/api.html#extlib.thing"
+    assert len(parses) == 1
+    assert InventoryResolver(path, "https://ext/").pickle_path.is_file()
+
+    # Fresh resolvers load the pickle
+    assert resolve(path, "extlib.thing") == "https://ext/api.html#extlib.thing"
+    assert len(parses) == 1
+
+    # Same size, different mtime
+    write_inventory(path, "extlib.other")
+    assert path.stat().st_size == len(parses[0])
+    set_mtime(path, mtime_ns + 1_000_000_000)
+
+    assert resolve(path, "extlib.thing") is None
+    assert resolve(path, "extlib.other") == "https://ext/api.html#extlib.other"
+    assert len(parses) == 2
+
+    # Different size, same mtime
+    write_inventory(path, "extlib.other", "extlib.more")
+    set_mtime(path, mtime_ns + 1_000_000_000)
+
+    assert resolve(path, "extlib.more") == "https://ext/api.html#extlib.more"
+    assert len(parses) == 3
+
+
+def test_missing_inventory_resolves_nothing(tmp_path: Path, caplog):
+    resolver = InventoryResolver(tmp_path / "objects.inv", "https://ext/")
+
+    with caplog.at_level(logging.WARNING):
+        assert resolver.resolve_name("extlib.thing") is None
+
+    assert "Can't read inventory" in caplog.text
+    assert resolver.project == ""
+    assert list(resolver.get_namespaces()) == []
@@ -0,0 +1,87 @@
+import re
+from typing import Callable
+
+from novella.markdown.tagparser import Tag, parse_inline_tags, replace_tags
+import pytest
+
+from doctor_genova.docstring_backtick_processor import (
+    DocstringBacktickProcessor,
+)
+from doctor_genova.lib import substitute_inline
+
+BACKTICK_RE = DocstringBacktickProcessor.BACKTICK_RE
+
+
+def render_tag(tag: Tag) -> str:
+    return "<{}|{}>".format(tag.args.strip(), sorted(tag.options.items()))
+
+
+def render_tag_in_backticks(tag: Tag) -> str:
+    # Replacements like this one make `substitute_inline` splice them in
+    return "`{}`".format(tag.args.strip())
+
+
+def render_match(match: re.Match) -> str:
+    return "[{}]".format(match.group(1))
+
+
+def substitute_with_novella(
+    content: str, replace: Callable[[Tag], str]
+) -> tuple[str, list[Tag]]:
+    """What `substitute_inline` should amount to: Novella's inline tag
+    replacement, then the backtick pattern over the result.
+    """
+    tags = [t for t in parse_inline_tags(content) if t.name == "pylink"]
+    content = replace_tags(content, tags, replace)
+    return BACKTICK_RE.sub(render_match, content), tags
+
+
+def substitute(
+    content: str, replace: Callable[[Tag], str]
+) -> tuple[str, list[Tag]]:
+    tags: list[Tag] = []
+
+    def replace_tag(tag: Tag) -> str:
+        tags.append(tag)
+        return replace(tag)
+
+    out: list[str] = []
+    substitute_inline(
+        content, out, "pylink", replace_tag, BACKTICK_RE, render_match
+    )
+    return "".join(out), tags
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "Plain `a.b` text with {@pylink a.b} in it.",
+        # Escaped tags
+        r"Not a tag: \{@pylink a.b}, but {@pylink c} is.",
+        r"{@pylink a \{@pylink b} c}",
+        r"{@pylink a \} b}",
+        # Nested braces in the options
+        '{@pylink a :with { x = { y = 1 }, z = "w" } } and `b`',
+        "{@pylink a :with x = { y = 1 }}`b`",
+        # Quoted arguments and options
+        '{@pylink "a.b" :with title = "A B"} `c`',
+        "{@pylink 'a b' :with title = 'x'}",
+        # Adjacent tags
+        "{@pylink a}{@pylink b}",
+        "{@pylink a}`b`{@pylink c} {@link d}{@pylink e}",
+        "`{@pylink a}`",
+        # Other, broken and unterminated tags
+        "{@link a} {@pylink b {@pylink c} d}",
+        "{@pylink a",
+        "{@pylink a :with x = {",
+        # Spanning lines
+        "One\n{@pylink a\nb}\nTwo `c`\n{@pylink d :with\nx = 1}\n",
+        "One\n`{@pylink a}` {@pylink b}\n\\{@pylink c}\n{@pylink d}",
+        r"\\{@pylink a}",
+    ],
+)
+@pytest.mark.parametrize("replace", [render_tag, render_tag_in_backticks])
+def test_substitute_inline_matches_novella(content: str, replace):
+    assert substitute(content, replace) == substitute_with_novella(
+        content, replace
+    )
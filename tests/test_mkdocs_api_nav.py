@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import yaml
+
+from doctor_genova import mkdocs_api_nav
+from doctor_genova.api_page import APIPage
+
+MODULES = ("pkg/__init__.py", "pkg/b.py", "pkg/a.py", "pkg/sub/__init__.py")
+
+
+def add_pages(build_dir: Path) -> None:
+    with mkdocs_api_nav(build_dir, "API") as api_nav:
+        for module_rel_path in MODULES:
+            APIPage(
+                module_rel_path=Path(module_rel_path),
+                build_dir=build_dir,
+                docs_dir=build_dir / "docs",
+            ).add_to_api_nav(api_nav)
+
+
+def test_mkdocs_api_nav(tmp_path: Path):
+    mkdocs_yml = tmp_path / "mkdocs.yml"
+    mkdocs_yml.write_text(
+        "site_name: Test\nnav:\n- index.md\n", encoding="utf-8"
+    )
+
+    add_pages(tmp_path)
+
+    assert yaml.safe_load(mkdocs_yml.read_text(encoding="utf-8"))["nav"] == [
+        "index.md",
+        {
+            "API": [
+                {
+                    "pkg": [
+                        "pkg/index.md",
+                        {"a": "pkg/a.md"},
+                        {"b": "pkg/b.md"},
+                        {"sub": ["pkg/sub/index.md"]},
+                    ]
+                }
+            ]
+        },
+    ]
+
+
+def test_mkdocs_api_nav_skips_writing_unchanged_config(tmp_path: Path):
+    mkdocs_yml = tmp_path / "mkdocs.yml"
+    mkdocs_yml.write_text("site_name: Test\n", encoding="utf-8")
+
+    add_pages(tmp_path)
+    written = mkdocs_yml.read_text(encoding="utf-8")
+    assert written != "site_name: Test\n"
+
+    # Run again on the config kept from the last run, backdated so a write
+    # would show. The pages are already in the nav, so nothing changes.
+    os.utime(mkdocs_yml, ns=(0, 0))
+    add_pages(tmp_path)
+
+    assert mkdocs_yml.stat().st_mtime_ns == 0
+    assert mkdocs_yml.read_text(encoding="utf-8") == written
@@ -0,0 +1,144 @@
+import logging
+import os
+from pathlib import Path
+
+import docspec
+import pytest
+
+from doctor_genova.caching import DiskCache
+from doctor_genova.module_cache import ModuleCache, dump_module, load_module
+
+SOURCE = '''"""The module."""
+
+
+class A:
+    """An A."""
+
+    #: A value.
+    value: int = 1
+
+    def run(self, x: int = 2) -> "A":
+        """Runs."""
+
+
+def f(*args, **kwargs) -> None:
+    """Does F."""
+'''
+
+
+@pytest.fixture
+def module_path(tmp_path: Path) -> Path:
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    return path
+
+
+def touch(path: Path) -> None:
+    """Bump the mtime of `path` by a second, however coarse the file system's
+    timestamps are.
+    """
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def load(cache: ModuleCache, path: Path) -> docspec.Module:
+    (module,) = cache.load([("mod", str(path))])
+    return module
+
+
+def test_unchanged_files_are_reused(module_path: Path, monkeypatch):
+    cache = ModuleCache()
+    module = load(cache, module_path)
+    assert cache.parse_count == 1
+
+    # Same mtime and size: not even read
+    monkeypatch.setattr(cache, "_load_entry", lambda *args: pytest.fail("read"))
+    assert load(cache, module_path) is module
+    monkeypatch.undo()
+
+    # Touched but not changed: read and hashed, but not parsed again
+    touch(module_path)
+    assert load(cache, module_path) is module
+    assert cache.parse_count == 1
+    assert cache.get_digest(str(module_path)) is not None
+
+    # ...and the new mtime is remembered
+    monkeypatch.setattr(cache, "_load_entry", lambda *args: pytest.fail("read"))
+    assert load(cache, module_path) is module
+
+
+def test_changed_files_are_parsed_again(module_path: Path):
+    cache = ModuleCache()
+    module = load(cache, module_path)
+    digest = cache.get_digest(str(module_path))
+
+    module_path.write_text(
+        SOURCE.replace("Does F.", "Does F, better."), encoding="utf-8"
+    )
+    touch(module_path)
+    changed = load(cache, module_path)
+
+    assert cache.parse_count == 2
+    assert changed is not module
+    assert changed.members[-1].docstring.content == "Does F, better."
+    assert cache.get_digest(str(module_path)) != digest
+
+    # Renamed modules are parsed again too, since the name is in there
+    (renamed,) = cache.load([("other", str(module_path))])
+    assert cache.parse_count == 3
+    assert renamed.name == "other"
+
+    # Files no longer loaded are dropped
+    cache.load([])
+    assert len(cache) == 0
+    assert cache.get_digest(str(module_path)) is None
+
+
+def test_disk_cache_hits(module_path: Path, tmp_path: Path, caplog):
+    disk_cache = DiskCache(tmp_path / "cache")
+    module = load(ModuleCache(disk_cache), module_path)
+
+    # A fresh process with the same disk cache
+    cache = ModuleCache(disk_cache)
+    loaded = load(cache, module_path)
+    assert (cache.parse_count, cache.disk_hit_count) == (0, 1)
+    assert docspec.dump_module(loaded) == docspec.dump_module(module)
+
+    # Changed content isn't found on disk
+    module_path.write_text(SOURCE + "\n\nX = 1\n", encoding="utf-8")
+    cache = ModuleCache(disk_cache)
+    load(cache, module_path)
+    assert (cache.parse_count, cache.disk_hit_count) == (1, 0)
+
+    # Broken entries are discarded, and the module parsed instead
+    for path, _stat in disk_cache.iter_entries():
+        path.write_bytes(b"not a module")
+    cache = ModuleCache(disk_cache)
+    with caplog.at_level(logging.WARNING):
+        load(cache, module_path)
+    assert (cache.parse_count, cache.disk_hit_count) == (1, 0)
+    assert "Failed to load cached module" in caplog.text
+
+    cache = ModuleCache(disk_cache)
+    load(cache, module_path)
+    assert (cache.parse_count, cache.disk_hit_count) == (0, 1)
+
+
+def test_dump_module_round_trip(module_path: Path):
+    module = load(ModuleCache(), module_path)
+
+    loaded = load_module(dump_module(module), str(module_path))
+
+    assert loaded == module
+    assert docspec.dump_module(loaded) == docspec.dump_module(module)
+
+    # The tree is linked up the same way
+    (class_a, f) = loaded.members
+    assert class_a.parent is loaded and f.parent is loaded
+    assert [member.parent for member in class_a.members] == [class_a] * 2
+    assert [node.name for node in class_a.members[1].path] == [
+        "mod",
+        "A",
+        "run",
+    ]
+    assert class_a.members[1].location == module.members[0].members[1].location
@@ -0,0 +1,300 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from doctor_genova.external_resolver import ExternalResolverRegistry
+from doctor_genova.inventory import (
+    Inventory,
+    InventoryItem,
+    InventoryResolution,
+    InventoryResolver,
+)
+from doctor_genova.preprocessor import DrGenPreprocessor
+
+from .conftest import Project
+
+
+def write_project(project: Project) -> None:
+    project.write_module("pkg/__init__.py", '"""The package."""\n')
+    project.write_module(
+        "pkg/a.py",
+        '"""Module A."""\n\n\ndef fa():\n    """Does A."""\n',
+    )
+    project.write_module(
+        "pkg/b.py",
+        '"""Module B."""\n\n\ndef fb():\n    """Does B."""\n',
+    )
+
+    project.write_page("embed_a.md", "@pydoc pkg.a\n")
+    project.write_page("embed_b.md", "@pydoc pkg.b\n")
+    project.write_page("link_a.md", "See `pkg.a.fa`.\n")
+    project.write_page("stdlib.md", "See `os.path.join`.\n")
+    project.write_page("external.md", "See `extlib.thing`.\n")
+    project.write_page("plain.md", "Nothing to see.\n")
+
+
+def test_unchanged_build_reuses_everything(project: Project):
+    write_project(project)
+    first = project.build()
+
+    processed: list[str] = []
+    second = project.build(processed)
+
+    assert processed == []
+    assert second == first
+
+
+def test_edited_module_rerenders_embedding_pages(project: Project):
+    write_project(project)
+    first = project.build()
+    assert "Does A." in first["embed_a.md"]
+    assert "pydoc:pkg.a.fa" in first["link_a.md"]
+
+    project.write_module(
+        "pkg/a.py",
+        '"""Module A."""\n\n\ndef fa():\n    """Does A, better."""\n',
+    )
+
+    processed: list[str] = []
+    second = project.build(processed)
+
+    # Pages linking to the module (or anywhere external) only get their
+    # links re-checked, which come out the same
+    assert processed == ["embed_a.md"]
+    assert "Does A, better." in second["embed_a.md"]
+    assert {name: second[name] for name in second if name != "embed_a.md"} == {
+        name: first[name] for name in first if name != "embed_a.md"
+    }
+
+
+def test_removed_module_rerenders_dependent_pages(project: Project):
+    write_project(project)
+    first = project.build()
+    assert "Does B." in first["embed_b.md"]
+
+    project.remove_module("pkg/b.py")
+
+    processed: list[str] = []
+    second = project.build(processed)
+
+    assert processed == ["embed_b.md"]
+    assert "Does B." not in second["embed_b.md"]
+
+
+def test_new_object_resolves_link_that_missed(project: Project):
+    write_project(project)
+    project.write_page("later.md", "See `pkg.b.later`.\n")
+    first = project.build()
+    assert "pydoc:pkg.b.later" not in first["later.md"]
+
+    project.write_module(
+        "pkg/b.py",
+        '"""Module B."""\n\n\ndef fb():\n    """Does B."""\n\n\n'
+        'def later():\n    """Shows up later."""\n',
+    )
+
+    processed: list[str] = []
+    second = project.build(processed)
+
+    assert sorted(processed) == ["embed_b.md", "later.md"]
+    assert "pydoc:pkg.b.later" in second["later.md"]
+
+
+def test_changed_resolvers_recheck_external_links(
+    project: Project, tmp_path: Path
+):
+    write_project(project)
+    first = project.build()
+    assert "https://" not in first["external.md"]
+
+    inventory_path = tmp_path / "extlib.inv"
+    inventory_path.write_bytes(
+        Inventory(
+            project="extlib",
+            version="1.0",
+            items=[
+                InventoryItem(
+                    name="extlib.thing",
+                    type="py:function",
+                    priority=1,
+                    uri="api.html#extlib.thing",
+                    display_name="extlib.thing",
+                )
+            ],
+        ).dump()
+    )
+
+    def build_with(base_url: str, processed: list[str]) -> dict[str, str]:
+        return project.build(
+            processed,
+            external_resolvers=[InventoryResolver(inventory_path, base_url)],
+        )
+
+    processed: list[str] = []
+    second = build_with("https://extlib.org/", processed)
+
+    assert processed == ["external.md"]
+    assert "https://extlib.org/api.html#extlib.thing" in second["external.md"]
+
+    processed = []
+    third = build_with("https://extlib.org/", processed)
+
+    assert processed == []
+    assert third == second
+
+    processed = []
+    fourth = build_with("https://docs.extlib.org/", processed)
+
+    assert processed == ["external.md"]
+    assert "https://docs.extlib.org/" in fourth["external.md"]
+
+
+def test_parallel_processing_matches_serial(project: Project, monkeypatch):
+    write_project(project)
+    project.write_module(
+        "pkg/c.py",
+        '"""Module C.\n\n@cat snippet.txt\n"""\n\n\n'
+        'def fc():\n    """Uses `fa`."""\n',
+    )
+    project.write_page("snippet.txt", "Pulled in by `pkg.a.fa`.\n")
+    project.write_page("embed_c.md", "@pydoc pkg.c\n")
+    project.write_page("scoped.md", "@pyscope pkg.a\n\nSee `fa`.\n")
+
+    watched_serially: list[Path] = []
+    serial = project.build(watched=watched_serially, depends_on=["cat"])
+    assert "Pulled in by [fa](/embed_a#pydoc:pkg.a.fa)" in serial["embed_c.md"]
+    assert watched_serially
+
+    process_files_in_parallel = DrGenPreprocessor._process_files_in_parallel
+    parallel_calls: list[int] = []
+
+    def spy(self, files):
+        parallel_calls.append(len(files))
+        return process_files_in_parallel(self, files)
+
+    monkeypatch.setattr(DrGenPreprocessor, "_process_files_in_parallel", spy)
+
+    # Forget the previous output, so everything gets processed again
+    (project.directory / "cache" / "manifest.json").unlink()
+    watched_in_parallel: list[Path] = []
+    parallel = project.build(
+        watched=watched_in_parallel, depends_on=["cat"], workers=2
+    )
+
+    assert parallel_calls == [len(serial)]
+    assert parallel == serial
+    assert watched_in_parallel == watched_serially
+
+
+@pytest.mark.parametrize(
+    "mkdocs_yml, use_directory_urls, uri",
+    [
+        (None, None, "guide/embed/"),
+        ("use_directory_urls: false\n", None, "guide/embed.html"),
+        ("use_directory_urls: false\n", True, "guide/embed/"),
+        (
+            "use_directory_urls: false\nmarkdown_extensions:\n"
+            "- pymdownx.emoji:\n"
+            "    emoji_index: !!python/name:material.extensions.emoji.twemoji\n",
+            None,
+            "guide/embed.html",
+        ),
+    ],
+)
+def test_inventory_page_uris(
+    project: Project,
+    mkdocs_yml: Optional[str],
+    use_directory_urls: Optional[bool],
+    uri: str,
+):
+    write_project(project)
+    project.write_module(
+        "pkg/c.py", '"""Module C."""\n\n\ndef fc():\n    """Does C."""\n'
+    )
+    project.write_page("guide/embed.md", "@pydoc pkg.c\n")
+    if mkdocs_yml is not None:
+        (project.directory / "docs" / "mkdocs.yml").write_text(mkdocs_yml)
+
+    project.build(
+        inventory="objects.inv", use_directory_urls=use_directory_urls
+    )
+
+    objects = json.loads(
+        (project.directory / "build" / "content" / "objects.json").read_text()
+    )["objects"]
+    assert objects["pkg.c.fc"]["uri"] == uri + "#pydoc:pkg.c.fc"
+
+
+def test_prefetch_skips_names_that_resolve_locally(
+    project: Project, monkeypatch
+):
+    write_project(project)
+    project.write_page(
+        "scoped.md",
+        "@pyscope pkg.a\n\nSee `fa`, `pkg.b.fb` and `json.dumps`.\n",
+    )
+
+    resolve_names = ExternalResolverRegistry.resolve_names_with_resolvers
+    prefetched: list[str] = []
+
+    def spy(self, names):
+        names = list(names)
+        prefetched.extend(names)
+        return resolve_names(self, names)
+
+    monkeypatch.setattr(
+        ExternalResolverRegistry, "resolve_names_with_resolvers", spy
+    )
+
+    first = project.build()
+
+    assert "pydoc:pkg.a.fa" in first["scoped.md"]
+    assert "https://docs.python.org/" in first["scoped.md"]
+    assert "json.dumps" in prefetched
+    assert not {"fa", "pkg.a.fa", "pkg.b.fb"} & set(prefetched)
+
+    # Re-checking links (since "pkg.a" changed) doesn't send them either
+    project.write_module(
+        "pkg/a.py",
+        '"""Module A."""\n\n\ndef fa():\n    """Does A, better."""\n',
+    )
+    prefetched.clear()
+    second = project.build()
+
+    assert second["scoped.md"] == first["scoped.md"]
+    assert not {"fa", "pkg.a.fa", "pkg.b.fb"} & set(prefetched)
+
+
+class OwnPackageResolver:
+    """Resolves everything in the `pkg` namespace — like an inventory of an
+    older release of the package being documented would.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+
+    def get_namespaces(self) -> list[str]:
+        return ["pkg"]
+
+    def resolve_name(self, name: str) -> Optional[InventoryResolution]:
+        self.names.append(name)
+        return InventoryResolution(name, "https://old/", "py:function", "pkg")
+
+    def get_version(self) -> str:
+        return "1"
+
+
+def test_namespaced_resolvers_dont_get_our_names(project: Project):
+    write_project(project)
+    project.write_page("link_b.md", "See `pkg.b.fb`, `pkg.c` and `fa`.\n")
+    resolver = OwnPackageResolver()
+
+    pages = project.build(external_resolvers=[resolver])
+
+    assert "pydoc:pkg.a.fa" in pages["link_a.md"]
+    assert "pydoc:pkg.b.fb" in pages["link_b.md"]
+    # Names in its namespace that aren't ours still go to it
+    assert "https://old/" in pages["link_b.md"]
+    assert resolver.names == ["pkg.c"]
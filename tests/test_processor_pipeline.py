@@ -0,0 +1,186 @@
+import logging
+from pathlib import Path
+import threading
+from typing import Optional
+
+from docspec import ApiObject, Module, visit
+import docspec_python
+from pydoc_markdown.contrib.processors.crossref import CrossrefProcessor
+from pydoc_markdown.contrib.processors.filter import FilterProcessor
+from pydoc_markdown.contrib.processors.smart import SmartProcessor
+from pydoc_markdown.interfaces import Resolver
+import pytest
+
+from doctor_genova.docstring_backtick_processor import (
+    DocstringBacktickProcessor,
+)
+from doctor_genova.indexed_api_suite import IndexedReferenceResolver
+from doctor_genova.processor_pipeline import ProcessorPipeline
+
+SOURCES = {
+    "pkg/__init__.py": '"""The package, see `pkg.a.A`."""\n',
+    "pkg/a.py": (
+        '"""Module A, with `A` and `os.path`."""\n\n\n'
+        "class A:\n"
+        '    """An A. See :meth:`A.run` and `B`."""\n\n'
+        "    def run(self):\n"
+        '        """Runs, unlike `_hidden`.\n\n'
+        "        # Arguments\n"
+        '        x: Something.\n        """\n\n'
+        "    def _hidden(self):\n"
+        '        """Hidden, see `A`."""\n\n\n'
+        "def _private():\n"
+        '    """Filtered out, along with `A`."""\n'
+    ),
+    "pkg/b.py": (
+        '"""Module B, with `B` and `pkg.a.A.run`."""\n\n\n'
+        "class B:\n"
+        '    """A B, see {@pylink pkg.a.A} and `C.undocumented`."""\n'
+    ),
+    "pkg/c.py": (
+        "class Holder:\n"
+        "    def kept(self):\n"
+        '        """Kept, so `Holder` is too, see `B`."""\n\n'
+        "    def gone(self):\n"
+        "        pass\n\n\n"
+        "class Emptied:\n"
+        "    def _gone(self):\n"
+        '        """Filtered out, and `Emptied` with it."""\n\n\n'
+        "class Gone:\n"
+        '    """Filtered out by name, with `Gone.member`."""\n\n'
+        "    def member(self):\n"
+        '        """Documented, but filtered out along with `Gone`."""\n'
+    ),
+}
+
+
+def load_modules(directory: Path) -> list[Module]:
+    for rel_path, source in SOURCES.items():
+        path = directory / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+
+    return sorted(
+        docspec_python.load_python_modules(
+            packages=["pkg"], search_path=[directory]
+        ),
+        key=lambda module: module.name,
+    )
+
+
+class ExternalResolver(Resolver):
+    """Resolves `os.` names, and counts `preload` calls."""
+
+    def __init__(self) -> None:
+        self.preloads = 0
+
+    def preload(self) -> None:
+        self.preloads += 1
+
+    def resolve_ref(self, scope: ApiObject, ref: str) -> Optional[str]:
+        if ref.startswith("os."):
+            return "[{}](https://docs.python.org/)".format(ref)
+        return None
+
+
+def make_pipeline(
+    workers: Optional[int] = None, filter: Optional[FilterProcessor] = None
+) -> ProcessorPipeline:
+    resolver_v2 = IndexedReferenceResolver(global_=True)
+    return ProcessorPipeline(
+        filter=filter or FilterProcessor(),
+        smart=SmartProcessor(),
+        crossref=CrossrefProcessor(resolver_v2=resolver_v2),
+        backtick=DocstringBacktickProcessor(resolver_v2=resolver_v2),
+        workers=workers,
+    )
+
+
+def get_docstrings(modules: list[Module]) -> dict[str, Optional[str]]:
+    docstrings = {}
+
+    def collect(objects: list, prefix: str) -> None:
+        for api_object in objects:
+            name = prefix + api_object.name
+            docstrings[name] = api_object.docstring and (
+                api_object.docstring.content
+            )
+            collect(getattr(api_object, "members", []), name + ".")
+
+    collect(modules, "")
+    return docstrings
+
+
+def test_parallel_processing_preloads_resolver(tmp_path: Path):
+    resolver = ExternalResolver()
+    modules = load_modules(tmp_path)
+    serial_modules = load_modules(tmp_path)
+
+    make_pipeline(workers=2).process(modules, resolver)
+    assert resolver.preloads == 1
+
+    make_pipeline().process(serial_modules, ExternalResolver())
+    assert get_docstrings(modules) == get_docstrings(serial_modules)
+
+
+def test_no_forking_with_other_threads_running(
+    tmp_path: Path, monkeypatch, caplog
+):
+    monkeypatch.setattr(threading, "active_count", lambda: 2)
+    resolver = ExternalResolver()
+
+    with caplog.at_level(logging.WARNING):
+        make_pipeline(workers=2).process(load_modules(tmp_path), resolver)
+
+    assert "processing modules serially" in caplog.text
+    assert resolver.preloads == 0
+
+
+def get_path(api_object: ApiObject) -> str:
+    return ".".join(parent.name for parent in api_object.path)
+
+
+def get_post_order(modules: list[Module]) -> list[str]:
+    paths: list[str] = []
+    visit(
+        modules, lambda api_object: paths.append(get_path(api_object)), "post"
+    )
+    return paths
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"expression": "default() and name != 'Gone'"},
+        {"documented_only": False, "exclude_private": False},
+        {"skip_empty_modules": True},
+    ],
+)
+def test_same_as_processors_one_after_the_other(tmp_path: Path, options):
+    modules = load_modules(tmp_path)
+    sequential_modules = load_modules(tmp_path)
+
+    pipeline = make_pipeline(filter=FilterProcessor(**options))
+    filtered = []
+
+    def filter_spy(modules: list[Module]) -> list[ApiObject]:
+        nodes = ProcessorPipeline._filter(pipeline, modules)
+        filtered.extend(map(get_path, nodes))
+        return nodes
+
+    pipeline._filter = filter_spy  # type: ignore[method-assign]
+    pipeline.process(modules, ExternalResolver())
+
+    resolver_v2 = IndexedReferenceResolver(global_=True)
+    for processor in [
+        FilterProcessor(**options),
+        SmartProcessor(),
+        CrossrefProcessor(resolver_v2=resolver_v2),
+        DocstringBacktickProcessor(resolver_v2=resolver_v2),
+    ]:
+        processor.process(sequential_modules, ExternalResolver())
+
+    assert get_docstrings(modules) == get_docstrings(sequential_modules)
+    # `_filter` collects what's left in the order `FilterProcessor` visits it
+    assert filtered == get_post_order(sequential_modules)
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+from docspec import ApiObject, Module
+import docspec_python
+
+from doctor_genova.docstring_backtick_processor import (
+    DocstringBacktickProcessor,
+)
+from doctor_genova.indexed_api_suite import IndexedReferenceResolver
+from doctor_genova.render_cache import fingerprint_api_object
+
+SOURCES = {
+    "pkg/__init__.py": '"""The package."""\n',
+    "pkg/a.py": (
+        '"""Module A."""\n\n\n'
+        "def fa():\n"
+        '    """Does A, like `fb`."""\n\n\n'
+        "def ga():\n"
+        '    """Does G."""\n'
+    ),
+    "pkg/b.py": '"""Module B."""\n\n\ndef fb():\n    """Does B."""\n',
+}
+
+
+def load_fingerprints(directory: Path, **changes: str) -> dict[str, str]:
+    """Write the package (with the sources in `changes` replaced, by module
+    name), load and process it like the preprocessor would, and return the
+    fingerprints of its objects by name.
+    """
+    for rel_path, source in SOURCES.items():
+        module_name = rel_path[: -len(".py")].replace("/", ".")
+        path = directory / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(changes.get(module_name, source), encoding="utf-8")
+
+    modules: list[Module] = list(
+        docspec_python.load_python_modules(
+            packages=["pkg"], search_path=[directory]
+        )
+    )
+    DocstringBacktickProcessor(
+        resolver_v2=IndexedReferenceResolver(global_=True)
+    ).process(modules, None)
+
+    fingerprints: dict[str, str] = {}
+
+    def collect(api_object: ApiObject) -> None:
+        name = ".".join(node.name for node in api_object.path)
+        fingerprints[name] = fingerprint_api_object(api_object)
+        for member in getattr(api_object, "members", []):
+            collect(member)
+
+    for module in modules:
+        collect(module)
+    return fingerprints
+
+
+def changed(before: dict[str, str], after: dict[str, str]) -> set[str]:
+    return {
+        name
+        for name in before.keys() | after.keys()
+        if before.get(name) != after.get(name)
+    }
+
+
+def test_same_source_same_fingerprints(tmp_path: Path):
+    assert load_fingerprints(tmp_path) == load_fingerprints(tmp_path)
+
+
+def test_docstring_change_changes_fingerprint(tmp_path: Path):
+    before = load_fingerprints(tmp_path)
+    after = load_fingerprints(
+        tmp_path,
+        **{"pkg.a": SOURCES["pkg/a.py"].replace("Does G.", "Does G, better.")},
+    )
+
+    # The object and what it's rendered in
+    assert changed(before, after) == {"pkg.a", "pkg.a.ga"}
+
+
+def test_referenced_object_change_changes_fingerprint(tmp_path: Path):
+    before = load_fingerprints(tmp_path)
+
+    # The docstring of `fa` links to `fb`, but doesn't include any of it
+    after = load_fingerprints(
+        tmp_path,
+        **{"pkg.b": SOURCES["pkg/b.py"].replace("Does B.", "Does B, better.")},
+    )
+    assert changed(before, after) == {"pkg.b", "pkg.b.fb"}
+
+    # With `fb` gone, `fa` no longer links to it
+    after = load_fingerprints(
+        tmp_path, **{"pkg.b": SOURCES["pkg/b.py"].replace("fb", "fc")}
+    )
+    assert changed(before, after) == {
+        "pkg.a",
+        "pkg.a.fa",
+        "pkg.b",
+        "pkg.b.fb",
+        "pkg.b.fc",
+    }
+
+
+def test_moved_object_changes_fingerprint(tmp_path: Path):
+    before = load_fingerprints(tmp_path)
+
+    # Same docstring and signature, but rendered under another header
+    ga = SOURCES["pkg/a.py"][SOURCES["pkg/a.py"].index("def ga") :]
+    after = load_fingerprints(
+        tmp_path,
+        **{
+            "pkg.a": SOURCES["pkg/a.py"].replace(ga, ""),
+            "pkg.b": SOURCES["pkg/b.py"] + "\n\n" + ga,
+        },
+    )
+    assert before["pkg.a.ga"] != after["pkg.b.ga"]
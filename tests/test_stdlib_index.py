@@ -0,0 +1,20 @@
+from pathlib import Path
+import shutil
+
+from doctor_genova.stdlib_index import StdlibIndex, get_index_filename
+
+
+def test_load_or_generate_loads_existing(
+    tmp_path: Path, stdlib_index_dir: Path
+):
+    shutil.copy(stdlib_index_dir / get_index_filename(), tmp_path)
+
+    index = StdlibIndex.load_or_generate(tmp_path, timeout=0)
+
+    assert index is not None
+    assert index.resolve("json.dumps") is not None
+
+
+def test_load_or_generate_times_out(tmp_path: Path):
+    assert StdlibIndex.load_or_generate(tmp_path, timeout=0.01) is None
+    assert not (tmp_path / get_index_filename()).exists()
@@ -0,0 +1,136 @@
+import importlib
+from pathlib import Path
+import sys
+from typing import Iterator
+
+import pytest
+
+from doctor_genova.stdlib_resolver import StdlibResolver, get_source_names
+
+SOURCES = {
+    "fakestd/__init__.py": (
+        "import sys\n"
+        "from ._impl import *\n"
+        "from ._impl import __all__ as _impl_all\n\n"
+        'if sys.platform == "win32":\n'
+        "    def win(): pass\n"
+        "else:\n"
+        "    def posix(): pass\n\n"
+        "try:\n"
+        "    from ._speedups import fast\n"
+        "except ImportError:\n"
+        "    def fast(): pass\n\n"
+        "class C:\n"
+        "    if sys.maxsize > 2**32:\n"
+        "        wide = True\n"
+        "    def method(self): pass\n\n"
+        "def _dynamic(): pass\n\n"
+        'globals()["dynamic"] = _dynamic\n\n'
+        '__all__ = ["C", "fast", "dynamic", *_impl_all]\n'
+    ),
+    "fakestd/_impl.py": '__all__ = ["star"]\n\ndef star(): pass\n',
+    "fakestd/sub.py": "def g(): pass\n",
+    # Not in the (fake) standard library, and not to be imported
+    "../site/notstd/__init__.py": 'raise RuntimeError("imported")\n',
+}
+
+
+@pytest.fixture
+def resolver(tmp_path: Path, monkeypatch) -> Iterator[StdlibResolver]:
+    """A resolver with static member checks, for which `fakestd` is in the
+    standard library.
+    """
+    stdlib_dir = tmp_path / "lib"
+    for rel_path, source in SOURCES.items():
+        path = stdlib_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+
+    monkeypatch.syspath_prepend(str(stdlib_dir))
+    monkeypatch.syspath_prepend(str(tmp_path / "site"))
+    importlib.invalidate_caches()
+
+    resolver = StdlibResolver(static_members=True)
+    resolver._stdlib_path = stdlib_dir
+
+    yield resolver
+
+    for name in list(sys.modules):
+        if name.partition(".")[0] in ("fakestd", "notstd"):
+            del sys.modules[name]
+
+
+def resolve(resolver: StdlibResolver, name: str):
+    resolution = resolver.resolve_name(name)
+    return resolution and resolution.member_path
+
+
+def test_get_source_names():
+    names = get_source_names(SOURCES["fakestd/__init__.py"])
+
+    # Every branch counts, whatever the platform; star imports don't
+    assert {"win", "posix", "fast", "C", "__all__"} <= names[()]
+    assert not {"star", "dynamic"} & names[()]
+    assert names[("C",)] == {"wide", "method"}
+
+
+def test_members_found_statically(resolver: StdlibResolver):
+    assert resolve(resolver, "fakestd.posix") == ["posix"]
+    assert resolve(resolver, "fakestd.win") == ["win"]
+    assert resolve(resolver, "fakestd.fast") == ["fast"]
+    assert resolve(resolver, "fakestd.C.wide") == ["C", "wide"]
+    assert resolve(resolver, "fakestd.sub.g") == ["g"]
+    assert resolve(resolver, "fakestd.sub") == []
+
+    # ...without importing anything
+    assert "fakestd" not in sys.modules
+    assert "fakestd.sub" not in sys.modules
+
+    # Until a target is asked for
+    assert resolver.resolve_name("fakestd.sub.g").target.__name__ == "g"
+    assert "fakestd.sub" in sys.modules
+
+
+def test_falls_back_to_importing(resolver: StdlibResolver):
+    # Only in `__all__` (from a star import, or set dynamically)
+    star = resolver.resolve_name("fakestd.star")
+    dynamic = resolver.resolve_name("fakestd.dynamic")
+
+    assert star.member_path == ["star"] and star.module is not None
+    assert dynamic.member_path == ["dynamic"] and dynamic.module is not None
+    assert resolve(resolver, "fakestd.missing") is None
+    assert resolve(resolver, "fakestd.C.missing") is None
+
+
+def test_extension_modules_without_source():
+    resolver = StdlibResolver(static_members=True)
+
+    for module_name in ("math", "sys"):
+        spec = resolver.get_stdlib_spec_statically(module_name)
+        assert spec is not None
+        assert resolver.get_source_names(spec) is None
+
+    # Nothing to read, so these take importing
+    assert resolve(resolver, "math.sqrt") == ["sqrt"]
+    assert resolve(resolver, "sys.getrecursionlimit") == ["getrecursionlimit"]
+    assert resolve(resolver, "math.nonexistent") is None
+
+
+def test_specs_are_cached(resolver: StdlibResolver):
+    results = resolver.resolve_names(
+        ["notstd.a", "notstd.b.c", "fakestd.sub.g", "fakestd.posix"]
+    )
+
+    assert results["notstd.a"] is None and results["notstd.b.c"] is None
+    assert "notstd" not in sys.modules
+
+    stats = resolver.spec_cache_stats
+    misses = stats.misses
+    spec = resolver.get_stdlib_spec_statically("fakestd.sub")
+    assert resolver.get_stdlib_spec_statically("fakestd.sub") is spec
+    assert resolver.get_stdlib_spec("notstd") is None
+    assert resolver.resolve_name("notstd.d") is None
+    assert stats.misses == misses
+
+    # One miss each for `notstd` and `fakestd`, no matter how many names
+    assert misses == 2